@@ -0,0 +1,683 @@
+import itertools
+import math
+import time
+from collections import Counter
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+import audit_store
+from audit import SEGMENT_MAX_AGE_S, SEGMENT_MAX_BYTES
+from batch import BatchPlan, iter_completed, registrable_domain
+from deadline import BATCH_DEADLINE_S, Deadline
+from export import EXPORT_FORMATS, BatchResultExporter, export_rows
+from ingest import (
+    BatchCheckpoint,
+    fingerprint_upload,
+    iter_url_chunks,
+    upload_progress,
+)
+from reports import generate_bulk_reports_zip, render_cached_report
+from resources import get_shared_resources
+from results import DEADLINE_EXCEEDED, LABELS, ScanResult, ScanResultBatch
+from rollups import TIERS
+from scheduler import schedule_cycle
+from utils import scan_verdict, map_risk_style, update_log, scan_batch_result, log_batch_result
+
+
+# ---------------------------------------------------------
+# API EXPLORER FRAGMENTS
+# ---------------------------------------------------------
+# Each interactive region of the API Explorer runs as an
+# st.fragment, so pressing "Call API" or "Run Batch Scan"
+# reruns only that region instead of the whole dashboard
+# script (and every static table in the other tabs).
+
+
+# ---------------------------------------------------------
+# 1) LIVE SINGLE URL TEST + LATENCY
+# ---------------------------------------------------------
+@st.fragment
+def render_single_url_tester():
+    """
+    Renders the single-URL tester (input, button, result card).
+    """
+    colA, colB = st.columns([3, 1])
+    with colA:
+        api_url = st.text_input(
+            "Website URL to test",
+            placeholder="https://example.com",
+            key="api_url_input"
+        )
+    with colB:
+        st.write("")
+        st.write("")
+        run_live = st.button("Call API", key="api_call_button", use_container_width=True)
+
+    if run_live:
+        if not api_url.strip():
+            st.error("Please enter a valid URL.")
+        else:
+            start = time.time()
+            with st.spinner("Calling FraudShield API…"):
+                api_result, cached = scan_verdict(api_url)
+            elapsed_ms = (time.time() - start) * 1000.0
+
+            if not api_result:
+                update_log(st.session_state, api_url, "API_ERROR", latency_ms=elapsed_ms)
+                st.error("API call failed. Please verify the backend is reachable.")
+            else:
+                # Basic extract for display
+                risk_class = api_result.get("risk_class", "Unknown")
+                risk_score = float(api_result.get("risk_score", 0))
+                blacklist_flag = api_result.get("blacklist_flag", 0)
+                update_log(
+                    st.session_state,
+                    api_url,
+                    "Blacklisted" if blacklist_flag else risk_class,
+                    risk_score,
+                    elapsed_ms,
+                    cached,
+                )
+
+                label, color = map_risk_style(risk_class, blacklist_flag)
+                latency = "cached verdict (no API call)" if cached else f"{elapsed_ms:.0f} ms"
+
+                # Summary card
+                st.markdown(
+                    f"""
+<div style="
+    border:1px solid #e2e6ea;
+    border-left:6px solid {color};
+    border-radius:10px;
+    padding:14px 16px;
+    background:#ffffff;
+    margin-top:10px;">
+    <div style="font-size:16px; font-weight:700; margin-bottom:6px;">API Result Summary</div>
+    <div style="font-size:14px;">
+        <strong>URL:</strong> {api_url}<br>
+        <strong>Classification:</strong> <span style="color:{color}; font-weight:700;">{label}</span><br>
+        <strong>Risk Score:</strong> <span style="font-weight:700;">{risk_score:.2f}%</span><br>
+        <strong>Latency:</strong> {latency}
+    </div>
+</div>
+                    """,
+                    unsafe_allow_html=True
+                )
+
+                st.markdown("#### Raw API Response (JSON)")
+                st.json(api_result)
+
+                st.download_button(
+                    "📄 Download PDF Report",
+                    lambda: render_cached_report(
+                        api_url, risk_class, risk_score, dict(api_result.get("signals") or {}, blacklist_flag=blacklist_flag)
+                    ),
+                    file_name="fraudshield_report.pdf",
+                    mime="application/pdf",
+                    on_click="ignore",
+                    key="api_pdf_report",
+                )
+
+
+# ---------------------------------------------------------
+# 2) BATCH SCAN DEMO
+# ---------------------------------------------------------
+@st.fragment
+def render_batch_scanner():
+    """
+    Renders the batch scanner (URL list, button, results table).
+    """
+    batch_text = st.text_area(
+        "Paste URLs (one per line)",
+        placeholder="https://example.com\nhttps://another-site.com\nhttps://shop.example.org",
+        height=140,
+        key="batch_urls"
+    )
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        run_batch = st.button("Run Batch Scan", use_container_width=True, key="run_batch_scan")
+    with col2:
+        dedupe = st.checkbox(
+            "Scan each registrable domain once",
+            value=True,
+            key="batch_dedupe",
+            help="Verdicts are domain-level, so product pages on one shop share a single API call.",
+        )
+    with col3:
+        deadline_s = st.number_input(
+            "Deadline (s)",
+            min_value=1.0,
+            max_value=600.0,
+            value=BATCH_DEADLINE_S,
+            step=5.0,
+            key="batch_deadline",
+            help="Upper bound on the batch's wall time. URLs still unanswered then are marked TIMEOUT.",
+        )
+    window = st.empty()
+    window.caption(f"Adaptive concurrency window: {get_shared_resources().concurrency.describe()}")
+
+    if run_batch:
+        urls = [u.strip() for u in batch_text.splitlines() if u.strip()]
+        if len(urls) == 0:
+            st.error("Please paste at least one URL.")
+        else:
+            plan = BatchPlan(urls[:50], key=registrable_domain if dedupe else None)  # safety cap for demos
+            started = time.perf_counter()
+            scanned = scan_with_live_table(plan.scan_urls, Deadline(deadline_s))
+            elapsed = time.perf_counter() - started
+            results = plan.fan_out(scanned)
+            window.caption(f"Adaptive concurrency window: {get_shared_resources().concurrency.describe()}")
+
+            exporters = {fmt: BatchResultExporter(fmt) for fmt in EXPORT_FORMATS}
+            for exporter in exporters.values():
+                exporter.add_batch(results)
+
+            st.dataframe(results.to_frame(), use_container_width=True)
+            st.caption(
+                f"{plan.calls - scanned.cached} API calls for {len(results)} URLs in {elapsed:.1f} s · "
+                f"{plan.calls_saved} calls saved by registrable-domain de-duplication."
+                + (f" {scanned.cached} verdicts served from the cache (not timed)." if scanned.cached else "")
+            )
+            if scanned.timed_out:
+                st.warning(
+                    f"The {deadline_s:.0f} s deadline was reached: {scanned.timed_out} of {plan.calls} API calls "
+                    "had no verdict and are marked TIMEOUT. The other results are complete."
+                )
+
+            render_export_buttons(
+                lambda fmt: exporters[fmt].finish(),
+                "fraudshield_batch_results",
+                key="batch",
+            )
+            render_report_buttons(lambda: results, "fraudshield_batch_reports", key="batch")
+
+
+BATCH_RENDER_INTERVAL_S = 0.25
+PENDING_LABEL = "⏳ Pending"
+
+
+def scan_with_live_table(urls, deadline: Deadline = None) -> ScanResultBatch:
+    """
+    Scans ``urls`` through the shared adaptive concurrency window while
+    a live table fills in row by row, with running tier counts,
+    throughput, ETA and the current window. The first row shows as
+    soon as the first response arrives; later redraws are throttled to
+    one per BATCH_RENDER_INTERVAL_S. Returns the results in input order
+    and clears the live view. With a deadline, the scan stops when it
+    expires and URLs without a verdict become TIMEOUT rows.
+    """
+    total = len(urls)
+    table = pd.DataFrame({"url": urls, "risk_class": PENDING_LABEL, "risk_score_%": np.nan, "latency_ms": np.nan})
+    progress, counts, view = st.empty(), st.empty(), st.empty()
+    results = [None] * total
+    tiers = Counter()
+    cached = 0
+    controller = get_shared_resources().concurrency
+    started = time.perf_counter()
+    last_render = -math.inf
+
+    def render(done: int):
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = (total - done) / rate if rate else None
+        progress.progress(
+            done / total,
+            text=(
+                f"{done}/{total} scanned · {rate:.1f} URLs/s · ETA {_format_eta(eta)} · window {controller.window}"
+                + (f" · deadline in {deadline.remaining():.0f} s" if deadline is not None else "")
+            ),
+        )
+        parts = [f"{label}: {tiers[label]}" for label in LABELS if tiers[label]]
+        if cached:
+            parts.append(f"from cache: {cached}")
+        counts.caption(" · ".join(parts))
+        view.dataframe(table, use_container_width=True)
+
+    render(0)
+    scan = partial(scan_batch_result, deadline=deadline)
+    for done, (index, result) in enumerate(iter_completed(urls, scan, controller, deadline), 1):
+        results[index] = result
+        log_batch_result(st.session_state, result)
+        row = result.to_row()
+        for column in ("risk_class", "risk_score_%", "latency_ms"):
+            table.at[index, column] = row[column]
+        tiers[row["risk_class"]] += 1
+        cached += result.cached
+
+        now = time.perf_counter()
+        if done == 1 or done == total or now - last_render >= BATCH_RENDER_INTERVAL_S:
+            render(done)
+            last_render = now
+
+    for placeholder in (progress, counts, view):
+        placeholder.empty()
+    return ScanResultBatch.from_results(
+        [result or ScanResult.failed(url, DEADLINE_EXCEEDED) for url, result in zip(urls, results)]
+    )
+
+
+def render_export_buttons(build, file_stem: str, key: str):
+    """
+    Renders one download button per export format. ``build(fmt)`` must
+    return a finished, rewound spool; it is only called when the user
+    clicks, and the download is served straight from the spooled file.
+    """
+    for col, fmt in zip(st.columns(len(EXPORT_FORMATS)), EXPORT_FORMATS):
+        label, mime, extension = EXPORT_FORMATS[fmt]
+        with col:
+            st.download_button(
+                f"⬇️ Download Results ({label})",
+                lambda fmt=fmt: build(fmt),
+                file_name=f"{file_stem}.{extension}",
+                mime=mime,
+                on_click="ignore",
+                use_container_width=True,
+                key=f"download_{key}_{fmt}",
+            )
+
+
+def render_report_buttons(get_rows, file_stem: str, key: str):
+    """
+    Renders bulk PDF report downloads (one PDF per row, or consolidated
+    multi-page reports). Reports render across a process pool only when
+    the user clicks, and are served as a ZIP from a spooled temp file.
+    """
+    modes = (("per_row", "PDF Report per URL", False), ("consolidated", "Consolidated PDF Report", True))
+    for col, (mode, label, consolidated) in zip(st.columns(len(modes)), modes):
+        with col:
+            st.download_button(
+                f"📄 {label} (ZIP)",
+                lambda consolidated=consolidated: generate_bulk_reports_zip(get_rows(), consolidated),
+                file_name=f"{file_stem}_{mode}.zip",
+                mime="application/zip",
+                on_click="ignore",
+                use_container_width=True,
+                key=f"reports_{key}_{mode}",
+            )
+
+
+# ---------------------------------------------------------
+# 3) LARGE FILE BATCH SCAN (STREAMING + RESUMABLE)
+# ---------------------------------------------------------
+@st.fragment
+def render_file_batch_scanner():
+    """
+    Renders the file-upload batch scanner. The upload is parsed as a
+    stream in de-duplicated chunks; progress is checkpointed to disk
+    after every chunk, so re-uploading the same file resumes the run.
+    """
+    uploaded = st.file_uploader(
+        "Upload URL inventory (CSV or TXT, optionally .gz)",
+        type=["csv", "txt", "gz"],
+        key="batch_file_upload",
+    )
+    if uploaded is None:
+        return
+
+    dedupe = st.checkbox(
+        "Scan each registrable domain once",
+        value=True,
+        key="file_batch_dedupe",
+        help="Verdicts are domain-level, so product pages on one shop share a single API call.",
+    )
+
+    # The mode is part of the checkpoint key: resuming a run with the other
+    # setting would mix domain-level and per-URL rows in one result file.
+    fingerprint = fingerprint_upload(uploaded)
+    checkpoint = BatchCheckpoint(fingerprint if dedupe else f"{fingerprint}-per-url", uploaded.name)
+
+    if checkpoint.complete:
+        st.success(f"Scan complete: {checkpoint.rows_done:,} unique URLs scanned.")
+    elif checkpoint.rows_done:
+        st.info(f"Checkpoint found: {checkpoint.rows_done:,} URLs already scanned. The next run resumes from there.")
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        run_file = st.button(
+            "Resume File Scan" if checkpoint.rows_done and not checkpoint.complete else "Run File Scan",
+            use_container_width=True,
+            key="run_file_scan",
+            disabled=checkpoint.complete,
+        )
+    with col2:
+        if st.button("Discard Checkpoint", use_container_width=True, key="discard_file_scan"):
+            checkpoint.discard()
+            st.rerun(scope="fragment")
+
+    if run_file:
+        progress = st.progress(upload_progress(uploaded, uploaded.size), text="Starting…")
+        rows_this_run = 0
+        started = time.time()
+
+        with checkpoint.open_results() as results_file:
+            for index, chunk in enumerate(iter_url_chunks(uploaded, uploaded.name)):
+                if index < checkpoint.chunks_done:
+                    continue
+
+                plan = BatchPlan(chunk, key=registrable_domain if dedupe else None)
+                scanned = ScanResultBatch.from_results([scan_batch_result(u, st.session_state) for u in plan.scan_urls])
+                results = plan.fan_out(scanned)
+                checkpoint.commit_chunk(results_file, results.iter_rows(), plan.calls_saved)
+
+                rows_this_run += len(results)
+                rate = rows_this_run / max(time.time() - started, 1e-6)
+                progress.progress(
+                    upload_progress(uploaded, uploaded.size),
+                    text=(
+                        f"{checkpoint.rows_done:,} URLs scanned · {rate:.1f} URLs/s · "
+                        f"{checkpoint.calls_saved:,} calls saved"
+                    ),
+                )
+
+        checkpoint.mark_complete()
+        progress.progress(1.0, text=f"Done · {checkpoint.rows_done:,} URLs scanned")
+
+    if checkpoint.rows_done:
+        preview = pd.DataFrame(itertools.islice(checkpoint.iter_results(), 1000))
+        st.dataframe(preview, use_container_width=True)
+        st.caption(
+            f"Showing the first {len(preview):,} of {checkpoint.rows_done:,} results · "
+            f"{checkpoint.calls_saved:,} API calls saved by registrable-domain de-duplication."
+        )
+
+        # Exports stream from the checkpoint file on click, so large runs
+        # are never materialized in memory.
+        render_export_buttons(
+            lambda fmt: export_rows(checkpoint.iter_results(), fmt).finish(),
+            "fraudshield_file_scan_results",
+            key="file_scan",
+        )
+        render_report_buttons(checkpoint.iter_results, "fraudshield_file_scan_reports", key="file_scan")
+
+# ---------------------------------------------------------
+# 4) SESSION SCAN HISTORY
+# ---------------------------------------------------------
+@st.fragment
+def render_scan_history():
+    """
+    Renders the bounded scan history kept for this session.
+    """
+    history = st.session_state.get("history")
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.button("Refresh History", use_container_width=True, key="refresh_history")
+    with col2:
+        st.caption("Scans made from the API Explorer are kept in a fixed-size buffer for this session.")
+
+    if history is None or len(history) == 0:
+        st.info("No scans recorded in this session yet.")
+        return
+
+    counts = history.result_counts()
+    st.bar_chart(counts[counts > 0])
+
+    df = history.to_frame(with_urls=True).drop(columns="url_id")
+    st.dataframe(df.iloc[::-1], use_container_width=True, hide_index=True)
+    st.caption(
+        f"Showing {len(history)} of {history.total_appended} scans "
+        f"(capacity {history.capacity})."
+    )
+
+
+# ---------------------------------------------------------
+# 5) LATENCY DISTRIBUTION (p50 / p90 / p99 / max)
+# ---------------------------------------------------------
+@st.fragment
+def render_latency_panel():
+    """
+    Renders percentiles, error rate and the latency distribution of
+    every scan recorded in this session's histogram.
+    """
+    hist = st.session_state.get("latency")
+
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.button("Refresh Latency", use_container_width=True, key="refresh_latency")
+    with col2:
+        st.caption(
+            "Every backend call made from the dashboard is recorded in a fixed-size, log-bucketed histogram. "
+            "Verdicts served from the cache are counted separately."
+        )
+
+    cache_hits = st.session_state.get("cache_hits", 0)
+    if hist is None or hist.total == 0:
+        st.info("No backend calls recorded in this session yet.")
+        if cache_hits:
+            st.caption(f"{cache_hits:,} verdicts served from the cache")
+        return
+
+    p = hist.percentiles((50, 90, 99))
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("p50", f"{p[50]:.0f} ms")
+    c2.metric("p90", f"{p[90]:.0f} ms")
+    c3.metric("p99", f"{p[99]:.0f} ms")
+    c4.metric("max", f"{hist.max_value:.0f} ms")
+    c5.metric("Error rate", f"{hist.error_rate:.1%}")
+
+    buckets = hist.to_frame()
+    fig = go.Figure(
+        go.Bar(
+            x=(buckets["lower_ms"] * buckets["upper_ms"]) ** 0.5,
+            y=buckets["count"],
+            width=buckets["upper_ms"] - buckets["lower_ms"],
+            marker_color="#2563eb",
+            hovertemplate="%{x:.0f} ms: %{y} scans<extra></extra>",
+        )
+    )
+    for q, color in ((50, "#16a34a"), (90, "#ea580c"), (99, "#b91c1c")):
+        fig.add_vline(x=p[q], line_dash="dash", line_color=color, annotation_text=f"p{q}")
+    fig.update_layout(
+        xaxis=dict(title="Latency (ms, log scale)", type="log"),
+        yaxis=dict(title="Scans"),
+        height=320,
+        margin=dict(l=20, r=20, t=20, b=40),
+        bargap=0,
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(
+        f"{hist.total:,} scans recorded · {hist.errors:,} errors · mean {hist.mean:.0f} ms · "
+        f"{cache_hits:,} verdicts served from the cache (not included)"
+    )
+
+
+# ---------------------------------------------------------
+# 6) BACKGROUND JOB QUEUE (NIGHTLY BATCH VERIFICATION)
+# ---------------------------------------------------------
+@st.fragment
+def render_job_queue():
+    """
+    Renders the durable job queue: enqueue form, worker controls, live
+    status and result downloads. Workers run in the server process and
+    keep going across reruns; queued jobs survive restarts.
+    """
+    pool = get_shared_resources().worker_pool
+    queue = pool.queue
+
+    queue_text = st.text_area(
+        "URLs to enqueue (one per line)",
+        placeholder="https://new-profile-link.com\nhttps://updated-shop.example.org",
+        height=120,
+        key="queue_urls",
+    )
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        if st.button("Enqueue for Tonight's Batch", use_container_width=True, key="queue_enqueue"):
+            urls = [u.strip() for u in queue_text.splitlines() if u.strip()]
+            added = queue.enqueue(urls)
+            st.success(f"Enqueued {added} new URLs ({len(urls) - added} already in this batch).")
+    with col2:
+        if pool.running:
+            if st.button("Stop Workers", use_container_width=True, key="queue_stop"):
+                pool.stop(wait=False)
+                st.rerun(scope="fragment")
+        elif st.button(f"Start Workers ({pool.workers})", use_container_width=True, key="queue_start"):
+            pool.start()
+            st.rerun(scope="fragment")
+    with col3:
+        if st.button("Retry Failed Jobs", use_container_width=True, key="queue_retry"):
+            st.info(f"Requeued {queue.retry_failed()} failed jobs.")
+    with col4:
+        if st.button("Schedule Re-scan Cycle", use_container_width=True, key="queue_schedule"):
+            summary = schedule_cycle(queue)
+            st.info(
+                f"{summary['due']:,} of {summary['inventory']:,} stored verdicts are stale; "
+                f"enqueued {summary['enqueued']:,} into {summary['batch']}."
+            )
+
+    render_job_queue_status()
+
+    batches = queue.batches()
+    if batches:
+        batch = st.selectbox("Download results for batch", [b[0] for b in batches], key="queue_batch")
+        render_export_buttons(
+            lambda fmt: export_rows(queue.iter_result_rows(batch), fmt).finish(),
+            f"fraudshield_queue_{batch}",
+            key="queue",
+        )
+
+
+@st.fragment(run_every=5)
+def render_job_queue_status():
+    """
+    Queue depth, throughput and ETA; refreshes itself every few seconds.
+    """
+    pool = get_shared_resources().worker_pool
+    stats = pool.queue.stats()
+
+    c1, c2, c3, c4, c5 = st.columns(5)
+    c1.metric("Queue depth", f"{stats['depth']:,}")
+    c2.metric("Done", f"{stats['done']:,}")
+    c3.metric("Failed", f"{stats['failed']:,}")
+    c4.metric("Throughput", f"{stats['throughput_per_s'] * 60:.0f}/min")
+    c5.metric("ETA", _format_eta(stats["eta_s"]))
+
+    batches = pool.queue.batches()
+    if batches:
+        st.dataframe(
+            pd.DataFrame(
+                [(b, total, done or 0, failed or 0, pd.to_datetime(enq, unit="s")) for b, total, done, failed, enq in batches],
+                columns=["Batch", "Jobs", "Done", "Failed", "Enqueued (UTC)"],
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+    st.caption(f"Workers {'running' if pool.running else 'stopped'} · status refreshes every 5 s.")
+
+
+def _format_eta(seconds) -> str:
+    if seconds is None:
+        return "—"
+    if seconds < 90:
+        return f"{seconds:.0f} s"
+    if seconds < 5400:
+        return f"{seconds / 60:.0f} min"
+    return f"{seconds / 3600:.1f} h"
+
+
+# ---------------------------------------------------------
+# 7) AUDIT LOG SEARCH (COMPACTED PARQUET STORE)
+# ---------------------------------------------------------
+AUDIT_TIERS = ("Safe", "Low Risk", "Suspicious", "High Risk", "Unknown")
+
+
+@st.fragment
+def render_audit_search():
+    """
+    Searches the compacted audit log by date range, domain suffix and
+    risk tier. Only matching partitions and row groups are read.
+    """
+    today = pd.Timestamp.utcnow().date()
+    col1, col2, col3 = st.columns([2, 2, 3])
+    with col1:
+        dates = st.date_input("Date range", (today - pd.Timedelta(days=7), today), key="audit_dates")
+    with col2:
+        suffix = st.text_input("Domain or suffix", placeholder=".xyz", key="audit_suffix")
+    with col3:
+        tiers = st.multiselect("Risk tiers", AUDIT_TIERS, default=["Suspicious", "High Risk"], key="audit_tiers")
+
+    col1, col2, col3 = st.columns([1, 1, 3])
+    with col1:
+        limit = st.number_input("Max rows", min_value=100, max_value=100_000, value=1_000, step=100, key="audit_limit")
+    with col2:
+        if st.button("Compact now", use_container_width=True, key="audit_compact"):
+            summary = audit_store.compact_segments()
+            st.info(f"Compacted {summary['rows']:,} entries from {summary['segments']} segments in {summary['seconds']} s.")
+
+    start, end = (tuple(dates) + (None, None))[:2] if isinstance(dates, (tuple, list)) else (dates, dates)
+    t0 = time.perf_counter()
+    df = audit_store.query_audit(start, end or start, suffix.strip() or None, tiers or None, limit=int(limit))
+    elapsed = time.perf_counter() - t0
+
+    if df.empty:
+        st.info(
+            "No audit entries match. Only sealed audit segments are compacted; a segment is sealed once it is "
+            f"{SEGMENT_MAX_AGE_S / 3600:.0f} h old or {SEGMENT_MAX_BYTES // 2**20} MB, so the newest verdicts "
+            "can take that long to appear here."
+        )
+        return
+    st.dataframe(df, use_container_width=True, hide_index=True)
+    st.caption(f"{len(df):,} entries (newest first) · query {elapsed * 1000:.0f} ms")
+
+
+# ---------------------------------------------------------
+# 8) RISK TRENDS (PRE-AGGREGATED ROLLUPS)
+# ---------------------------------------------------------
+TIER_COLORS = {"Safe": "#16a34a", "Low Risk": "#65a30d", "Suspicious": "#ea580c", "High Risk": "#b91c1c", "Unknown": "#94a3b8"}
+TREND_WINDOWS = {"Last 48 hours (hourly)": ("hour", 48), "Last 7 days (hourly)": ("hour", 168), "Last 30 days (daily)": ("day", 30), "Last 90 days (daily)": ("day", 90)}
+
+
+@st.fragment(run_every=10)
+def render_risk_trends():
+    """
+    Tier mix, mean score, error rate and latency percentiles per hour or
+    day, read from the incrementally maintained rollups. Rendering cost
+    depends only on the window length, not on the number of scans.
+    """
+    window = st.radio("Window", list(TREND_WINDOWS), horizontal=True, key="trend_window")
+    resolution, periods = TREND_WINDOWS[window]
+    df = get_shared_resources().rollups.to_frame(resolution, periods)
+
+    verdicts = int(df["verdicts"].sum())
+    requests_ = int(df["requests"].sum())
+    scored = df["mean_score"].notna()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Verdicts", f"{verdicts:,}")
+    c2.metric("High Risk share", f"{df['High Risk'].sum() / verdicts:.1%}" if verdicts else "—")
+    c3.metric("Mean score", f"{(df['mean_score'][scored] * df['verdicts'][scored]).sum() / verdicts:.1f}" if verdicts else "—")
+    c4.metric("Error rate", f"{df['errors'].sum() / requests_:.1%}" if requests_ else "—")
+
+    if verdicts == 0 and requests_ == 0:
+        st.info("No scans recorded in this window yet. Trends fill in as scans run (dashboard, CLI or job queue).")
+        return
+
+    layout = dict(height=280, margin=dict(l=20, r=20, t=30, b=30), legend=dict(orientation="h", y=1.15))
+    fig = go.Figure([go.Bar(x=df["period"], y=df[tier], name=tier, marker_color=TIER_COLORS[tier]) for tier in TIERS])
+    fig.update_layout(barmode="stack", yaxis=dict(title="Verdicts"), **layout)
+    st.plotly_chart(fig, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig = go.Figure(
+            [
+                go.Scatter(x=df["period"], y=df["mean_score"], name="Mean score", line_color="#2563eb"),
+                go.Scatter(x=df["period"], y=df["error_rate"] * 100, name="Error rate %", line_color="#b91c1c", yaxis="y2"),
+            ]
+        )
+        fig.update_layout(yaxis=dict(title="Score"), yaxis2=dict(title="Errors %", overlaying="y", side="right"), **layout)
+        st.plotly_chart(fig, use_container_width=True)
+    with col2:
+        fig = go.Figure(
+            [
+                go.Scatter(x=df["period"], y=df[f"p{q}_ms"], name=f"p{q}", line_color=color)
+                for q, color in ((50, "#16a34a"), (90, "#ea580c"), (99, "#b91c1c"))
+            ]
+        )
+        fig.update_layout(yaxis=dict(title="Latency (ms)", type="log"), **layout)
+        st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{requests_:,} backend calls in this window · refreshes every 10 s.")
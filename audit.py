@@ -0,0 +1,339 @@
+"""
+Append-only audit log of scan decisions.
+
+Every verdict returned by the backend becomes one ``log_entry`` (the
+schema in the Auditability section: timestamp, domain, risk score and
+class, confidence, model and policy version, signals), written as JSONL
+into segment files under DATA_DIR/audit.
+
+Scan threads only hand the raw response to a bounded in-memory queue;
+a background flusher builds the entries, writes each drained group with
+a single fsync (group commit) and rotates segments by size and age. If
+the queue is full the entry is dropped and counted rather than making
+the scan wait. A failed write (disk full, directory removed) is logged
+and counted, the segment is abandoned and the group is retried in a
+fresh one; after COMMIT_ATTEMPTS failures the group is dropped and
+counted, and the flusher keeps running. Active segments end in ``.open`` and are renamed to
+``.jsonl`` once sealed, so readers only ever see complete files.
+
+Entry points (dashboard, CLI) call install(); set FRAUDSHIELD_AUDIT=0
+to disable.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+from metrics import counter
+from utils import DATA_DIR, add_decision_listener
+
+AUDIT_DIR = os.path.join(DATA_DIR, "audit")
+AUDIT_ENABLED = os.environ.get("FRAUDSHIELD_AUDIT", "1") != "0"
+
+MODEL_VERSION = os.environ.get("FRAUDSHIELD_MODEL_VERSION", "unknown")
+POLICY_VERSION = os.environ.get("FRAUDSHIELD_POLICY_VERSION", "unknown")
+
+BUFFER_ENTRIES = 50_000
+COMMIT_INTERVAL_S = 0.05
+MAX_GROUP_ENTRIES = 5_000
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+SEGMENT_MAX_AGE_S = 3600.0
+COMMIT_ATTEMPTS = 3
+COMMIT_RETRY_S = 0.5  # times the attempt number
+
+EXPECTED_SIGNALS = ("domain_age_days", "https_flag", "hsts_flag", "csp_flag", "mixed_content_ratio")
+
+AUDIT_ENTRIES = counter("fraudshield_audit_entries_total", "Audit log entries by outcome.", ("result",))
+AUDIT_COMMITS = counter("fraudshield_audit_commits_total", "Audit group commits (one fsync each).")
+AUDIT_WRITE_ERRORS = counter("fraudshield_audit_write_errors_total", "Failed audit segment writes (OSError).")
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------
+# 1) LOG ENTRY (AUDITABILITY SCHEMA)
+# ---------------------------------------------------------
+def normalize_domain(url: str) -> str:
+    """
+    Lower-cased host without a leading ``www.``.
+    """
+    try:
+        host = urlsplit(url if "://" in url else f"http://{url}").hostname or url
+    except ValueError:
+        host = url
+    host = host.rstrip(".").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def signal_confidence(signals: dict) -> str:
+    """
+    HIGH / MEDIUM / LOW from the share of expected signals present
+    (the Confidence Handling thresholds).
+    """
+    signals = signals or {}
+    coverage = sum(signals.get(name) is not None for name in EXPECTED_SIGNALS) / len(EXPECTED_SIGNALS)
+    if coverage < 0.60:
+        return "LOW"
+    if coverage < 0.85:
+        return "MEDIUM"
+    return "HIGH"
+
+
+def build_log_entry(ts: float, url: str, response: dict) -> dict:
+    signals = dict(response.get("signals") or {})
+    signals["blacklist_flag"] = int(response.get("blacklist_flag", 0) or 0)
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(ts)) + f".{int(ts % 1 * 1000):03d}Z",
+        "domain": normalize_domain(url),
+        "risk_score": float(response.get("risk_score", 0) or 0),
+        "risk_class": response.get("risk_class", "Unknown"),
+        "confidence": response.get("confidence") or signal_confidence(response.get("signals")),
+        "model_version": response.get("model_version", MODEL_VERSION),
+        "policy_version": response.get("policy_version", POLICY_VERSION),
+        "signals": signals,
+    }
+
+
+# ---------------------------------------------------------
+# 2) WRITER — BOUNDED BUFFER + BACKGROUND GROUP COMMIT
+# ---------------------------------------------------------
+class AuditWriter:
+    """
+    Background JSONL segment writer. ``submit`` never blocks; everything
+    else happens on the flusher thread.
+    """
+
+    def __init__(
+        self,
+        directory: str = AUDIT_DIR,
+        buffer_entries: int = BUFFER_ENTRIES,
+        commit_interval_s: float = COMMIT_INTERVAL_S,
+        segment_max_bytes: int = SEGMENT_MAX_BYTES,
+        segment_max_age_s: float = SEGMENT_MAX_AGE_S,
+    ):
+        self.directory = directory
+        self.commit_interval_s = commit_interval_s
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_age_s = segment_max_age_s
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.Queue(maxsize=buffer_entries)
+        self._stop = threading.Event()
+        self._segment = None
+        self._segment_path = None
+        self._segment_opened = 0.0
+        self._seq = 0
+        self._written_metric = AUDIT_ENTRIES.labels("written")
+        self._dropped_metric = AUDIT_ENTRIES.labels("dropped")
+
+        self._seal_leftovers()
+        self._thread = threading.Thread(target=self._run, name="fraudshield-audit", daemon=True)
+        self._thread.start()
+
+    def submit(self, url: str, response: dict, ts: float = None) -> bool:
+        """
+        Queues one decision for the log. Returns False (and counts a
+        drop) if the buffer is full.
+        """
+        try:
+            self._queue.put_nowait((ts or time.time(), url, response))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            self._dropped_metric.inc()
+            return False
+
+    # -----------------------------------------------------
+    # Flusher thread
+    # -----------------------------------------------------
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.commit_interval_s * 10)
+            except queue.Empty:
+                self._guarded(self._maybe_rotate)
+                if self._stop.is_set():
+                    break
+                continue
+
+            group = [first]
+            while len(group) < MAX_GROUP_ENTRIES:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._commit(group)
+
+            if self._queue.empty():
+                if self._stop.is_set():
+                    break
+                # Let the next group accumulate instead of fsyncing per entry.
+                self._stop.wait(self.commit_interval_s)
+        self._guarded(self._seal)
+
+    def _commit(self, group):
+        lines = []
+        for ts, url, response in group:
+            try:
+                lines.append(json.dumps(build_log_entry(ts, url, response), separators=(",", ":")))
+            except (TypeError, ValueError, AttributeError):
+                self.dropped += 1
+                self._dropped_metric.inc()
+        if not lines:
+            return
+
+        for attempt in range(1, COMMIT_ATTEMPTS + 1):
+            if self._guarded(self._write, lines):
+                return
+            if attempt < COMMIT_ATTEMPTS:
+                time.sleep(COMMIT_RETRY_S * attempt)
+        self.dropped += len(lines)
+        self._dropped_metric.inc(len(lines))
+        log.error("audit: dropped %d entries after %d failed commits", len(lines), COMMIT_ATTEMPTS)
+
+    def _guarded(self, step, *args) -> bool:
+        """
+        Runs one segment operation; an OSError is logged and counted and
+        the active segment abandoned, so the next write opens a new one.
+        """
+        try:
+            step(*args)
+            return True
+        except OSError as exc:
+            self.write_errors += 1
+            AUDIT_WRITE_ERRORS.inc()
+            log.warning("audit: %s failed: %s", step.__name__.strip("_"), exc)
+            self._abandon_segment()
+            return False
+
+    def _write(self, lines):
+        self._maybe_rotate()
+        if self._segment is None:
+            self._open_segment()
+        self._segment.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self._segment.flush()
+        os.fsync(self._segment.fileno())
+
+        self.written += len(lines)
+        self._written_metric.inc(len(lines))
+        AUDIT_COMMITS.inc()
+
+    # -----------------------------------------------------
+    # Segments
+    # -----------------------------------------------------
+    def _open_segment(self):
+        self._seq += 1
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        self._segment_path = os.path.join(self.directory, f"audit-{stamp}-{os.getpid()}-{self._seq:04d}.jsonl.open")
+        self._segment = open(self._segment_path, "ab")
+        self._segment_opened = time.monotonic()
+
+    def _maybe_rotate(self):
+        if self._segment is None:
+            return
+        too_big = self._segment.tell() >= self.segment_max_bytes
+        too_old = time.monotonic() - self._segment_opened >= self.segment_max_age_s
+        if too_big or too_old:
+            self._seal()
+
+    def _seal(self):
+        if self._segment is None:
+            return
+        self._segment.flush()
+        os.fsync(self._segment.fileno())
+        self._segment.close()
+        os.replace(self._segment_path, self._segment_path[: -len(".open")])
+        self._segment = None
+        self._segment_path = None
+
+    def _abandon_segment(self):
+        # Seal what can be sealed; a torn last line is skipped by readers.
+        segment, path = self._segment, self._segment_path
+        self._segment = None
+        self._segment_path = None
+        if segment is None:
+            return
+        try:
+            segment.close()
+            os.replace(path, path[: -len(".open")])
+        except OSError:
+            pass
+
+    def _seal_leftovers(self):
+        # Seal segments whose writer process is gone (crash or kill); a
+        # torn last line is skipped by readers.
+        for name in os.listdir(self.directory):
+            if not name.endswith(".jsonl.open"):
+                continue
+            pid = name.split("-")[2] if name.count("-") >= 3 else ""
+            if pid.isdigit() and _pid_alive(int(pid)):
+                continue
+            path = os.path.join(self.directory, name)
+            os.replace(path, path[: -len(".open")])
+
+    def close(self, timeout: float = 10.0):
+        """
+        Flushes everything queued so far, seals the segment and stops.
+        """
+        self._stop.set()
+        self._thread.join(timeout)
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def iter_sealed_segments(directory: str = AUDIT_DIR):
+    """
+    Paths of sealed segments, oldest first.
+    """
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(".jsonl"))
+
+
+_WRITER = None
+_WRITER_LOCK = threading.Lock()
+
+
+def get_audit_writer():
+    """
+    Returns the process-wide writer (started on first use, flushed at
+    exit), or None when auditing is disabled.
+    """
+    global _WRITER
+    if not AUDIT_ENABLED:
+        return None
+    if _WRITER is None:
+        with _WRITER_LOCK:
+            if _WRITER is None:
+                _WRITER = AuditWriter()
+                atexit.register(_WRITER.close)
+    return _WRITER
+
+
+def install():
+    """
+    Routes every backend verdict (utils decision listener) into the
+    process-wide audit writer. Returns the writer, or None if disabled.
+    """
+    writer = get_audit_writer()
+    if writer is not None:
+        add_decision_listener(writer.submit)
+    return writer
@@ -0,0 +1,341 @@
+"""
+Columnar audit-log store: compaction to partitioned Parquet plus queries.
+
+Sealed audit segments (audit.py) are compacted into
+
+    DATA_DIR/audit_parquet/date=YYYY-MM-DD/risk_class=<tier>/part-<run>.parquet
+
+Rows in each file are sorted by ``domain_rev`` (the domain with its
+labels reversed, e.g. ``xyz.newtechstore``), so a domain-suffix filter
+becomes a prefix range whose min/max statistics skip whole row groups.
+Date and tier filters prune directories before any file is opened.
+Compaction (including crash recovery) and purging hold an exclusive
+lock on ``_runs/compact.lock``, so the dashboard and the CLI never
+compact at the same time.
+
+    python -m fraudshield audit compact
+    python -m fraudshield audit query --since 2026-10-12 --suffix .xyz --tier Suspicious
+"""
+import contextlib
+import datetime as dt
+import fcntl
+import io
+import json
+import os
+import shutil
+import time
+from urllib.parse import quote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.json as pj
+import pyarrow.parquet as pq
+
+from audit import AUDIT_DIR, iter_sealed_segments
+from utils import DATA_DIR
+
+STORE_DIR = os.path.join(DATA_DIR, "audit_parquet")
+RUNS_DIR = os.path.join(STORE_DIR, "_runs")
+LOCK_PATH = os.path.join(RUNS_DIR, "compact.lock")
+COMPACTED_DIR = os.path.join(AUDIT_DIR, "compacted")
+
+ROW_GROUP_ROWS = 64_000
+RUN_MAX_BYTES = 256 * 1024 * 1024
+
+AUDIT_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.timestamp("ms", tz="UTC")),
+        ("domain", pa.string()),
+        ("domain_rev", pa.string()),
+        ("risk_score", pa.float32()),
+        ("confidence", pa.dictionary(pa.int8(), pa.string())),
+        ("model_version", pa.dictionary(pa.int8(), pa.string())),
+        ("policy_version", pa.dictionary(pa.int8(), pa.string())),
+        ("domain_age_days", pa.int32()),
+        ("https_flag", pa.int8()),
+        ("hsts_flag", pa.int8()),
+        ("csp_flag", pa.int8()),
+        ("mixed_content_ratio", pa.float32()),
+        ("blacklist_flag", pa.int8()),
+    ]
+)
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string()), ("risk_class", pa.string())]), flavor="hive")
+
+SIGNAL_COLUMNS = ("domain_age_days", "https_flag", "hsts_flag", "csp_flag", "mixed_content_ratio", "blacklist_flag")
+
+
+def reverse_domain(domain: str) -> str:
+    """
+    ``shop.example.xyz`` → ``xyz.example.shop``.
+    """
+    return ".".join(reversed(domain.strip(".").lower().split(".")))
+
+
+# ---------------------------------------------------------
+# 1) COMPACTION — SEALED JSONL SEGMENTS → PARQUET PARTITIONS
+# ---------------------------------------------------------
+_JSON_SCHEMA = pa.schema(
+    [
+        ("timestamp", pa.string()),
+        ("domain", pa.string()),
+        ("risk_score", pa.float64()),
+        ("risk_class", pa.string()),
+        ("confidence", pa.string()),
+        ("model_version", pa.string()),
+        ("policy_version", pa.string()),
+        ("signals", pa.struct([(name, pa.float64()) for name in SIGNAL_COLUMNS])),
+    ]
+)
+
+
+def _parse_lines(data: bytes):
+    for line in data.splitlines():
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and "timestamp" in entry:
+            yield entry
+
+
+def _read_segment(path: str):
+    """
+    Reads one sealed segment into a flat table (plus ``date`` and
+    ``risk_class`` partition columns), or None if it holds no entries.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    data = data[: data.rfind(b"\n") + 1]  # drop a torn last line
+    if not data:
+        return None
+    try:
+        raw = pj.read_json(
+            io.BytesIO(data),
+            parse_options=pj.ParseOptions(explicit_schema=_JSON_SCHEMA, unexpected_field_behavior="ignore"),
+        )
+    except pa.ArrowInvalid:
+        # A corrupt line somewhere: fall back to skipping bad lines.
+        raw = pa.Table.from_pylist(list(_parse_lines(data)), schema=_JSON_SCHEMA)
+    if raw.num_rows == 0:
+        return None
+
+    signals = raw["signals"]
+    columns = {
+        "timestamp": pc.cast(raw["timestamp"], AUDIT_SCHEMA.field("timestamp").type),
+        "domain": raw["domain"],
+        "domain_rev": pa.array([reverse_domain(d or "") for d in raw["domain"].to_pylist()], pa.string()),
+        "risk_score": raw["risk_score"],
+        "confidence": raw["confidence"],
+        "model_version": raw["model_version"],
+        "policy_version": raw["policy_version"],
+    }
+    for name in SIGNAL_COLUMNS:
+        columns[name] = pc.struct_field(signals, name)
+    table = pa.table({f.name: pc.cast(columns[f.name], f.type) for f in AUDIT_SCHEMA}, schema=AUDIT_SCHEMA)
+    table = table.append_column("date", pc.utf8_slice_codeunits(raw["timestamp"], 0, 10))
+    return table.append_column("risk_class", pc.fill_null(raw["risk_class"], "Unknown"))
+
+
+def _partition_dir(date: str, risk_class: str) -> str:
+    return os.path.join(STORE_DIR, f"date={quote(date, safe='')}", f"risk_class={quote(risk_class, safe='')}")
+
+
+@contextlib.contextmanager
+def _compaction_lock():
+    """
+    Exclusive lock across processes for the whole compaction. Without
+    it, one process's _recover() would delete the Parquet files another
+    process is writing (their run has no manifest yet).
+    """
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    with open(LOCK_PATH, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _recover():
+    """
+    Finishes or rolls back an interrupted compaction: runs with a
+    manifest only still need their segments moved; Parquet files from
+    runs without one are deleted (their segments were never moved).
+    """
+    os.makedirs(RUNS_DIR, exist_ok=True)
+    finished = set()
+    for name in os.listdir(RUNS_DIR):
+        if not name.endswith(".json"):
+            continue
+        finished.add(name[:-5])
+        with open(os.path.join(RUNS_DIR, name), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        for segment in manifest["segments"]:
+            src = os.path.join(AUDIT_DIR, segment)
+            if os.path.exists(src):
+                os.replace(src, os.path.join(COMPACTED_DIR, segment))
+
+    for root, _, files in os.walk(STORE_DIR):
+        for name in files:
+            run = name[len("part-"):-len(".parquet")] if name.startswith("part-") else None
+            if name.endswith(".tmp") or (run is not None and run not in finished):
+                os.remove(os.path.join(root, name))
+
+
+def _segment_runs(segments, max_bytes: int):
+    run, size = [], 0
+    for path in segments:
+        if run and size + os.path.getsize(path) > max_bytes:
+            yield run
+            run, size = [], 0
+        run.append(path)
+        size += os.path.getsize(path)
+    if run:
+        yield run
+
+
+def _compact_run(segments) -> tuple:
+    tables = [t for t in (_read_segment(p) for p in segments) if t is not None]
+    run = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + f"-{os.getpid()}-{time.monotonic_ns() % 10**6:06d}"
+    files = []
+    rows = 0
+    if tables:
+        table = pa.concat_tables(tables).sort_by(
+            [("date", "ascending"), ("risk_class", "ascending"), ("domain_rev", "ascending"), ("timestamp", "ascending")]
+        )
+        # Sorted by partition key, so each partition is one contiguous slice.
+        keys = pc.run_end_encode(pc.binary_join_element_wise(table["date"], table["risk_class"], "|")).combine_chunks()
+        offset = 0
+        for key, end in zip(keys.values.to_pylist(), keys.run_ends.to_pylist()):
+            date, risk_class = key.split("|", 1)
+            part = table.slice(offset, end - offset).drop_columns(["date", "risk_class"])
+            offset = end
+
+            directory = _partition_dir(date, risk_class)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{run}.parquet")
+            pq.write_table(part, path + ".tmp", row_group_size=ROW_GROUP_ROWS, compression="zstd")
+            os.replace(path + ".tmp", path)
+            files.append(os.path.relpath(path, STORE_DIR))
+            rows += part.num_rows
+
+    manifest = {"segments": [os.path.basename(p) for p in segments], "files": files, "rows": rows}
+    tmp = os.path.join(RUNS_DIR, f"{run}.json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(RUNS_DIR, f"{run}.json"))
+
+    for path in segments:
+        os.replace(path, os.path.join(COMPACTED_DIR, os.path.basename(path)))
+    return rows, len(files)
+
+
+def compact_segments(max_segments: int = None, run_max_bytes: int = RUN_MAX_BYTES) -> dict:
+    """
+    Compacts sealed segments into one Parquet file per (date,
+    risk_class) partition per run, then moves the segments to
+    audit/compacted. Runs are capped at ``run_max_bytes`` of JSONL so
+    memory stays bounded. Safe to re-run after a crash at any point;
+    a second caller waits for the running compaction to finish.
+    """
+    t0 = time.perf_counter()
+    os.makedirs(COMPACTED_DIR, exist_ok=True)
+    with _compaction_lock():
+        _recover()
+        segments = iter_sealed_segments()[:max_segments]
+        summary = {"segments": len(segments), "rows": 0, "files": 0}
+        for run in _segment_runs(segments, run_max_bytes):
+            rows, files = _compact_run(run)
+            summary["rows"] += rows
+            summary["files"] += files
+    summary["seconds"] = round(time.perf_counter() - t0, 2)
+    return summary
+
+
+def purge_compacted_segments():
+    """
+    Deletes raw segments that are already in the Parquet store.
+    """
+    with _compaction_lock():
+        shutil.rmtree(COMPACTED_DIR, ignore_errors=True)
+
+
+# ---------------------------------------------------------
+# 2) QUERIES — PARTITION + ROW-GROUP PUSHDOWN
+# ---------------------------------------------------------
+def audit_dataset():
+    """
+    The compacted store as a pyarrow dataset, or None if it is empty.
+    """
+    if not os.path.isdir(STORE_DIR):
+        return None
+    dataset = ds.dataset(STORE_DIR, format="parquet", partitioning=PARTITIONING)
+    return dataset if dataset.files else None
+
+
+def _as_date(value) -> dt.date:
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, dt.date):
+        return value
+    return dt.date.fromisoformat(str(value)[:10])
+
+
+def build_filter(start=None, end=None, domain_suffix: str = None, risk_classes=None):
+    """
+    Builds the dataset filter. ``start``/``end`` are inclusive dates;
+    ``domain_suffix`` matches a domain and all its subdomains
+    (``.xyz``, ``*.xyz`` and ``xyz`` are equivalent).
+    """
+    expr = None
+
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if start is not None:
+        expr = _and(ds.field("date") >= _as_date(start).isoformat())
+    if end is not None:
+        expr = _and(ds.field("date") <= _as_date(end).isoformat())
+    if risk_classes:
+        expr = _and(ds.field("risk_class").isin(list(risk_classes)))
+    if domain_suffix:
+        prefix = reverse_domain(domain_suffix.lstrip("*"))
+        # Exact domain, or anything under it: "prefix." <= x < "prefix/".
+        suffix_expr = (ds.field("domain_rev") == prefix) | (
+            (ds.field("domain_rev") >= prefix + ".") & (ds.field("domain_rev") < prefix + "/")
+        )
+        expr = _and(suffix_expr)
+    return expr
+
+
+def query_audit(start=None, end=None, domain_suffix: str = None, risk_classes=None, columns=None, limit: int = None):
+    """
+    Returns matching audit entries, newest first, as a DataFrame.
+    Filters are pushed down to partition directories and Parquet row
+    groups, so only the data that can match is read.
+    """
+    dataset = audit_dataset()
+    if dataset is None:
+        return pd.DataFrame(columns=["timestamp", "domain", "risk_class"] + list(columns or []))
+
+    columns = list(columns) if columns else ["timestamp", "domain", "risk_class", "risk_score", "confidence", "blacklist_flag"]
+    table = dataset.to_table(columns=columns, filter=build_filter(start, end, domain_suffix, risk_classes))
+    if "timestamp" in columns and table.num_rows:
+        if limit is not None and table.num_rows > limit:
+            keep = pc.select_k_unstable(table, limit, [("timestamp", "descending")])
+            table = table.take(keep)
+        table = table.sort_by([("timestamp", "descending")])
+    elif limit is not None:
+        table = table.slice(0, limit)
+    return table.to_pandas()
+
+
+def count_audit(start=None, end=None, domain_suffix: str = None, risk_classes=None) -> int:
+    dataset = audit_dataset()
+    if dataset is None:
+        return 0
+    return dataset.count_rows(filter=build_filter(start, end, domain_suffix, risk_classes))
@@ -0,0 +1,235 @@
+"""
+Concurrent scanning shared by the headless CLI and batch jobs.
+
+Scans go through utils.post_scan (the client behind
+run_fraudshield_scan), so cassettes and endpoint overrides apply here
+too. Results are yielded as they complete and at most a small window of
+URLs is in flight, so memory stays flat however long the input is.
+"""
+import ipaddress
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from concurrency import AIMDController
+from metrics import COALESCED_CALLS
+from results import ScanResult, ScanResultBatch
+from utils import classify_error, notify_decision, post_scan
+
+DEFAULT_CONCURRENCY = 8
+
+
+# ---------------------------------------------------------
+# 1) ONE URL → RESULT RECORD
+# ---------------------------------------------------------
+def make_session(pool_size: int):
+    """
+    Returns a requests.Session whose connection pool fits ``pool_size``
+    concurrent scans (the default pool of 10 would churn connections).
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def scan_result(url: str, api_url: str = None, timeout: float = 10, session=None) -> ScanResult:
+    """
+    Scans one URL into a ScanResult. Failures never raise; they set
+    ``error`` (timeout, connection, http_503, ...).
+    """
+    t0 = time.perf_counter()
+    try:
+        response = post_scan(url, api_url=api_url, timeout=timeout, session=session)
+        if response.status_code >= 400:
+            return ScanResult.failed(url, f"http_{response.status_code}", (time.perf_counter() - t0) * 1000.0)
+        r = response.json()
+        notify_decision(url, r)
+        return ScanResult.from_response(url, r, (time.perf_counter() - t0) * 1000.0)
+    except Exception as exc:
+        return ScanResult.failed(url, classify_error(exc), (time.perf_counter() - t0) * 1000.0)
+
+
+def scan_record(url: str, api_url: str = None, timeout: float = 10, session=None) -> dict:
+    """
+    Scans one URL and returns a flat, JSON-serializable record (see
+    ScanResult.to_record).
+    """
+    return scan_result(url, api_url, timeout, session).to_record()
+
+
+# ---------------------------------------------------------
+# 2) MANY URLS → RESULTS IN COMPLETION ORDER
+# ---------------------------------------------------------
+def iter_completed(urls, scan, concurrency=DEFAULT_CONCURRENCY, deadline=None):
+    """
+    Runs ``scan(url)`` over an iterable of URLs on worker threads and
+    yields ``(index, result)`` as each call completes (not in input
+    order), so callers can show results as they arrive.
+
+    ``concurrency`` is a fixed window or an AIMDController, whose
+    ``window`` is re-read before every submission. The input is consumed
+    lazily: no more than the window of scans is outstanding at once, so
+    a generator over a huge file is never materialized.
+
+    With a deadline.Deadline, iteration ends when it expires: nothing
+    new is submitted, calls still running are abandoned (their own
+    timeouts should come from ``deadline.budget()``) and their URLs are
+    simply not yielded.
+    """
+    if isinstance(concurrency, AIMDController):
+        workers, window = concurrency.ceiling, lambda: concurrency.window
+    else:
+        workers, window = concurrency, lambda: concurrency
+
+    def expired():
+        return deadline is not None and deadline.expired
+
+    def collect():
+        done, _ = wait(pending, timeout=None if deadline is None else deadline.remaining(), return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future.result()
+
+    urls = iter(urls)
+    pending = {}
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for index, url in enumerate(urls):
+            if expired():
+                break
+            pending[pool.submit(scan, url)] = index
+            while len(pending) >= window() and not expired():
+                yield from collect()
+        while pending and not expired():
+            yield from collect()
+    finally:
+        # Consumer stopped early (e.g. broken pipe) or the deadline hit:
+        # drop queued work; only wait for running calls without a deadline.
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=deadline is None)
+
+
+def iter_scan_records(urls, concurrency=DEFAULT_CONCURRENCY, api_url: str = None, timeout: float = 10):
+    """
+    Scans an iterable of URLs with ``concurrency`` worker threads (or an
+    AIMDController's window) and yields records as they complete (not in
+    input order).
+    """
+    session = make_session(getattr(concurrency, "ceiling", concurrency))
+    try:
+        for _, record in iter_completed(urls, lambda url: scan_record(url, api_url, timeout, session), concurrency):
+            yield record
+    finally:
+        session.close()
+
+
+# ---------------------------------------------------------
+# 3) BATCH PLANNING — ONE CALL PER REGISTRABLE DOMAIN
+# ---------------------------------------------------------
+# Multi-label public suffixes (ICANN second-level registries plus
+# hosting platforms where each subdomain belongs to a different owner).
+# A compact stand-in for the full Public Suffix List; any other host
+# is grouped by its last two labels.
+MULTI_LABEL_SUFFIXES = frozenset(
+    (
+        "co.uk", "org.uk", "ac.uk", "gov.uk", "ltd.uk", "plc.uk", "me.uk", "net.uk", "sch.uk",
+        "com.au", "net.au", "org.au", "edu.au", "gov.au", "asn.au", "id.au",
+        "co.nz", "org.nz", "net.nz", "ac.nz", "govt.nz",
+        "co.jp", "ne.jp", "or.jp", "ac.jp", "go.jp", "gr.jp",
+        "co.kr", "or.kr", "ne.kr", "go.kr",
+        "com.br", "net.br", "org.br", "gov.br",
+        "com.cn", "net.cn", "org.cn", "gov.cn", "edu.cn",
+        "com.hk", "org.hk", "com.tw", "org.tw", "com.sg", "edu.sg", "com.my",
+        "co.in", "net.in", "org.in", "firm.in", "gen.in", "ind.in",
+        "co.id", "or.id", "co.th", "in.th", "com.vn", "com.ph", "com.pk",
+        "com.mx", "com.ar", "com.co", "com.pe", "com.tr", "com.ua", "com.pl",
+        "co.za", "org.za", "com.ng", "com.eg", "com.sa", "co.il", "org.il",
+        "github.io", "gitlab.io", "herokuapp.com", "blogspot.com", "netlify.app",
+        "vercel.app", "pages.dev", "workers.dev", "web.app", "firebaseapp.com",
+        "appspot.com", "azurewebsites.net", "cloudfront.net", "onrender.com",
+        "myshopify.com", "wixsite.com", "wordpress.com", "squarespace.com",
+    )
+)
+
+
+def registrable_domain(url: str) -> str:
+    """
+    Returns the registrable domain (eTLD+1) of a URL's host, e.g.
+    ``shop.example.co.uk/item/1`` → ``example.co.uk``. IP addresses and
+    unparsable input are returned as-is, so they are never grouped.
+    """
+    try:
+        host = urlsplit(url if "://" in url else f"http://{url}").hostname
+    except ValueError:
+        return url
+    if not host:
+        return url
+    host = host.rstrip(".")
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+
+    labels = host.split(".")
+    if len(labels) <= 2:
+        return host
+    if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+class BatchPlan:
+    """
+    Groups a batch of URLs by a key (registrable domain by default) so
+    each group is scanned once through its first URL, then the result is
+    fanned back out to every original row, in input order.
+
+    Only valid when the backend verdict is domain-level (the signals
+    are domain age, HTTPS/HSTS/CSP and blacklist status); pass
+    ``key=None`` to scan every URL.
+    """
+
+    def __init__(self, urls, key=registrable_domain):
+        self.urls = list(urls)
+        self.scan_urls = []
+        self.group_of = []
+        groups = {}
+        for url in self.urls:
+            k = key(url) if key else url
+            if k not in groups:
+                groups[k] = len(self.scan_urls)
+                self.scan_urls.append(url)
+            self.group_of.append(groups[k])
+
+    @property
+    def calls(self) -> int:
+        return len(self.scan_urls)
+
+    @property
+    def calls_saved(self) -> int:
+        return len(self.urls) - len(self.scan_urls)
+
+    def fan_out(self, scan_rows):
+        """
+        Expands one result row per scanned URL (in ``scan_urls`` order)
+        to one row per input URL. Each row keeps the latency of the call
+        that produced its verdict; ``scanned_as`` names that URL, so
+        re-used verdicts stay distinguishable. A ScanResultBatch is
+        expanded column-wise into a new batch.
+        """
+        COALESCED_CALLS.labels("domain_dedupe").inc(self.calls_saved)
+        if isinstance(scan_rows, ScanResultBatch):
+            return scan_rows.take(self.group_of, urls=self.urls)
+        rows = []
+        for url, group in zip(self.urls, self.group_of):
+            row = dict(scan_rows[group])
+            row["scanned_as"] = row["url"]
+            row["url"] = url
+            rows.append(row)
+        return rows
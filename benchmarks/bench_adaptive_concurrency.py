@@ -0,0 +1,83 @@
+"""
+Fixed vs. adaptive (AIMD) batch concurrency against a capacity-limited
+backend.
+
+Runs batch.iter_scan_records against mock backends that process at most
+``--capacity`` requests at once (excess queues, then gets 503s), once
+per fixed concurrency level and once with an AIMDController whose
+ceiling is the largest fixed level. Reports goodput (successful
+URLs/s), error rate, latency percentiles and the window the controller
+settled on.
+
+Usage:
+    python benchmarks/bench_adaptive_concurrency.py [--urls 2000] [--capacity 16 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np  # noqa: E402
+
+from batch import iter_scan_records  # noqa: E402
+from concurrency import AIMDController  # noqa: E402
+from mock_api import start_mock_server  # noqa: E402
+from utils import add_scan_listener  # noqa: E402
+
+
+def run(endpoint: str, urls, concurrency):
+    windows = []
+    latencies = []
+    errors = 0
+    t0 = time.perf_counter()
+    for record in iter_scan_records(urls, concurrency=concurrency, api_url=endpoint, timeout=10):
+        latencies.append(record["latency_ms"])
+        errors += bool(record["error"])
+        if isinstance(concurrency, AIMDController):
+            windows.append(concurrency.window)
+    elapsed = time.perf_counter() - t0
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {
+        "goodput": (len(urls) - errors) / elapsed,
+        "error_rate": errors / len(urls),
+        "p50": p50,
+        "p99": p99,
+        "windows": windows,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--urls", type=int, default=2000)
+    parser.add_argument("--capacity", type=int, nargs="+", default=[16, 4])
+    parser.add_argument("--fixed", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--latency", default="fixed:50")
+    args = parser.parse_args()
+
+    urls = [f"https://shop{i}.example.com/" for i in range(args.urls)]
+    controller = AIMDController(ceiling=max(args.fixed))
+    add_scan_listener(controller.on_scan)
+
+    # One controller across backends: the second backend starts from the
+    # window learned on the first, as the dashboard's shared one would.
+    for capacity in args.capacity:
+        print(f"\nbackend capacity {capacity} ({args.latency}), {args.urls} URLs")
+        modes = [(f"fixed {c}", c) for c in args.fixed] + [(f"adaptive (ceiling {max(args.fixed)})", controller)]
+        for label, concurrency in modes:
+            _, endpoint = start_mock_server(latency=args.latency, capacity=capacity)
+            r = run(endpoint, urls, concurrency)
+            window = ""
+            if r["windows"]:
+                w = np.asarray(r["windows"])
+                window = f"  window start {w[0]} mean {w.mean():.1f} end {w[-1]} ({controller.decreases} backoffs so far)"
+            print(
+                f"  {label:<22} {r['goodput']:7.1f} ok URLs/s  errors {r['error_rate']:6.1%}  "
+                f"p50 {r['p50']:6.1f} ms  p99 {r['p99']:7.1f} ms{window}"
+            )
+
+
+if __name__ == "__main__":
+    main()
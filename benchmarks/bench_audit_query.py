@@ -0,0 +1,106 @@
+"""
+Audit-log compaction and query benchmark.
+
+Writes synthetic sealed audit segments covering ``--days`` of history
+(``--per-day`` verdicts per day) into a temporary DATA_DIR, compacts
+them into the partitioned Parquet store and times typical
+incident-review queries with and without pushdown-friendly filters.
+
+Usage:
+    python benchmarks/bench_audit_query.py --days 90 --per-day 50000
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TLDS = ("com", "net", "org", "xyz", "shop", "co.uk", "biz", "io")
+CLASSES = ("Safe", "Low Risk", "Suspicious", "High Risk")
+
+
+def write_segments(audit_dir: str, days: int, per_day: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = dt.datetime(2026, 10, 19, tzinfo=dt.timezone.utc) - dt.timedelta(days=days)
+    os.makedirs(audit_dir, exist_ok=True)
+    for d in range(days):
+        day = start + dt.timedelta(days=d)
+        path = os.path.join(audit_dir, f"audit-{day:%Y%m%dT000000}-1-{d:04d}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for i in range(per_day):
+                ts = day + dt.timedelta(seconds=i * 86400 / per_day)
+                domain = f"shop{rng.randrange(200_000)}.{rng.choice(TLDS)}"
+                f.write(
+                    json.dumps(
+                        {
+                            "timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+                            "domain": domain,
+                            "risk_score": round(rng.random() * 100, 2),
+                            "risk_class": rng.choice(CLASSES),
+                            "confidence": "HIGH",
+                            "model_version": "v1.0",
+                            "policy_version": "p1.2",
+                            "signals": {
+                                "domain_age_days": rng.randrange(7000),
+                                "https_flag": 1,
+                                "hsts_flag": rng.randrange(2),
+                                "csp_flag": rng.randrange(2),
+                                "mixed_content_ratio": 0.05,
+                                "blacklist_flag": 0,
+                            },
+                        },
+                        separators=(",", ":"),
+                    )
+                    + "\n"
+                )
+    return start.date()
+
+
+def timed(label, fn):
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    rows = len(result) if hasattr(result, "__len__") else result
+    print(f"{label:<58}{elapsed:>8.3f} s{rows:>12,} rows")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--per-day", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.environ["FRAUDSHIELD_DATA_DIR"] = data_dir
+        os.environ["FRAUDSHIELD_METRICS_PORT"] = "0"
+        import audit_store
+        from audit import AUDIT_DIR
+
+        t0 = time.perf_counter()
+        first_day = write_segments(AUDIT_DIR, args.days, args.per_day)
+        print(f"generated {args.days * args.per_day:,} entries in {time.perf_counter() - t0:.1f} s")
+
+        t0 = time.perf_counter()
+        summary = audit_store.compact_segments()
+        print(f"compacted {summary['rows']:,} rows from {summary['segments']} segments "
+              f"into {summary['files']} files in {time.perf_counter() - t0:.1f} s\n")
+
+        last_day = first_day + dt.timedelta(days=args.days - 1)
+        week = last_day - dt.timedelta(days=6)
+        q = audit_store.query_audit
+        timed("Suspicious *.xyz, last week", lambda: q(week, last_day, ".xyz", ["Suspicious"]))
+        timed("Suspicious *.xyz, all history", lambda: q(None, None, ".xyz", ["Suspicious"]))
+        timed("one domain, all history", lambda: q(None, None, "shop1234.com"))
+        timed("High Risk, all history (count)", lambda: audit_store.count_audit(risk_classes=["High Risk"]))
+        timed("everything, all history, newest 1000", lambda: q(limit=1000))
+
+
+if __name__ == "__main__":
+    main()
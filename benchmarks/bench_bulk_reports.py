@@ -0,0 +1,56 @@
+"""
+Bulk PDF report throughput: serial vs. process pool.
+
+Renders one report per batch row (and the consolidated multi-page mode)
+through ``reports.generate_bulk_reports_zip`` with ``workers=1`` (the
+serial, in-thread path) and with a process pool, and reports
+reports/second for each.
+
+Usage:
+    python benchmarks/bench_bulk_reports.py [--rows 2000] [--workers N]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from reports import generate_bulk_reports_zip  # noqa: E402
+
+CLASSES = ("🟢 Safe", "🟡 Low Risk", "🟠 Suspicious", "🔴 High Risk")
+
+
+def make_rows(n: int):
+    return [
+        {
+            "url": f"https://shop{i}.example.com/item/{i}",
+            "risk_class": CLASSES[i % len(CLASSES)],
+            "risk_score_%": round((i * 7.31) % 100, 2),
+            "latency_ms": 120.0,
+        }
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows:,} rows, {args.workers} workers, {os.cpu_count()} CPUs")
+    print(f"{'mode':<14}{'path':<10}{'time':>10}{'reports/s':>12}")
+    for consolidated in (False, True):
+        mode = "consolidated" if consolidated else "per-row"
+        for label, workers in (("serial", 1), ("pool", args.workers)):
+            t0 = time.perf_counter()
+            generate_bulk_reports_zip(rows, consolidated=consolidated, workers=workers).close()
+            elapsed = time.perf_counter() - t0
+            print(f"{mode:<14}{label:<10}{elapsed:>8.2f} s{args.rows / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Peak memory of batch-result export: materialized vs. streaming.
+
+The baseline mirrors the original download path (build a DataFrame of
+every row, then ``df.to_csv(index=False).encode("utf-8")``). The
+streaming cases feed the same rows one at a time into
+``export.BatchResultExporter``.
+
+Peak memory is the tracemalloc peak (Python heap) plus the Arrow memory
+pool high-water mark, so Parquet buffers are counted too.
+
+Usage:
+    python benchmarks/bench_export.py [--rows 1000000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+import pyarrow as pa  # noqa: E402
+
+from export import BatchResultExporter  # noqa: E402
+
+CLASSES = ("🟢 Safe", "🟡 Low Risk", "🟠 Suspicious", "🔴 High Risk", "API_ERROR")
+
+
+def iter_rows(n: int):
+    for i in range(n):
+        rc = CLASSES[i % len(CLASSES)]
+        yield {
+            "url": f"https://shop{i}.example.com/item/{i}",
+            "risk_class": rc,
+            "risk_score_%": None if rc == "API_ERROR" else round((i * 7.31) % 100, 2),
+            "latency_ms": float(80 + i % 400),
+        }
+
+
+def materialized_csv(n: int) -> int:
+    df = pd.DataFrame(list(iter_rows(n)))
+    return len(df.to_csv(index=False).encode("utf-8"))
+
+
+def streaming(fmt: str):
+    def run(n: int) -> int:
+        exporter = BatchResultExporter(fmt)
+        for row in iter_rows(n):
+            exporter.add(row)
+        spool = exporter.finish()
+        size = spool.seek(0, os.SEEK_END)
+        exporter.close()
+        return size
+    return run
+
+
+def measure(fn, n: int):
+    pool = pa.default_memory_pool()
+    arrow_before = pool.max_memory() or 0
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    size = fn(n)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arrow_peak = max((pool.max_memory() or 0) - arrow_before, 0)
+    return size, elapsed, peak + arrow_peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    cases = [
+        ("materialized csv", materialized_csv),
+        ("streaming csv", streaming("csv")),
+        ("streaming parquet", streaming("parquet")),
+    ]
+
+    print(f"{args.rows:,} rows")
+    print(f"{'case':<20}{'output':>12}{'time':>10}{'peak mem':>12}")
+    for name, fn in cases:
+        size, elapsed, peak = measure(fn, args.rows)
+        print(f"{name:<20}{size / 1e6:>9.1f} MB{elapsed:>8.2f} s{peak / 1e6:>9.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
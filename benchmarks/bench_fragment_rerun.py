@@ -0,0 +1,143 @@
+"""
+Per-click server CPU time: full-script rerun vs. fragment-scoped rerun.
+
+Clicks "Call API" and "Run Batch Scan" in streamlit_app.py repeatedly
+and measures the process CPU time spent re-executing the script. Both
+cases run the real dashboard:
+
+- full rerun: what AppTest does for every interaction (and what every
+  click cost before the API Explorer widgets were moved into
+  st.fragment);
+- fragment rerun: the same click delivered the way the Streamlit
+  runtime delivers an interaction inside an st.fragment, i.e. a rerun
+  request whose ``fragment_id_queue`` holds that fragment's id, so the
+  ScriptRunner executes only the fragment.
+
+The fragment id is looked up in the app's fragment storage after a full
+run; if the render function is not an st.fragment the benchmark stops
+with an error instead of reporting a reduction.
+
+Usage:
+    python benchmarks/bench_fragment_rerun.py [--clicks 20]
+"""
+import argparse
+import dataclasses
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("FRAUDSHIELD_METRICS_PORT", "0")
+os.environ.setdefault("FRAUDSHIELD_GATEWAY_PORT", "0")
+# Point the client at a closed local port so clicks exercise the full
+# request/render path without waiting on the network.
+os.environ["FRAUDSHIELD_API_URL"] = "http://127.0.0.1:9/scan_url"
+
+from streamlit.testing.v1 import AppTest, app_test  # noqa: E402
+
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+
+class _ScopedRunner(app_test.LocalScriptRunner):
+    """
+    LocalScriptRunner that queues ``fragment_ids`` on its rerun request,
+    as the runtime does for a widget interaction inside a fragment.
+    """
+
+    fragment_ids = None
+
+    def request_rerun(self, rerun_data):
+        accepted = super().request_rerun(rerun_data)
+        if _ScopedRunner.fragment_ids:
+            # A new runner starts with a pending full rerun, which absorbs any
+            # fragment request merged into it; scope the merged request.
+            requests = self._requests
+            with requests._lock:
+                requests._rerun_data = dataclasses.replace(
+                    requests._rerun_data, fragment_id_queue=list(_ScopedRunner.fragment_ids)
+                )
+        return accepted
+
+
+app_test.LocalScriptRunner = _ScopedRunner
+
+
+def _fragment_id(app: AppTest, func_name: str) -> str:
+    for fragment_id, fragment in app._fragment_storage._fragments.items():
+        for cell in fragment.__closure__ or ():
+            if getattr(cell.cell_contents, "__name__", None) == func_name:
+                return fragment_id
+    raise SystemExit(f"{func_name} is not registered as an st.fragment; nothing to measure")
+
+
+def _cpu_per_click(app: AppTest, click, clicks: int, fragment_id: str = None):
+    samples = []
+    for _ in range(clicks):
+        t0 = time.process_time()
+        click(app)
+        _ScopedRunner.fragment_ids = [fragment_id] if fragment_id else None
+        try:
+            app.run(timeout=60)
+        finally:
+            _ScopedRunner.fragment_ids = None
+        samples.append((time.process_time() - t0) * 1000.0)
+        if app.exception:
+            raise SystemExit(f"app raised: {app.exception[0].value}")
+    samples.sort()
+    return {
+        "median_ms": samples[len(samples) // 2],
+        "min_ms": samples[0],
+    }
+
+
+def _history_len(app: AppTest) -> int:
+    return len(app.session_state["history"]) if "history" in app.session_state else 0
+
+
+def _click_single(app: AppTest):
+    app.text_input(key="api_url_input").set_value("https://example.com")
+    app.button(key="api_call_button").click()
+
+
+def _click_batch(app: AppTest):
+    app.text_area(key="batch_urls").set_value("https://example.com\nhttps://example.org")
+    app.button(key="run_batch_scan").click()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clicks", type=int, default=20)
+    args = parser.parse_args()
+
+    app_path = os.path.join(ROOT, "streamlit_app.py")
+    cases = [
+        ("Call API", _click_single, "render_single_url_tester"),
+        ("Run Batch Scan", _click_batch, "render_batch_scanner"),
+    ]
+
+    print(f"{'interaction':<16}{'full rerun':>14}{'fragment':>14}{'reduction':>12}")
+    for name, click, func_name in cases:
+        app = AppTest.from_file(app_path, default_timeout=60)
+        app.run()
+        fragment_id = _fragment_id(app, func_name)
+
+        full = _cpu_per_click(app, click, args.clicks)
+        scans_before = _history_len(app)
+        frag = _cpu_per_click(app, click, args.clicks, fragment_id)
+        # The scoped reruns must have executed the click (one history entry
+        # per scanned URL), or the comparison would be meaningless.
+        if _history_len(app) == scans_before:
+            raise SystemExit(f"fragment-scoped rerun of {func_name} did not handle the click")
+
+        reduction = 1.0 - frag["median_ms"] / full["median_ms"]
+        print(
+            f"{name:<16}{full['median_ms']:>11.1f} ms{frag['median_ms']:>11.1f} ms"
+            f"{reduction:>11.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
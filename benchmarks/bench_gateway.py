@@ -0,0 +1,282 @@
+"""
+Load test for the local pre-click verdict gateway (gateway.py).
+
+Starts a mock backend (mock_api.py) in this process and the gateway as a
+separate process against a temporary DATA_DIR, then:
+
+1. warms the cache with ``--urls`` backend lookups;
+2. fires ``--storm`` concurrent requests for one uncached URL and counts
+   the backend calls they caused (single-flight: expect 1);
+3. reads verdicts seeded into the job-queue store;
+4. holds ``--connections`` keep-alive connections open, spread over
+   ``--clients`` client processes, and sends cache hits at an aggregate
+   ``--rps`` for ``--duration`` seconds.
+
+Client latency is measured from each request's scheduled send time, so
+client or server queueing shows up in the percentiles; on a host with
+few cores that includes time the client processes wait for a CPU. The
+gateway's own ``fraudshield_gateway_latency_seconds`` histogram (request
+parsed to response written), scraped from its metrics endpoint before
+and after the run, gives the server-side time to answer.
+
+Usage:
+    python benchmarks/bench_gateway.py --connections 2000 --rps 5000 --duration 10 --clients 4
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from latency import LatencyHistogram  # noqa: E402
+from mock_api import mock_verdict, start_mock_server  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_store(data_dir: str, urls):
+    os.environ["FRAUDSHIELD_DATA_DIR"] = data_dir
+    from jobqueue import JobQueue
+
+    queue = JobQueue(os.path.join(data_dir, "jobs.sqlite"))
+    queue.enqueue(urls, batch="seed")
+    while True:
+        job = queue.claim()
+        if job is None:
+            break
+        job_id, url, _, token = job
+        verdict = mock_verdict(url)
+        queue.complete(job_id, token, dict(verdict, latency_ms=80.0))
+
+
+# ---------------------------------------------------------
+# 1) ASYNC HTTP CLIENT
+# ---------------------------------------------------------
+def request_bytes(url: str) -> bytes:
+    body = json.dumps({"url": url}).encode("utf-8")
+    return (
+        f"POST /scan_url HTTP/1.1\r\nHost: gateway\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode("latin-1") + body
+
+
+async def read_response(reader):
+    head = await reader.readuntil(b"\r\n\r\n")
+    length, source = 0, None
+    for line in head.split(b"\r\n")[1:]:
+        key, _, value = line.partition(b":")
+        key = key.strip().lower()
+        if key == b"content-length":
+            length = int(value)
+        elif key == b"x-verdict-source":
+            source = value.strip().decode("latin-1")
+    await reader.readexactly(length)
+    return int(head[9:12]), source
+
+
+async def one_shot(port: int, url: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(request_bytes(url))
+    result = await read_response(reader)
+    writer.close()
+    return result
+
+
+async def warm(port: int, urls, concurrency: int = 64):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(url):
+        async with sem:
+            return await one_shot(port, url)
+
+    return Counter(source for _, source in await asyncio.gather(*(one(u) for u in urls)))
+
+
+async def hit_load(port: int, urls, connections: int, rps: float, duration: float):
+    hist = LatencyHistogram()
+    sources = Counter()
+    requests = [request_bytes(u) for u in urls]
+    loop = asyncio.get_running_loop()
+    interval = connections / rps
+    opened = await asyncio.gather(*(asyncio.open_connection("127.0.0.1", port) for _ in range(connections)))
+    start = loop.time() + 0.5
+    end = start + duration
+
+    async def run(i, reader, writer):
+        n = i
+        next_at = start + i / rps
+        while next_at < end:
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            writer.write(requests[n % len(requests)])
+            status, source = await read_response(reader)
+            hist.record((loop.time() - next_at) * 1000.0, error=status != 200)
+            sources[source] += 1
+            n += connections
+            next_at += interval
+        writer.close()
+
+    await asyncio.gather(*(run(i, r, w) for i, (r, w) in enumerate(opened)))
+    return hist, sources
+
+
+def _client_process(args):
+    port, urls, connections, rps, duration = args
+    return asyncio.run(hit_load(port, urls, connections, rps, duration))
+
+
+def hit_load_processes(port: int, urls, connections: int, rps: float, duration: float, clients: int):
+    """
+    hit_load split over ``clients`` processes (connections and rate
+    divided evenly), merged into one histogram.
+    """
+    shares = [connections // clients + (i < connections % clients) for i in range(clients)]
+    tasks = [(port, urls[i::clients], n, rps * n / connections, duration) for i, n in enumerate(shares) if n]
+    with multiprocessing.get_context("spawn").Pool(len(tasks)) as pool:
+        parts = pool.map(_client_process, tasks)
+    hist, sources = LatencyHistogram(), Counter()
+    for part_hist, part_sources in parts:
+        hist.merge(part_hist)
+        sources.update(part_sources)
+    return hist, sources
+
+
+# ---------------------------------------------------------
+# 2) SERVER-SIDE HISTOGRAM (GATEWAY METRICS ENDPOINT)
+# ---------------------------------------------------------
+_BUCKET_LINE = re.compile(r'^fraudshield_gateway_latency_seconds_bucket\{le="([^"]+)"\} (\S+)$', re.M)
+
+
+def scrape_gateway_buckets(metrics_port: int) -> dict:
+    """
+    Cumulative ``le`` bound (seconds) -> count.
+    """
+    with urllib.request.urlopen(f"http://127.0.0.1:{metrics_port}/metrics", timeout=5) as response:
+        text = response.read().decode("utf-8")
+    return {float(le): float(count) for le, count in _BUCKET_LINE.findall(text)}
+
+
+def report_server_side(before: dict, after: dict):
+    delta = sorted((le, after[le] - before.get(le, 0.0)) for le in after)
+    total = delta[-1][1]
+    if not total:
+        print("  server-side: no requests observed")
+        return
+
+    def bound(q):
+        # Upper bound of the bucket holding the q-th percentile.
+        return next(le for le, count in delta if count >= total * q / 100)
+
+    under = {le: count / total for le, count in delta}
+    print(
+        f"  server-side ({int(total):,} answers): p50 <= {bound(50) * 1000:g} ms  p99 <= {bound(99) * 1000:g} ms  "
+        f"p99.9 <= {bound(99.9) * 1000:g} ms  under 5 ms {under.get(0.005, 0):.2%}  under 10 ms {under.get(0.01, 0):.2%}"
+    )
+
+
+def report(label: str, hist: LatencyHistogram, wall_s: float = None):
+    p = hist.percentiles((50, 90, 99, 99.9))
+    rate = f"  {hist.total / wall_s:,.0f} req/s" if wall_s else ""
+    print(
+        f"{label:<34}{hist.total:>8,} req  p50 {p[50]:6.2f} ms  p90 {p[90]:6.2f} ms  "
+        f"p99 {p[99]:6.2f} ms  p99.9 {p[99.9]:6.2f} ms  max {hist.max_value:7.2f} ms{rate}  errors {hist.errors}"
+    )
+
+
+# ---------------------------------------------------------
+# 3) SCENARIOS
+# ---------------------------------------------------------
+async def scenarios(args, port: int, api):
+    urls = [f"https://shop{i}.example.com/item/{i}" for i in range(args.urls)]
+    t0 = time.perf_counter()
+    print(f"warm-up: {dict(await warm(port, urls))} in {time.perf_counter() - t0:.1f} s")
+
+    before = api.requests
+    results = await warm(port, ["https://storm.example.org/new-listing"] * args.storm, concurrency=args.storm)
+    print(f"miss storm: {args.storm} concurrent requests for one URL -> {api.requests - before} backend call(s), {dict(results)}")
+
+    store_urls = [f"https://stored{i}.example.net/" for i in range(args.store)]
+    hist = LatencyHistogram()
+    sources = Counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for url in store_urls:
+        t = time.perf_counter()
+        writer.write(request_bytes(url))
+        status, source = await read_response(reader)
+        hist.record((time.perf_counter() - t) * 1000.0, error=status != 200)
+        sources[source] += 1
+    writer.close()
+    report(f"store lookups {dict(sources)}", hist)
+
+
+def cache_hit_scenario(args, port: int, metrics_port: int, api):
+    urls = [f"https://shop{i}.example.com/item/{i}" for i in range(args.urls)]
+    before, buckets = api.requests, scrape_gateway_buckets(metrics_port)
+    hist, sources = hit_load_processes(port, urls, args.connections, args.rps, args.duration, args.clients)
+    report(f"cache hits, {args.connections} conn / {args.clients} clients", hist, args.duration)
+    report_server_side(buckets, scrape_gateway_buckets(metrics_port))
+    print(f"  sources {dict(sources)}; backend calls during the run: {api.requests - before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--rps", type=float, default=5000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument(
+        "--clients", type=int, default=max(1, (os.cpu_count() or 2) // 2), help="client processes sharing the connections"
+    )
+    parser.add_argument("--urls", type=int, default=1000, help="distinct URLs warmed into the cache")
+    parser.add_argument("--storm", type=int, default=1000, help="concurrent requests in the miss storm")
+    parser.add_argument("--store", type=int, default=200, help="verdicts seeded into the job-queue store")
+    args = parser.parse_args()
+
+    api, endpoint = start_mock_server(latency="fixed:80")
+    with tempfile.TemporaryDirectory() as data_dir:
+        seed_store(data_dir, [f"https://stored{i}.example.net/" for i in range(args.store)])
+        port, metrics_port = free_port(), free_port()
+        env = dict(
+            os.environ,
+            FRAUDSHIELD_DATA_DIR=data_dir,
+            FRAUDSHIELD_API_URL=endpoint,
+            FRAUDSHIELD_METRICS_PORT=str(metrics_port),
+            FRAUDSHIELD_AUDIT="0",
+            FRAUDSHIELD_VERDICT_CACHE_TTL="3600",
+        )
+        gateway = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "gateway.py"), "--port", str(port)],
+            env=env,
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            for _ in range(100):
+                try:
+                    socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            asyncio.run(scenarios(args, port, api))
+            cache_hit_scenario(args, port, metrics_port, api)
+        finally:
+            gateway.terminate()
+            gateway.wait()
+
+
+if __name__ == "__main__":
+    main()
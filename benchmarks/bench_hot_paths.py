@@ -0,0 +1,283 @@
+"""
+Microbenchmarks for the code paths the dashboard runs on every interaction.
+
+Covers map_risk_style, update_log, generate_pdf_report,
+get_example_website_table, batch DataFrame construction and CSV encoding
+(from row dicts and from a columnar ScanResultBatch) at batch sizes from
+1 to 1M rows. Results can be saved as a baseline
+and later runs compared against it.
+
+Usage:
+    python benchmarks/bench_hot_paths.py                      # run, print table
+    python benchmarks/bench_hot_paths.py --save-baseline      # write baseline.json
+    python benchmarks/bench_hot_paths.py --compare            # diff vs baseline.json
+    python benchmarks/bench_hot_paths.py --max-rows 10000 -k csv
+
+``--compare`` compares each case's fastest round (the least noisy
+statistic) with the baseline's. A case is suspect when it is slower by
+more than ``--threshold`` (default 20%) plus its noise margin, the
+baseline's own median-over-fastest spread. Suspects are timed again
+with more rounds; the run exits with status 1 only if a case is still
+slower after that.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from export import BatchResultExporter, export_rows  # noqa: E402
+from results import ScanResult, ScanResultBatch  # noqa: E402
+from utils import (  # noqa: E402
+    generate_pdf_report,
+    get_example_website_table,
+    map_risk_style,
+    update_log,
+)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+ROW_SIZES = (1, 100, 10_000, 1_000_000)
+# PDF rendering is ~0.2 ms per report; 1M reports would take minutes
+# per round, so it stops at 1k.
+PDF_SIZES = (1, 10, 100, 1_000)
+
+CLASSES = ("Safe", "Low Risk", "Suspicious", "High Risk", "Unknown")
+
+
+# ---------------------------------------------------------
+# 1) INPUT FIXTURES
+# ---------------------------------------------------------
+def make_rows(n: int):
+    return [
+        {
+            "url": f"https://shop{i}.example.com/item/{i}",
+            "risk_class": map_risk_style(CLASSES[i % len(CLASSES)], int(i % 97 == 0))[0],
+            "risk_score_%": round((i * 7.31) % 100, 2),
+            "latency_ms": float(80 + i % 400),
+        }
+        for i in range(n)
+    ]
+
+
+def make_batch(n: int) -> ScanResultBatch:
+    return ScanResultBatch.from_results(
+        [
+            ScanResult(
+                f"https://shop{i}.example.com/item/{i}",
+                CLASSES[i % len(CLASSES)],
+                round((i * 7.31) % 100, 2),
+                int(i % 97 == 0),
+                float(80 + i % 400),
+            )
+            for i in range(n)
+        ]
+    )
+
+
+# ---------------------------------------------------------
+# 2) CASES — each returns a zero-argument callable for size n
+# ---------------------------------------------------------
+def case_map_risk_style(n):
+    classes = [CLASSES[i % len(CLASSES)] for i in range(n)]
+    flags = [int(i % 97 == 0) for i in range(n)]
+    return lambda: [map_risk_style(c, f) for c, f in zip(classes, flags)]
+
+
+def case_update_log(n):
+    urls = [f"https://shop{i % 5000}.example.com" for i in range(n)]
+
+    def run():
+        session = {}
+        for i, url in enumerate(urls):
+            update_log(session, url, CLASSES[i % 4], 42.0, 120.0)
+    return run
+
+
+def case_generate_pdf_report(n):
+    return lambda: [generate_pdf_report(f"https://shop{i}.example.com", "Suspicious", 55.2) for i in range(n)]
+
+
+def case_example_table(n):
+    return lambda: [get_example_website_table() for _ in range(n)]
+
+
+def case_batch_dataframe(n):
+    rows = make_rows(n)
+    return lambda: pd.DataFrame(rows)
+
+
+def case_csv_materialized(n):
+    df = pd.DataFrame(make_rows(n))
+    return lambda: df.to_csv(index=False).encode("utf-8")
+
+
+def case_csv_streaming(n):
+    rows = make_rows(n)
+    return lambda: export_rows(rows, "csv").close()
+
+
+def case_batch_dataframe_columnar(n):
+    batch = make_batch(n)
+    return batch.to_frame
+
+
+def case_csv_columnar(n):
+    batch = make_batch(n)
+
+    def run():
+        exporter = BatchResultExporter("csv")
+        exporter.add_batch(batch)
+        exporter.finish()
+        exporter.close()
+    return run
+
+
+CASES = (
+    ("map_risk_style", case_map_risk_style, ROW_SIZES),
+    ("update_log", case_update_log, ROW_SIZES),
+    ("generate_pdf_report", case_generate_pdf_report, PDF_SIZES),
+    ("get_example_website_table", case_example_table, (1, 100)),
+    ("batch_dataframe", case_batch_dataframe, ROW_SIZES),
+    ("csv_encode_materialized", case_csv_materialized, ROW_SIZES),
+    ("csv_encode_streaming", case_csv_streaming, ROW_SIZES),
+    ("batch_dataframe_columnar", case_batch_dataframe_columnar, ROW_SIZES),
+    ("csv_encode_columnar", case_csv_columnar, ROW_SIZES),
+)
+
+
+# ---------------------------------------------------------
+# 3) TIMING
+# ---------------------------------------------------------
+def time_case(fn, min_rounds: int = 3, min_time_s: float = 0.3):
+    """
+    Runs fn until it has at least ``min_rounds`` rounds and
+    ``min_time_s`` of total time; returns per-round statistics.
+    """
+    fn()  # warm-up
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < min_rounds or time.perf_counter() - started < min_time_s:
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+        if len(samples) >= 1000:
+            break
+    return {"rounds": len(samples), "min_s": min(samples), "median_s": statistics.median(samples)}
+
+
+def run_suite(max_rows: int, keyword: str = None, only=None, **timing):
+    results = {}
+    for name, factory, sizes in CASES:
+        if keyword and keyword not in name:
+            continue
+        for n in sizes:
+            if n > max_rows:
+                continue
+            key = f"{name}[{n}]"
+            if only is not None and key not in only:
+                continue
+            results[key] = time_case(factory(n), **timing)
+            r = results[key]
+            print(f"{key:<36}{_fmt(r['median_s']):>12}{_fmt(r['median_s'] / n):>12}/row{r['rounds']:>7}")
+    return results
+
+
+def _fmt(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+# ---------------------------------------------------------
+# 4) BASELINE + COMPARISON REPORT
+# ---------------------------------------------------------
+def save_baseline(results, path: str):
+    payload = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"\nBaseline written to {path}")
+
+
+def compare(results, path: str, threshold: float):
+    """
+    Prints fastest-round times against the baseline; returns the keys
+    slower than ``threshold`` plus the baseline's noise margin.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    print(f"\n{'case':<36}{'baseline':>12}{'current':>12}{'change':>10}")
+    regressed = []
+    for key, current in results.items():
+        if key not in baseline:
+            print(f"{key:<36}{'-':>12}{_fmt(current['min_s']):>12}{'new':>10}")
+            continue
+        before = baseline[key]["min_s"]
+        change = current["min_s"] / before - 1.0
+        noise = baseline[key]["median_s"] / before - 1.0
+        flag = ""
+        if change > threshold + noise:
+            flag = "  REGRESSION?"
+            regressed.append(key)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{key:<36}{_fmt(before):>12}{_fmt(current['min_s']):>12}{change:>+10.0%}{flag}")
+    return regressed
+
+
+def confirm(results, suspects, args):
+    """
+    Times suspected regressions again with more rounds and keeps each
+    case's fastest round over both runs, so one noisy run (another
+    process, CPU frequency change) can't fail the comparison alone.
+    """
+    print(f"\nRe-timing {len(suspects)} suspected regression(s)")
+    rerun = run_suite(args.max_rows, only=set(suspects), min_rounds=10, min_time_s=1.0)
+    for key, r in rerun.items():
+        results[key]["min_s"] = min(results[key]["min_s"], r["min_s"])
+    return compare({key: results[key] for key in suspects}, args.baseline, args.threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-rows", type=int, default=1_000_000, help="skip sizes above this")
+    parser.add_argument("-k", dest="keyword", help="only run cases whose name contains this")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    print(f"{'case':<36}{'median':>12}{'per row':>16}{'rounds':>7}")
+    results = run_suite(args.max_rows, args.keyword)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+    if args.compare:
+        suspects = compare(results, args.baseline, args.threshold)
+        if suspects and confirm(results, suspects, args):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Per-report PDF rendering cost: full layout vs. cached template.
+
+Cases:
+  generate_pdf_report   original text-only report, laid out per call
+  full layout           logo + gauge + signals table, laid out per call
+                        (a fresh ReportTemplate for every report)
+  cached template       same report, static parts laid out once and
+                        reused via reports.render_cached_report
+
+Usage:
+    python benchmarks/bench_pdf_template.py [--reports 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from reports import ReportTemplate, render_cached_report  # noqa: E402
+from utils import generate_pdf_report  # noqa: E402
+
+SIGNALS = {
+    "domain_age_days": 41,
+    "https_flag": 1,
+    "hsts_flag": 0,
+    "csp_flag": 0,
+    "mixed_content_ratio": 0.0,
+    "blacklist_flag": 0,
+}
+
+
+def per_report_us(fn, n: int) -> float:
+    fn(0)  # warm-up (font metrics, template build)
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reports", type=int, default=500)
+    args = parser.parse_args()
+
+    cases = [
+        ("generate_pdf_report", lambda i: generate_pdf_report(f"https://shop{i}.com", "Suspicious", 55.2)),
+        ("full layout", lambda i: ReportTemplate().render(f"https://shop{i}.com", "Suspicious", 55.2, SIGNALS)),
+        ("cached template", lambda i: render_cached_report(f"https://shop{i}.com", "Suspicious", 55.2, SIGNALS)),
+    ]
+
+    print(f"{'case':<22}{'per report':>14}{'reports/s':>12}")
+    for name, fn in cases:
+        us = per_report_us(fn, args.reports)
+        print(f"{name:<22}{us:>11.0f} us{1e6 / us:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Record/replay cassettes for scan calls.
+
+Record mode passes every scan through to the real backend and stores the
+request URL, response status/body (zlib-compressed) and measured latency
+in a SQLite file indexed by URL. Replay mode serves those interactions
+back through the same client interface (utils.post_scan, and so
+run_fraudshield_scan, the batch scanners and loadgen.py), either
+instantly or at the recorded latency, with no network access.
+
+Enable it for any entry point with environment variables:
+
+    FRAUDSHIELD_CASSETTE=runs/backend.cassette
+    FRAUDSHIELD_CASSETTE_MODE=record | replay | replay-timed
+
+or record a cassette directly:
+
+    python cassette.py record runs/backend.cassette --urls urls.txt
+    python cassette.py info runs/backend.cassette
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+
+from utils import post_scan, set_scan_transport
+
+MODES = ("record", "replay", "replay-timed")
+FLUSH_EVERY = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    status INTEGER,
+    body BLOB,
+    error TEXT,
+    latency_ms REAL NOT NULL,
+    recorded_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS interactions_url_seq ON interactions (url, seq);
+"""
+
+# Recorded exception names → exception raised on replay.
+_ERRORS = {
+    "timeout": requests.Timeout,
+    "connection": requests.ConnectionError,
+}
+
+
+class CassetteMiss(requests.RequestException):
+    """
+    Raised in replay mode for a URL that was never recorded.
+    """
+
+
+def _error_kind(exc: Exception) -> str:
+    if isinstance(exc, requests.Timeout):
+        return "timeout"
+    if isinstance(exc, requests.ConnectionError):
+        return "connection"
+    return type(exc).__name__
+
+
+def _make_response(url: str, status: int, body: bytes):
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response.url = url
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+# ---------------------------------------------------------
+# CASSETTE (SCAN TRANSPORT)
+# ---------------------------------------------------------
+class Cassette:
+    """
+    Scan transport that records to, or replays from, a SQLite cassette.
+
+    Repeated scans of the same URL are stored as separate interactions
+    (``seq`` 0, 1, ...) and replayed in the same order, wrapping around
+    once exhausted. ``speed`` scales recorded latency in timed replay
+    (2.0 = twice as fast). Thread-safe.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", speed: float = 1.0):
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+
+        if mode != "record" and not os.path.exists(path):
+            raise FileNotFoundError(f"Cassette not found: {path}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._next_seq = {}
+        if mode == "record":
+            self._next_seq = dict(self._db.execute("SELECT url, MAX(seq) + 1 FROM interactions GROUP BY url"))
+        else:
+            self._counts = dict(self._db.execute("SELECT url, COUNT(*) FROM interactions GROUP BY url"))
+
+    def __call__(self, url, api_url, timeout, session, send):
+        if self.mode == "record":
+            return self._record(url, api_url, timeout, session, send)
+        return self._replay(url, timeout)
+
+    # -----------------------------------------------------
+    # Record
+    # -----------------------------------------------------
+    def _record(self, url, api_url, timeout, session, send):
+        t0 = time.perf_counter()
+        try:
+            response = send(url, api_url, timeout, session)
+        except requests.RequestException as exc:
+            self._store(url, None, None, _error_kind(exc), (time.perf_counter() - t0) * 1000.0)
+            raise
+        self._store(url, response.status_code, response.content, None, (time.perf_counter() - t0) * 1000.0)
+        return response
+
+    def _store(self, url, status, body, error, latency_ms):
+        with self._lock:
+            seq = self._next_seq.get(url, 0)
+            self._next_seq[url] = seq + 1
+            blob = zlib.compress(body, 6) if body is not None else None
+            self._pending.append((url, seq, status, blob, error, latency_ms, time.time()))
+            if len(self._pending) >= FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self):
+        if self._pending:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO interactions (url, seq, status, body, error, latency_ms, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._pending,
+            )
+            self._db.commit()
+            self._pending = []
+
+    # -----------------------------------------------------
+    # Replay
+    # -----------------------------------------------------
+    def _replay(self, url, timeout):
+        with self._lock:
+            count = self._counts.get(url)
+            if not count:
+                raise CassetteMiss(f"No recorded interaction for {url}")
+            seq = self._next_seq.get(url, 0)
+            self._next_seq[url] = (seq + 1) % count
+            status, blob, error, latency_ms = self._db.execute(
+                "SELECT status, body, error, latency_ms FROM interactions WHERE url = ? AND seq = ?",
+                (url, seq),
+            ).fetchone()
+
+        if self.mode == "replay-timed":
+            delay_s = latency_ms / 1000.0 / self.speed
+            if timeout is not None and delay_s > timeout:
+                time.sleep(timeout)
+                raise requests.Timeout(f"Replayed latency {latency_ms:.0f} ms exceeds timeout")
+            time.sleep(delay_s)
+
+        if error:
+            raise _ERRORS.get(error, requests.RequestException)(f"Replayed {error} for {url}")
+        return _make_response(url, status, zlib.decompress(blob))
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def info(self) -> dict:
+        with self._lock:
+            self._flush()
+            total, urls, errors, mean_ms = self._db.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT url), SUM(error IS NOT NULL), AVG(latency_ms) FROM interactions"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "interactions": total,
+            "urls": urls,
+            "errors": errors or 0,
+            "mean_latency_ms": round(mean_ms or 0.0, 2),
+            "size_bytes": os.path.getsize(self.path),
+        }
+
+
+_ACTIVE = None
+
+
+def install(path: str, mode: str = "replay", speed: float = 1.0) -> Cassette:
+    """
+    Installs a cassette as the process-wide scan transport.
+    """
+    global _ACTIVE
+    uninstall()
+    _ACTIVE = Cassette(path, mode, speed)
+    set_scan_transport(_ACTIVE)
+    return _ACTIVE
+
+
+def uninstall():
+    global _ACTIVE
+    if _ACTIVE is not None:
+        set_scan_transport(None)
+        _ACTIVE.close()
+        _ACTIVE = None
+
+
+def install_from_env():
+    """
+    Installs a cassette from FRAUDSHIELD_CASSETTE / _MODE / _SPEED.
+    Pending recordings are flushed at interpreter exit.
+    """
+    import atexit
+
+    cassette = install(
+        os.environ["FRAUDSHIELD_CASSETTE"],
+        os.environ.get("FRAUDSHIELD_CASSETTE_MODE", "replay"),
+        float(os.environ.get("FRAUDSHIELD_CASSETTE_SPEED", "1.0")),
+    )
+    atexit.register(uninstall)
+    return cassette
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record/replay cassettes for FraudShield scans.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="scan URLs against the live endpoint and record them")
+    rec.add_argument("path")
+    rec.add_argument("--urls", required=True, help="file with one URL per line")
+    rec.add_argument("--endpoint", help="scan endpoint (default: utils.API_URL)")
+    rec.add_argument("--timeout", type=float, default=10.0)
+
+    info = sub.add_parser("info", help="summarize a cassette")
+    info.add_argument("path")
+
+    args = parser.parse_args(argv)
+    if args.command == "record":
+        cassette = install(args.path, "record")
+        with open(args.urls, "r", encoding="utf-8") as f:
+            for line in f:
+                url = line.strip()
+                if url and not url.startswith("#"):
+                    try:
+                        post_scan(url, api_url=args.endpoint, timeout=args.timeout)
+                    except requests.RequestException:
+                        pass
+        summary = cassette.info()
+        uninstall()
+    else:
+        cassette = Cassette(args.path, "replay")
+        summary = cassette.info()
+        cassette.close()
+
+    for key, value in summary.items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
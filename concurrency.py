@@ -0,0 +1,148 @@
+"""
+Adaptive (AIMD) concurrency window for batch scans.
+
+A fixed concurrency level either under-uses a healthy backend or piles
+onto a struggling one. AIMDController keeps a window between a floor
+and a ceiling and adjusts it from every backend call (it is a utils
+scan listener, so cache hits don't count):
+
+- a healthy call grows the window by ``increase / window``, about one
+  slot per window's worth of completions (additive increase);
+- a congested call (timeout, connection error, 429/5xx, or latency above
+  ``latency_tolerance`` times the best recent latency) multiplies it by
+  ``decrease``, at most once per smoothed round trip, so one burst of
+  slow responses counts as one signal (multiplicative decrease);
+- other errors leave it alone, including ``deadline_exceeded``: a call
+  whose timeout a batch deadline cut short says nothing about the
+  backend.
+
+batch.iter_completed re-reads ``window`` before every submission.
+install() returns the process-wide controller used by the dashboard.
+
+    FRAUDSHIELD_CONCURRENCY_FLOOR=2      smallest window
+    FRAUDSHIELD_CONCURRENCY_CEILING=32   largest window (fits the HTTP pool)
+"""
+import math
+import os
+import threading
+import time
+
+from metrics import counter, gauge
+from utils import add_scan_listener
+
+CONCURRENCY_FLOOR = int(os.environ.get("FRAUDSHIELD_CONCURRENCY_FLOOR", "2"))
+CONCURRENCY_CEILING = int(os.environ.get("FRAUDSHIELD_CONCURRENCY_CEILING", "32"))
+INITIAL_WINDOW = 8
+LATENCY_TOLERANCE = 1.5
+BASELINE_DRIFT = 0.01  # how fast the best-latency baseline follows slower samples
+
+CONGESTION_ERRORS = frozenset(("timeout", "connection", "http_429"))
+
+CONCURRENCY_WINDOW = gauge("fraudshield_concurrency_window", "Current adaptive batch concurrency window.")
+CONCURRENCY_ADJUSTMENTS = counter(
+    "fraudshield_concurrency_adjustments_total", "Adaptive concurrency window changes.", ("direction",)
+)
+
+
+def is_congestion_error(error: str) -> bool:
+    """
+    True for error types that mean the backend is overloaded (as opposed
+    to a bad request or an unparseable body).
+    """
+    return error in CONGESTION_ERRORS or (error or "").startswith("http_5")
+
+
+class AIMDController:
+    """
+    Thread-safe AIMD window. Feed it with record() (or register on_scan
+    as a scan listener) and read ``window`` for the current limit.
+    """
+
+    def __init__(
+        self,
+        initial: int = INITIAL_WINDOW,
+        floor: int = CONCURRENCY_FLOOR,
+        ceiling: int = CONCURRENCY_CEILING,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = LATENCY_TOLERANCE,
+    ):
+        self.ceiling = max(1, ceiling)
+        self.floor = min(max(1, floor), self.ceiling)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.limit = float(min(max(initial, self.floor), self.ceiling))
+        self.baseline_ms = None
+        self.smoothed_ms = None
+        self.increases = 0
+        self.decreases = 0
+        self._last_decrease = -math.inf
+        self._lock = threading.Lock()
+        self._increase_metric = CONCURRENCY_ADJUSTMENTS.labels("increase")
+        self._decrease_metric = CONCURRENCY_ADJUSTMENTS.labels("decrease")
+        CONCURRENCY_WINDOW.set(self.limit)
+
+    @property
+    def window(self) -> int:
+        return int(self.limit)
+
+    def _slow(self, latency_ms: float) -> bool:
+        return self.baseline_ms is not None and latency_ms > self.latency_tolerance * self.baseline_ms
+
+    def record(self, latency_ms: float, error: str = None):
+        """
+        Adjusts the window for one completed backend call.
+        """
+        congested = is_congestion_error(error) or (not error and self._slow(latency_ms))
+        now = time.monotonic()
+        with self._lock:
+            if not error:
+                if self.baseline_ms is None or latency_ms < self.baseline_ms:
+                    self.baseline_ms = latency_ms
+                else:
+                    self.baseline_ms += (latency_ms - self.baseline_ms) * BASELINE_DRIFT
+                self.smoothed_ms = latency_ms if self.smoothed_ms is None else self.smoothed_ms * 0.8 + latency_ms * 0.2
+
+            if congested:
+                # Calls already in flight when the window shrank report the
+                # same overload; wait one round trip before shrinking again.
+                if now - self._last_decrease < (self.smoothed_ms or latency_ms) / 1000.0:
+                    return
+                self._last_decrease = now
+                limit = max(self.floor, self.limit * self.decrease)
+                self.decreases += 1
+                self._decrease_metric.inc()
+            elif not error:
+                limit = min(self.ceiling, self.limit + self.increase / self.limit)
+                if int(limit) > int(self.limit):
+                    self.increases += 1
+                    self._increase_metric.inc()
+            else:
+                return
+            self.limit = limit
+        CONCURRENCY_WINDOW.set(limit)
+
+    def on_scan(self, latency_s: float, error: str):
+        self.record(latency_s * 1000.0, error)
+
+    def describe(self) -> str:
+        return f"{self.window} (range {self.floor}–{self.ceiling}; {self.increases} increases, {self.decreases} backoffs)"
+
+
+_CONTROLLER = None
+_CONTROLLER_LOCK = threading.Lock()
+
+
+def install() -> AIMDController:
+    """
+    Returns the process-wide controller, fed by every backend call (utils
+    scan listener), so the window learned by one batch carries over to
+    the next.
+    """
+    global _CONTROLLER
+    with _CONTROLLER_LOCK:
+        if _CONTROLLER is None:
+            _CONTROLLER = AIMDController()
+            add_scan_listener(_CONTROLLER.on_scan)
+    return _CONTROLLER
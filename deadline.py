@@ -0,0 +1,43 @@
+"""
+Wall-clock deadlines for interactive batch scans.
+
+A batch gets one Deadline. Each backend call's timeout is its budget(),
+the smaller of the normal per-request timeout and the time left, so no
+call can run past the deadline. batch.iter_completed stops collecting
+when it expires. URLs without a verdict by then get a
+``deadline_exceeded`` error, shown as TIMEOUT in batch tables.
+
+    FRAUDSHIELD_BATCH_DEADLINE=30    default batch deadline in seconds
+"""
+import os
+import time
+
+REQUEST_TIMEOUT_S = 10.0
+BATCH_DEADLINE_S = float(os.environ.get("FRAUDSHIELD_BATCH_DEADLINE", "30"))
+MIN_BUDGET_S = 0.05  # less than this left: don't start the call
+
+
+class Deadline:
+    """
+    A point in time (monotonic clock) ``seconds`` from now.
+    """
+
+    __slots__ = ("seconds", "expires_at")
+
+    def __init__(self, seconds: float = BATCH_DEADLINE_S):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() < MIN_BUDGET_S
+
+    def budget(self, timeout: float = REQUEST_TIMEOUT_S) -> float:
+        """
+        Timeout for a call starting now: ``timeout`` capped by the time
+        left.
+        """
+        return min(timeout, self.remaining())
@@ -0,0 +1,165 @@
+import csv
+import io
+import tempfile
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from results import LABELS
+
+# Fixed export schema; rows missing a field are written as empty/null.
+EXPORT_COLUMNS = ("url", "risk_class", "risk_score_%", "latency_ms")
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("url", pa.string()),
+        ("risk_class", pa.dictionary(pa.int8(), pa.string())),
+        ("risk_score_%", pa.float64()),
+        ("latency_ms", pa.float64()),
+    ]
+)
+
+CHUNK_ROWS = 10_000
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+# format -> (label, mime type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("CSV", "text/csv", "csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _cell(value):
+    # NaN (e.g. no latency for a deadline-cut row) is an empty cell, as
+    # in add_batch, not the string "nan".
+    return None if value != value else value
+
+
+# ---------------------------------------------------------
+# STREAMING BATCH RESULT EXPORT (CSV / PARQUET)
+# ---------------------------------------------------------
+class BatchResultExporter:
+    """
+    Writes batch result rows incrementally into a spooled temp file.
+
+    Rows are buffered up to ``chunk_rows`` and then flushed as one CSV
+    block or one Parquet row group (risk classes dictionary-encoded), so
+    peak memory is bounded by the chunk size rather than the run size.
+    The spool stays in memory up to ``SPOOL_MAX_BYTES`` and then rolls
+    over to disk.
+    """
+
+    def __init__(self, fmt: str = "csv", chunk_rows: int = CHUNK_ROWS):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.rows_written = 0
+        self.spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+
+        self._buffer = []
+        self._finished = False
+
+        if fmt == "csv":
+            self._text = io.TextIOWrapper(self.spool, encoding="utf-8", newline="", write_through=True)
+            self._csv = csv.writer(self._text, lineterminator="\n")
+            self._csv.writerow(EXPORT_COLUMNS)
+        else:
+            self._sink = pa.PythonFile(self.spool, mode="w")
+            self._parquet = pq.ParquetWriter(self._sink, EXPORT_SCHEMA)
+
+    @property
+    def mime(self) -> str:
+        return EXPORT_FORMATS[self.fmt][1]
+
+    @property
+    def extension(self) -> str:
+        return EXPORT_FORMATS[self.fmt][2]
+
+    def add(self, row: dict):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.chunk_rows:
+            self._flush()
+
+    def extend(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def add_batch(self, batch):
+        """
+        Writes a ScanResultBatch straight from its columns, one chunk of
+        ``chunk_rows`` at a time, without building per-row dicts.
+        """
+        self._flush()
+        for start in range(0, len(batch), self.chunk_rows):
+            columns = batch.export_columns(start, start + self.chunk_rows)
+            if self.fmt == "csv":
+                labels = np.asarray(LABELS, dtype=object)[columns["risk_class"]].tolist()
+                scores = [None if s != s else s for s in columns["risk_score_%"].tolist()]
+                latencies = [None if v != v else v for v in columns["latency_ms"].tolist()]
+                self._csv.writerows(zip(columns["url"], labels, scores, latencies))
+            else:
+                codes = pa.array(columns["risk_class"], pa.int8())
+                self._parquet.write_batch(
+                    pa.record_batch(
+                        [
+                            pa.array(columns["url"], pa.string()),
+                            pa.DictionaryArray.from_arrays(codes, pa.array(LABELS, pa.string())),
+                            pa.array(columns["risk_score_%"], pa.float64(), from_pandas=True),
+                            pa.array(columns["latency_ms"], pa.float64(), from_pandas=True),
+                        ],
+                        schema=EXPORT_SCHEMA,
+                    )
+                )
+            self.rows_written += len(columns["url"])
+
+    def _flush(self):
+        if not self._buffer:
+            return
+
+        if self.fmt == "csv":
+            self._csv.writerows([[_cell(row.get(c)) for c in EXPORT_COLUMNS] for row in self._buffer])
+        else:
+            columns = {c: [row.get(c) for row in self._buffer] for c in EXPORT_COLUMNS}
+            batch = pa.record_batch(
+                [
+                    pa.array(columns["url"], pa.string()),
+                    pa.array(columns["risk_class"], pa.string()).dictionary_encode().cast(EXPORT_SCHEMA.field("risk_class").type),
+                    pa.array(columns["risk_score_%"], pa.float64(), from_pandas=True),
+                    pa.array(columns["latency_ms"], pa.float64(), from_pandas=True),
+                ],
+                schema=EXPORT_SCHEMA,
+            )
+            self._parquet.write_batch(batch)
+
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def finish(self):
+        """
+        Flushes remaining rows, finalizes the file and returns the spool
+        rewound to the start (ready to be served as a download).
+        """
+        if not self._finished:
+            self._flush()
+            if self.fmt == "csv":
+                self._text.flush()
+                self._text.detach()
+            else:
+                self._parquet.close()
+            self._finished = True
+        self.spool.seek(0)
+        return self.spool
+
+    def close(self):
+        self.spool.close()
+
+
+def export_rows(rows, fmt: str = "csv", chunk_rows: int = CHUNK_ROWS):
+    """
+    Streams an iterable of result rows into a finished exporter.
+    """
+    exporter = BatchResultExporter(fmt, chunk_rows=chunk_rows)
+    exporter.extend(rows)
+    exporter.finish()
+    return exporter
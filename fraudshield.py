@@ -0,0 +1,219 @@
+"""
+Headless command-line entry point.
+
+    python -m fraudshield scan urls.txt more.txt.gz
+    cat urls.txt | python -m fraudshield scan --concurrency 16 > results.jsonl
+    python -m fraudshield scan --adaptive --concurrency 64 urls.txt
+    python -m fraudshield queue add urls.txt && python -m fraudshield queue work
+
+``scan`` reads URLs (one per line; blank lines and ``#`` comments are
+skipped) from the given files or stdin, scans them concurrently and
+writes one JSON object per URL to stdout as each completes. A summary
+line goes to stderr. With ``--adaptive`` the number of scans in flight
+follows an AIMD window (concurrency.py) capped at ``--concurrency``.
+Exit status is 0 when the error rate is within
+``--max-error-rate`` (default 0), 1 otherwise.
+
+``queue`` manages the durable background job queue (jobqueue.py);
+``queue schedule`` enqueues the next staleness-driven re-scan cycle
+(scheduler.py).
+
+``audit compact`` moves sealed audit-log segments into the partitioned
+Parquet store; ``audit query`` searches it and writes JSONL to stdout
+(audit_store.py).
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+
+import audit
+import audit_store
+import rollups
+from batch import DEFAULT_CONCURRENCY, iter_scan_records
+from concurrency import AIMDController
+from jobqueue import JobQueue, WorkerPool
+from scheduler import MAX_BATCH, plan_rescan, schedule_cycle
+from utils import API_URL, add_scan_listener
+
+
+# ---------------------------------------------------------
+# 1) INPUT — FILES OR STDIN, STREAMED LINE BY LINE
+# ---------------------------------------------------------
+def _open_source(path: str):
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def iter_input_urls(paths):
+    for path in paths or ["-"]:
+        source = _open_source(path)
+        try:
+            for line in source:
+                url = line.strip()
+                if url and not url.startswith("#"):
+                    yield url
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+
+# ---------------------------------------------------------
+# 2) SCAN COMMAND
+# ---------------------------------------------------------
+def cmd_scan(args) -> int:
+    out = sys.stdout
+    total = errors = 0
+    t0 = time.perf_counter()
+
+    concurrency = args.concurrency
+    if args.adaptive:
+        concurrency = AIMDController(ceiling=args.concurrency)
+        add_scan_listener(concurrency.on_scan)
+
+    records = iter_scan_records(
+        iter_input_urls(args.inputs),
+        concurrency=concurrency,
+        api_url=args.endpoint,
+        timeout=args.timeout,
+    )
+    try:
+        for record in records:
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+            out.flush()
+            total += 1
+            if record["error"]:
+                errors += 1
+    except BrokenPipeError:
+        # Downstream closed (e.g. piped into head); stop quietly.
+        records.close()
+        sys.stdout = None
+        return 1
+    except KeyboardInterrupt:
+        records.close()
+        print("interrupted", file=sys.stderr)
+        return 130
+
+    elapsed = time.perf_counter() - t0
+    error_rate = errors / total if total else 0.0
+    print(
+        f"scanned={total} ok={total - errors} errors={errors} error_rate={error_rate:.2%} "
+        f"elapsed={elapsed:.1f}s throughput={total / elapsed if elapsed else 0.0:.1f} urls/s"
+        + (f" window={concurrency.describe()}" if args.adaptive else ""),
+        file=sys.stderr,
+    )
+    return 0 if error_rate <= args.max_error_rate else 1
+
+
+# ---------------------------------------------------------
+# 3) QUEUE COMMANDS (BACKGROUND BATCH VERIFICATION)
+# ---------------------------------------------------------
+def cmd_queue(args) -> int:
+    queue = JobQueue(args.db) if args.db else JobQueue()
+    if args.action == "add":
+        added = queue.enqueue(iter_input_urls(args.inputs), batch=args.batch)
+        print(f"enqueued={added}", file=sys.stderr)
+    elif args.action == "work":
+        pool = WorkerPool(queue, workers=args.workers, api_url=args.endpoint, timeout=args.timeout)
+        try:
+            if args.forever:
+                pool.start()
+                while True:
+                    time.sleep(3600)
+            else:
+                pool.run_until_empty()
+        except KeyboardInterrupt:
+            pool.stop()
+        print(f"processed={pool.processed}", file=sys.stderr)
+    elif args.action == "retry":
+        print(f"requeued={queue.retry_failed(args.batch)}", file=sys.stderr)
+    elif args.action == "schedule":
+        if args.dry_run:
+            plan, summary = plan_rescan(queue, args.max_batch)
+            for item in plan:
+                print(json.dumps(item))
+        else:
+            summary = schedule_cycle(queue, args.max_batch)
+        print(" ".join(f"{k}={v}" for k, v in summary.items()), file=sys.stderr)
+
+    stats = queue.stats()
+    eta = f"{stats['eta_s']:.0f}s" if stats["eta_s"] is not None else "-"
+    print(
+        f"queued={stats['queued']} running={stats['running']} done={stats['done']} failed={stats['failed']} "
+        f"throughput={stats['throughput_per_s'] * 60:.1f}/min eta={eta}",
+        file=sys.stderr,
+    )
+    return 1 if args.action == "work" and stats["failed"] else 0
+
+
+# ---------------------------------------------------------
+# 4) AUDIT LOG COMMANDS (COMPACTION + SEARCH)
+# ---------------------------------------------------------
+def cmd_audit(args) -> int:
+    if args.action == "compact":
+        summary = audit_store.compact_segments()
+        if args.purge:
+            audit_store.purge_compacted_segments()
+        print(" ".join(f"{k}={v}" for k, v in summary.items()), file=sys.stderr)
+        return 0
+
+    t0 = time.perf_counter()
+    df = audit_store.query_audit(args.since, args.until, args.suffix, args.tier, limit=args.limit)
+    for record in df.to_dict(orient="records"):
+        record["timestamp"] = record["timestamp"].isoformat()
+        print(json.dumps(record, default=str))
+    print(f"rows={len(df)} elapsed={time.perf_counter() - t0:.3f}s", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="fraudshield", description="FraudShield headless tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    scan = sub.add_parser("scan", help="scan URLs and stream JSONL results to stdout")
+    scan.add_argument("inputs", nargs="*", help="files with one URL per line (.gz ok); '-' or none for stdin")
+    scan.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="concurrent scans; the ceiling with --adaptive (default: %(default)s)")
+    scan.add_argument("--adaptive", action="store_true", help="adapt concurrency to backend latency and errors (AIMD)")
+    scan.add_argument("--endpoint", default=API_URL, help="scan endpoint (default: %(default)s)")
+    scan.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    scan.add_argument("--max-error-rate", type=float, default=0.0, help="exit 1 if the error rate exceeds this")
+    scan.set_defaults(func=cmd_scan)
+
+    queue = sub.add_parser("queue", help="durable background job queue")
+    queue.add_argument("action", choices=("add", "work", "status", "retry", "schedule"))
+    queue.add_argument("inputs", nargs="*", help="for 'add': URL files ('-' or none for stdin)")
+    queue.add_argument("--batch", help="batch name for 'add'/'retry' (default: today's date)")
+    queue.add_argument("--db", help="queue database (default: DATA_DIR/jobs.sqlite)")
+    queue.add_argument("-w", "--workers", type=int, default=4, help="worker threads for 'work'")
+    queue.add_argument("--forever", action="store_true", help="keep polling instead of exiting when empty")
+    queue.add_argument("--max-batch", type=int, default=MAX_BATCH, help="'schedule': URLs per re-scan cycle (default: %(default)s)")
+    queue.add_argument("--dry-run", action="store_true", help="'schedule': print the plan as JSONL without enqueueing")
+    queue.add_argument("--endpoint", default=API_URL, help="scan endpoint (default: %(default)s)")
+    queue.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    queue.set_defaults(func=cmd_queue)
+
+    audit_cmd = sub.add_parser("audit", help="compact and search the audit log")
+    audit_cmd.add_argument("action", choices=("compact", "query"))
+    audit_cmd.add_argument("--since", help="'query': first date, YYYY-MM-DD (inclusive)")
+    audit_cmd.add_argument("--until", help="'query': last date, YYYY-MM-DD (inclusive)")
+    audit_cmd.add_argument("--suffix", help="'query': domain or domain suffix, e.g. .xyz or example.com")
+    audit_cmd.add_argument("--tier", action="append", help="'query': risk class (repeatable)")
+    audit_cmd.add_argument("--limit", type=int, help="'query': newest N entries only")
+    audit_cmd.add_argument("--purge", action="store_true", help="'compact': delete raw segments once compacted")
+    audit_cmd.set_defaults(func=cmd_audit)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    audit.install()
+    rollups.install()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+"""
+Local pre-click verdict gateway.
+
+A small asyncio HTTP/1.1 service (stdlib only, keep-alive) that answers
+the same ``/scan_url`` contract as the hosted API, for the "Outbound
+Link Pre-Click Check" pattern where a verdict is needed before the
+click completes:
+
+1. the in-process verdict cache (shared with the dashboard) — answered
+   on the event loop, no thread hop;
+2. the job queue's stored results, if still within the scheduler's
+   refresh interval for that tier;
+3. the backend, with concurrent misses for one URL coalesced into a
+   single call. If the backend fails, a stale stored verdict is served.
+
+The response carries ``X-Verdict-Source: cache|store|backend|stale``.
+
+    python gateway.py --port 8766
+    curl "http://127.0.0.1:8766/scan_url?url=https://example.com"
+    curl -X POST http://127.0.0.1:8766/scan_url -d '{"url":"https://example.com"}'
+
+The dashboard starts one on FRAUDSHIELD_GATEWAY_PORT (default 8766; 0
+disables) through resources.get_shared_resources().
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import audit
+import rollups
+from jobqueue import JobQueue
+from metrics import COALESCED_CALLS, counter, histogram, start_metrics_server
+from scheduler import refresh_interval
+from utils import VERDICT_CACHE, run_fraudshield_scan
+from verdict_cache import VerdictCache
+
+GATEWAY_PORT = int(os.environ.get("FRAUDSHIELD_GATEWAY_PORT", "8766") or 0)
+FETCH_WORKERS = 32
+
+GATEWAY_REQUESTS = counter("fraudshield_gateway_requests_total", "Gateway verdicts by source.", ("source",))
+GATEWAY_LATENCY = histogram(
+    "fraudshield_gateway_latency_seconds",
+    "Gateway time to answer, request parsed to response written.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0),
+)
+
+_STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 502: "Bad Gateway"}
+
+
+# ---------------------------------------------------------
+# 1) VERDICT LOOKUP (CACHE → STORE → BACKEND)
+# ---------------------------------------------------------
+def _fresh_for(stored: dict, now: float) -> float:
+    """
+    Seconds until a stored verdict is due for a rescan (<= 0: stale).
+    """
+    signals = stored.get("signals") or {}
+    interval = refresh_interval(stored["risk_class"], stored["blacklist_flag"], signals.get("domain_age_days"))
+    return stored["scanned_at"] + interval - now
+
+
+class VerdictGateway:
+    """
+    Resolves verdicts for the HTTP front end. Cache hits never leave the
+    event loop; store lookups and backend calls run on a thread pool,
+    one in flight per URL.
+    """
+
+    def __init__(self, cache: VerdictCache = None, queue: JobQueue = None, fetch=run_fraudshield_scan, workers: int = FETCH_WORKERS):
+        # Not ``cache or ...``: an empty VerdictCache is falsy (__len__).
+        if cache is None:
+            cache = VERDICT_CACHE if VERDICT_CACHE is not None else VerdictCache(name="gateway")
+        self.cache = cache
+        self.queue = queue
+        self.fetch = fetch
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fraudshield-gateway")
+        self._flights = {}
+        self._coalesced = COALESCED_CALLS.labels("gateway_single_flight")
+        self._sources = {s: GATEWAY_REQUESTS.labels(s) for s in ("cache", "store", "backend", "stale", "error")}
+
+    def _resolve(self, url: str):
+        # Runs on the thread pool: store first, then the backend.
+        stale = None
+        if self.queue is not None:
+            stored = self.queue.latest_result(url)
+            if stored is not None and stored["risk_class"] is not None:
+                fresh_for = _fresh_for(stored, time.time())
+                del stored["scanned_at"]
+                if fresh_for > 0:
+                    # Cached only while the stored verdict stays fresh.
+                    self.cache.put(url, stored, ttl_s=fresh_for)
+                    return stored, "store"
+                stale = stored
+        verdict = self.fetch(url)
+        if verdict is not None:
+            self.cache.put(url, verdict)
+            return verdict, "backend"
+        if stale is not None:
+            return stale, "stale"
+        return None, "error"
+
+    async def lookup(self, url: str):
+        """
+        Returns (verdict or None, source).
+        """
+        verdict = self.cache.get(url)
+        if verdict is not None:
+            self._sources["cache"].inc()
+            return verdict, "cache"
+
+        flight = self._flights.get(url)
+        if flight is not None:
+            self._coalesced.inc()
+            verdict, source = await asyncio.shield(flight)
+            self._sources[source].inc()
+            return verdict, source
+
+        loop = asyncio.get_running_loop()
+        flight = self._flights[url] = loop.create_future()
+        result = (None, "error")  # also what waiters get if this task is cancelled
+        try:
+            result = await loop.run_in_executor(self._executor, self._resolve, url)
+        except Exception:
+            pass
+        finally:
+            del self._flights[url]
+            flight.set_result(result)
+        self._sources[result[1]].inc()
+        return result
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# ---------------------------------------------------------
+# 2) HTTP FRONT END
+# ---------------------------------------------------------
+def _request_url(method: str, target: str, body: bytes):
+    if method == "GET":
+        return (parse_qs(urlsplit(target).query).get("url") or [None])[0]
+    try:
+        return str(json.loads(body or b"{}")["url"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+class GatewayServer:
+    """
+    asyncio HTTP/1.1 server: POST /scan_url (JSON body), GET
+    /scan_url?url=..., GET /health.
+    """
+
+    def __init__(self, gateway: VerdictGateway):
+        self.gateway = gateway
+
+    async def handle(self, method: str, target: str, body: bytes):
+        path = target.split("?", 1)[0]
+        if path == "/health" and method == "GET":
+            return 200, {"status": "ok", "cached": len(self.gateway.cache)}, None
+        if path != "/scan_url" or method not in ("GET", "POST"):
+            return 404, {"detail": "not found"}, None
+        url = _request_url(method, target, body)
+        if not url:
+            return 400, {"detail": "pass a 'url' (JSON body or query parameter)"}, None
+        verdict, source = await self.gateway.lookup(url.strip())
+        if verdict is None:
+            return 502, {"detail": "backend unavailable"}, source
+        return 200, verdict, source
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                t0 = time.perf_counter()
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0) or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload, source = await self.handle(method, target, body)
+                data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {_STATUS_TEXT.get(status, 'Error')}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        + (f"X-Verdict-Source: {source}\r\n" if source else "")
+                        + f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                GATEWAY_LATENCY.observe(time.perf_counter() - t0)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = GATEWAY_PORT, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+# ---------------------------------------------------------
+# 3) RUNNING ALONGSIDE THE DASHBOARD / STANDALONE
+# ---------------------------------------------------------
+_GATEWAY = None
+_GATEWAY_LOCK = threading.Lock()
+
+
+def start_gateway(port: int = None, host: str = "127.0.0.1"):
+    """
+    Runs a gateway on a daemon thread with its own event loop, once per
+    process. Returns (gateway, bound_port), or (None, None) if disabled
+    (port 0) or the port is taken.
+    """
+    global _GATEWAY
+    port = GATEWAY_PORT if port is None else port
+    with _GATEWAY_LOCK:
+        if _GATEWAY is not None:
+            return _GATEWAY
+        if not port:
+            return None, None
+        gateway = VerdictGateway(queue=JobQueue())
+        bound = {}
+        started = threading.Event()
+
+        def ready(p):
+            bound["port"] = p
+            started.set()
+
+        def run():
+            try:
+                asyncio.run(GatewayServer(gateway).serve(host, port, ready=ready))
+            except OSError:
+                started.set()
+
+        threading.Thread(target=run, name="fraudshield-gateway", daemon=True).start()
+        started.wait(10)
+        if "port" not in bound:
+            gateway.close()
+            return None, None
+        _GATEWAY = gateway, bound["port"]
+        return _GATEWAY
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local pre-click verdict gateway for the FraudShield /scan_url API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=GATEWAY_PORT or 8766)
+    parser.add_argument("--no-store", action="store_true", help="don't answer from the job queue's stored results")
+    args = parser.parse_args(argv)
+
+    audit.install()
+    rollups.install()
+    metrics_port = start_metrics_server()
+    gateway = VerdictGateway(queue=None if args.no_store else JobQueue())
+    print(f"FraudShield gateway on http://{args.host}:{args.port}/scan_url")
+    if metrics_port:
+        print(f"Metrics on http://127.0.0.1:{metrics_port}/metrics")
+    try:
+        asyncio.run(GatewayServer(gateway).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        gateway.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# Result categories stored as int8 codes. Anything outside this set is
+# recorded as "Unknown" so the category table never grows.
+RESULT_CATEGORIES = (
+    "Safe",
+    "Low Risk",
+    "Suspicious",
+    "High Risk",
+    "Blacklisted",
+    "Unknown",
+    "API_ERROR",
+)
+_RESULT_CODES = {name: code for code, name in enumerate(RESULT_CATEGORIES)}
+_UNKNOWN_CODE = _RESULT_CODES["Unknown"]
+
+
+# ---------------------------------------------------------
+# BOUNDED COLUMNAR SCAN HISTORY
+# ---------------------------------------------------------
+class ScanHistory:
+    """
+    Fixed-capacity ring buffer of scan results, stored column-wise.
+
+    Columns are preallocated NumPy arrays (epoch-ns timestamps, interned
+    URL ids, int8 result codes, float scores), so memory stays flat no
+    matter how many scans are appended. Every value is written twice
+    (at ``i`` and ``i + capacity``) which keeps the newest ``capacity``
+    rows contiguous: ``to_frame`` can then hand out views instead of
+    copies, already in chronological order.
+
+    URLs are interned into a table of at most ``capacity`` slots with
+    reference counts; a slot is recycled once the last row using it is
+    overwritten.
+    """
+
+    def __init__(self, capacity: int = 5000):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self._count = 0
+
+        self._ts = np.zeros(2 * capacity, dtype=np.int64)
+        self._url_id = np.zeros(2 * capacity, dtype=np.int32)
+        self._result = np.zeros(2 * capacity, dtype=np.int8)
+        self._score = np.full(2 * capacity, np.nan, dtype=np.float64)
+
+        self._url_table = np.empty(capacity, dtype=object)
+        self._url_refs = np.zeros(capacity, dtype=np.int32)
+        self._url_index = {}
+        self._free_ids = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def total_appended(self) -> int:
+        return self._count
+
+    # -----------------------------------------------------
+    # URL interning
+    # -----------------------------------------------------
+    def _intern(self, url: str) -> int:
+        url_id = self._url_index.get(url)
+        if url_id is None:
+            url_id = self._free_ids.pop()
+            self._url_index[url] = url_id
+            self._url_table[url_id] = url
+        self._url_refs[url_id] += 1
+        return url_id
+
+    def _release(self, url_id: int):
+        self._url_refs[url_id] -= 1
+        if self._url_refs[url_id] == 0:
+            del self._url_index[self._url_table[url_id]]
+            self._url_table[url_id] = None
+            self._free_ids.append(url_id)
+
+    # -----------------------------------------------------
+    # Append (O(1))
+    # -----------------------------------------------------
+    def append(self, url: str, result: str, score: float = float("nan"), ts_ns: int = None):
+        """
+        Records one scan. Overwrites the oldest row once full.
+        """
+        cap = self.capacity
+        i = self._count % cap
+
+        # Release the row being overwritten before interning the new URL,
+        # so the free list always has a slot available.
+        if self._count >= cap:
+            self._release(int(self._url_id[i]))
+
+        url_id = self._intern(url)
+        code = _RESULT_CODES.get(result, _UNKNOWN_CODE)
+        ts = time.time_ns() if ts_ns is None else ts_ns
+        score = np.nan if score is None else float(score)
+
+        for j in (i, i + cap):
+            self._ts[j] = ts
+            self._url_id[j] = url_id
+            self._result[j] = code
+            self._score[j] = score
+
+        self._count += 1
+
+    # -----------------------------------------------------
+    # Zero-copy access
+    # -----------------------------------------------------
+    def _window(self) -> slice:
+        if self._count < self.capacity:
+            return slice(0, self._count)
+        start = self._count % self.capacity
+        return slice(start, start + self.capacity)
+
+    def to_frame(self, with_urls: bool = False) -> pd.DataFrame:
+        """
+        Returns the retained rows (oldest first) as a DataFrame.
+
+        ``time``, ``url_id``, ``result`` codes and ``score`` are views on
+        the ring buffer; pass ``with_urls=True`` to additionally resolve
+        URL strings for display (this column is a copy).
+        """
+        w = self._window()
+        frame = pd.DataFrame(
+            {
+                "time": self._ts[w].view("datetime64[ns]"),
+                "url_id": self._url_id[w],
+                "result": pd.Categorical.from_codes(
+                    self._result[w], categories=RESULT_CATEGORIES, validate=False
+                ),
+                "score": self._score[w],
+            },
+            copy=False,
+        )
+        if with_urls:
+            frame.insert(1, "url", self._url_table[self._url_id[w]])
+        return frame
+
+    def result_counts(self) -> pd.Series:
+        """
+        Returns the number of retained rows per result category.
+        """
+        counts = np.bincount(self._result[self._window()], minlength=len(RESULT_CATEGORIES))
+        return pd.Series(counts, index=RESULT_CATEGORIES, name="count")
+
+    def nbytes(self) -> int:
+        """
+        Approximate fixed memory footprint of the column arrays.
+        """
+        return (
+            self._ts.nbytes
+            + self._url_id.nbytes
+            + self._result.nbytes
+            + self._score.nbytes
+            + self._url_table.nbytes
+            + self._url_refs.nbytes
+        )
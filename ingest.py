@@ -0,0 +1,213 @@
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+
+from utils import DATA_DIR
+
+CHECKPOINT_DIR = os.path.join(DATA_DIR, "checkpoints")
+CHUNK_SIZE = 500
+URL_COLUMN_NAMES = ("url", "urls", "link", "links", "website", "domain")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+# ---------------------------------------------------------
+# 1) STREAM PARSING — CSV / TEXT, OPTIONALLY GZIP
+# ---------------------------------------------------------
+def fingerprint_upload(fileobj, block_size: int = 1 << 20) -> str:
+    """
+    Returns a SHA-256 hex digest of the raw upload, read in blocks.
+    Used as the checkpoint key, so a re-upload of the same file resumes.
+    """
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(block_size), b""):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def _open_text(fileobj):
+    fileobj.seek(0)
+    head = fileobj.read(2)
+    fileobj.seek(0)
+    raw = gzip.GzipFile(fileobj=fileobj, mode="rb") if head == _GZIP_MAGIC else fileobj
+    return io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+
+
+def _is_csv(name: str) -> bool:
+    name = name.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return name.endswith(".csv")
+
+
+def _iter_csv_urls(text):
+    reader = csv.reader(text)
+    first = next(reader, None)
+    if first is None:
+        return
+
+    # Use a header column named like "url" if there is one, otherwise
+    # treat the first row as data and read the first column.
+    header = [c.strip().lower() for c in first]
+    column = next((header.index(n) for n in URL_COLUMN_NAMES if n in header), None)
+    if column is None:
+        column = 0
+        yield first[0] if first else ""
+
+    for row in reader:
+        if len(row) > column:
+            yield row[column]
+
+
+def iter_url_chunks(fileobj, name: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Streams URLs from an uploaded CSV or text file (optionally gzip) and
+    yields de-duplicated lists of at most ``chunk_size`` URLs.
+
+    Only the current chunk and a set of 8-byte digests of URLs already
+    seen are kept in memory. Chunking is deterministic for a given file,
+    which is what lets a checkpoint skip chunks on resume.
+    """
+    text = _open_text(fileobj)
+    lines = _iter_csv_urls(text) if _is_csv(name) else text
+
+    seen = set()
+    chunk = []
+    try:
+        for line in lines:
+            url = line.strip()
+            if not url or url.startswith("#"):
+                continue
+            key = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+            if key in seen:
+                continue
+            seen.add(key)
+            chunk.append(url)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        # Leave the caller's upload open for later reruns.
+        text.detach()
+
+
+def upload_progress(fileobj, size: int) -> float:
+    """
+    Returns the fraction of the raw upload consumed so far.
+    """
+    if not size:
+        return 0.0
+    return min(fileobj.tell() / size, 1.0)
+
+
+# ---------------------------------------------------------
+# 2) CHECKPOINTS — RESUMABLE PROGRESS ON DISK
+# ---------------------------------------------------------
+class BatchCheckpoint:
+    """
+    On-disk progress for one uploaded file.
+
+    Results are appended to ``results.jsonl``; ``state.json`` records how
+    many chunks are done and the byte length of the results file at that
+    point. State is replaced atomically after each chunk, and the results
+    file is truncated back to the recorded length on resume, so a run
+    interrupted mid-chunk never leaves duplicate rows.
+    """
+
+    def __init__(self, fingerprint: str, source_name: str = ""):
+        self.path = os.path.join(CHECKPOINT_DIR, fingerprint)
+        self.results_path = os.path.join(self.path, "results.jsonl")
+        self.state_path = os.path.join(self.path, "state.json")
+        self.state = {
+            "source": source_name,
+            "chunks_done": 0,
+            "rows_done": 0,
+            "results_bytes": 0,
+            "calls_saved": 0,
+            "complete": False,
+        }
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+
+    @property
+    def chunks_done(self) -> int:
+        return self.state["chunks_done"]
+
+    @property
+    def rows_done(self) -> int:
+        return self.state["rows_done"]
+
+    @property
+    def calls_saved(self) -> int:
+        return self.state["calls_saved"]
+
+    @property
+    def complete(self) -> bool:
+        return self.state["complete"]
+
+    def open_results(self):
+        """
+        Opens the results file for appending, dropping any rows written
+        after the last committed chunk.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        f = open(self.results_path, "a+b")
+        f.truncate(self.state["results_bytes"])
+        f.seek(0, os.SEEK_END)
+        return f
+
+    def commit_chunk(self, results_file, rows, calls_saved: int = 0):
+        """
+        Appends one chunk of result rows and advances the checkpoint.
+        ``calls_saved`` counts rows answered by de-duplication.
+        """
+        written = 0
+        for row in rows:
+            results_file.write(json.dumps(row).encode("utf-8") + b"\n")
+            written += 1
+        results_file.flush()
+        os.fsync(results_file.fileno())
+
+        self.state["chunks_done"] += 1
+        self.state["rows_done"] += written
+        self.state["calls_saved"] += calls_saved
+        self.state["results_bytes"] = results_file.tell()
+        self._save()
+
+    def mark_complete(self):
+        self.state["complete"] = True
+        self._save()
+
+    def iter_results(self):
+        """
+        Yields committed result rows in scan order.
+        """
+        if not os.path.exists(self.results_path):
+            return
+        remaining = self.state["results_bytes"]
+        with open(self.results_path, "rb") as f:
+            for line in f:
+                remaining -= len(line)
+                if remaining < 0:
+                    break
+                yield json.loads(line)
+
+    def discard(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _save(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.state_path)
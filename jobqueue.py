@@ -0,0 +1,466 @@
+"""
+Durable background job queue for batch verification.
+
+Jobs (one URL each) live in a SQLite database under DATA_DIR, so queued
+work survives dashboard restarts and crashed workers. Workers claim a
+job by taking a time-limited lease; a lease that expires (worker died
+mid-scan) puts the job back in the queue. Transient failures are retried
+with exponential backoff, and results are keyed by job id, so a job that
+ends up scanned twice still has exactly one result row.
+
+    python -m fraudshield queue add urls.txt --batch nightly-2026-10-19
+    python -m fraudshield queue work --workers 8
+    python -m fraudshield queue status
+"""
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+
+from batch import make_session, scan_record
+from utils import DATA_DIR, map_risk_style
+
+QUEUE_PATH = os.path.join(DATA_DIR, "jobs.sqlite")
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_S = 2.0
+BACKOFF_MAX_S = 300.0
+LEASE_S = 60.0
+THROUGHPUT_WINDOW_S = 300.0
+
+JOB_STATES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    batch TEXT NOT NULL,
+    url TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_token TEXT,
+    leased_until REAL,
+    last_error TEXT,
+    enqueued_at REAL NOT NULL,
+    finished_at REAL,
+    UNIQUE (batch, url)
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, available_at);
+CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (state, leased_until);
+CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+
+CREATE TABLE IF NOT EXISTS results (
+    job_id INTEGER PRIMARY KEY REFERENCES jobs (id),
+    batch TEXT NOT NULL,
+    url TEXT NOT NULL,
+    risk_class TEXT,
+    risk_score REAL,
+    blacklist_flag INTEGER,
+    signals TEXT,
+    latency_ms REAL,
+    scanned_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_url ON results (url, scanned_at);
+"""
+
+
+def is_retryable(error: str) -> bool:
+    """
+    Network trouble, throttling and 5xx are worth retrying; other 4xx
+    responses will not change on a second attempt.
+    """
+    if error in ("timeout", "connection", "invalid_json", "http_429"):
+        return True
+    return error.startswith("http_5")
+
+
+def backoff_delay(attempts: int) -> float:
+    """
+    Exponential backoff with jitter: half the capped delay is fixed, the
+    other half random, so retries of one failing batch spread out.
+    """
+    cap = min(BACKOFF_MAX_S, BACKOFF_BASE_S * 2 ** max(attempts - 1, 0))
+    return cap / 2 + random.uniform(0, cap / 2)
+
+
+# ---------------------------------------------------------
+# 1) QUEUE (SQLITE)
+# ---------------------------------------------------------
+class JobQueue:
+    """
+    SQLite-backed queue. One connection per thread (WAL mode), so a pool
+    of workers and the dashboard can use the same instance.
+    """
+
+    def __init__(self, path: str = QUEUE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._next_reap = 0.0
+        self._db().executescript(_SCHEMA)
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _tx(self):
+        return _Transaction(self._db())
+
+    # -----------------------------------------------------
+    # Producer side
+    # -----------------------------------------------------
+    def enqueue(self, urls, batch: str = None) -> int:
+        """
+        Adds URLs to a batch (default: today's date, i.e. the nightly
+        run). A URL already in the batch is skipped, so re-enqueueing the
+        same list is harmless. Returns the number of new jobs.
+        """
+        batch = batch or time.strftime("%Y-%m-%d")
+        now = time.time()
+        added = 0
+        chunk = []
+        for url in urls:
+            chunk.append((batch, url, now, now))
+            if len(chunk) >= 1000:
+                added += self._insert(chunk)
+                chunk = []
+        if chunk:
+            added += self._insert(chunk)
+        return added
+
+    def _insert(self, rows) -> int:
+        with self._tx() as db:
+            before = db.total_changes
+            db.executemany(
+                "INSERT OR IGNORE INTO jobs (batch, url, available_at, enqueued_at) VALUES (?, ?, ?, ?)", rows
+            )
+            return db.total_changes - before
+
+    def retry_failed(self, batch: str = None) -> int:
+        """
+        Puts permanently failed jobs back in the queue with a fresh
+        attempt budget.
+        """
+        sql = "UPDATE jobs SET state = 'queued', attempts = 0, available_at = ? WHERE state = 'failed'"
+        params = [time.time()]
+        if batch:
+            sql += " AND batch = ?"
+            params.append(batch)
+        with self._tx() as db:
+            return db.execute(sql, params).rowcount
+
+    # -----------------------------------------------------
+    # Worker side
+    # -----------------------------------------------------
+    def _reap_expired(self, db, now: float):
+        # Jobs whose worker died mid-scan become claimable again.
+        if now >= self._next_reap:
+            db.execute(
+                "UPDATE jobs SET state = 'queued', lease_token = NULL, available_at = ? "
+                "WHERE state = 'running' AND leased_until < ?",
+                (now, now),
+            )
+            self._next_reap = now + LEASE_S / 4
+
+    def claim(self, lease_s: float = LEASE_S):
+        """
+        Leases the next ready job. Returns (job_id, url, attempts,
+        lease_token) or None if nothing is ready.
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        with self._tx() as db:
+            self._reap_expired(db, now)
+            row = db.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_token = ?, leased_until = ? "
+                "WHERE id = (SELECT id FROM jobs WHERE state = 'queued' AND available_at <= ? "
+                "ORDER BY available_at LIMIT 1) "
+                "RETURNING id, url, attempts",
+                (token, now + lease_s, now),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], row[2], token
+
+    def complete(self, job_id: int, token: str, record: dict) -> bool:
+        """
+        Marks the job done and stores the result in one transaction, if
+        ``token`` still holds the lease. A worker whose lease expired (the
+        job was re-queued or finished by someone else) writes nothing and
+        gets False. Results are keyed by job id, so a duplicate completion
+        overwrites instead of adding a second row.
+        """
+        now = time.time()
+        with self._tx() as db:
+            done = db.execute(
+                "UPDATE jobs SET state = 'done', finished_at = ?, lease_token = NULL, last_error = NULL "
+                "WHERE id = ? AND lease_token = ?",
+                (now, job_id, token),
+            )
+            if done.rowcount == 0:
+                return False
+            db.execute(
+                "INSERT OR REPLACE INTO results "
+                "(job_id, batch, url, risk_class, risk_score, blacklist_flag, signals, latency_ms, scanned_at) "
+                "SELECT id, batch, url, ?, ?, ?, ?, ?, ? FROM jobs WHERE id = ?",
+                (
+                    record["risk_class"],
+                    record["risk_score"],
+                    record["blacklist_flag"],
+                    json.dumps(record["signals"]) if record["signals"] is not None else None,
+                    record["latency_ms"],
+                    now,
+                    job_id,
+                ),
+            )
+        return True
+
+    def fail(self, job_id: int, token: str, attempts: int, error: str):
+        """
+        Schedules a retry after a backoff delay, or marks the job failed
+        once it is not retryable or out of attempts.
+        """
+        now = time.time()
+        with self._tx() as db:
+            if is_retryable(error) and attempts < MAX_ATTEMPTS:
+                db.execute(
+                    "UPDATE jobs SET state = 'queued', available_at = ?, lease_token = NULL, last_error = ? "
+                    "WHERE id = ? AND lease_token = ?",
+                    (now + backoff_delay(attempts), error, job_id, token),
+                )
+            else:
+                db.execute(
+                    "UPDATE jobs SET state = 'failed', finished_at = ?, lease_token = NULL, last_error = ? "
+                    "WHERE id = ? AND lease_token = ?",
+                    (now, error, job_id, token),
+                )
+
+    # -----------------------------------------------------
+    # Monitoring
+    # -----------------------------------------------------
+    def stats(self) -> dict:
+        """
+        Returns job counts per state, recent throughput (jobs finished
+        per second over the last few minutes) and an ETA for the rest.
+        """
+        now = time.time()
+        db = self._db()
+        counts = dict(db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        recent, first = db.execute(
+            "SELECT COUNT(*), MIN(finished_at) FROM jobs WHERE finished_at >= ?",
+            (now - THROUGHPUT_WINDOW_S,),
+        ).fetchone()
+
+        stats = {state: counts.get(state, 0) for state in JOB_STATES}
+        window = min(THROUGHPUT_WINDOW_S, now - first) if first else 0.0
+        throughput = recent / window if window > 1.0 else 0.0
+        remaining = stats["queued"] + stats["running"]
+        stats["depth"] = remaining
+        stats["throughput_per_s"] = throughput
+        stats["eta_s"] = remaining / throughput if throughput and remaining else None
+        return stats
+
+    def batches(self):
+        """
+        Returns (batch, jobs, done, failed, enqueued_at) per batch, newest first.
+        """
+        return self._db().execute(
+            "SELECT batch, COUNT(*), SUM(state = 'done'), SUM(state = 'failed'), MIN(enqueued_at) "
+            "FROM jobs GROUP BY batch ORDER BY MIN(enqueued_at) DESC"
+        ).fetchall()
+
+    def iter_results(self, batch: str = None):
+        """
+        Yields stored results (in job order) as plain dicts.
+        """
+        sql = "SELECT url, risk_class, risk_score, blacklist_flag, latency_ms, scanned_at FROM results"
+        params = ()
+        if batch:
+            sql += " WHERE batch = ?"
+            params = (batch,)
+        sql += " ORDER BY job_id"
+        for url, rc, rs, bl, latency, scanned_at in self._db().execute(sql, params):
+            yield {
+                "url": url,
+                "risk_class": rc,
+                "risk_score": rs,
+                "blacklist_flag": bl,
+                "latency_ms": latency,
+                "scanned_at": scanned_at,
+            }
+
+    def latest_results(self):
+        """
+        Yields (url, risk_class, blacklist_flag, signals_json, scanned_at)
+        for the newest stored result of every URL, across batches.
+        """
+        # SQLite returns the bare columns from the row that holds MAX().
+        yield from self._db().execute(
+            "SELECT url, risk_class, blacklist_flag, signals, MAX(scanned_at) FROM results GROUP BY url"
+        )
+
+    def latest_result(self, url: str):
+        """
+        Returns the newest stored verdict for one URL, shaped like an API
+        response plus ``scanned_at``, or None.
+        """
+        row = self._db().execute(
+            "SELECT risk_class, risk_score, blacklist_flag, signals, scanned_at FROM results "
+            "WHERE url = ? ORDER BY scanned_at DESC LIMIT 1",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        rc, rs, bl, signals, scanned_at = row
+        return {
+            "url": url,
+            "risk_class": rc,
+            "risk_score": rs,
+            "blacklist_flag": bl,
+            "signals": json.loads(signals) if signals else None,
+            "scanned_at": scanned_at,
+        }
+
+    def pending_urls(self) -> set:
+        """
+        URLs with a queued or running job in any batch.
+        """
+        rows = self._db().execute("SELECT DISTINCT url FROM jobs WHERE state IN ('queued', 'running')")
+        return {url for (url,) in rows}
+
+    def iter_result_rows(self, batch: str = None):
+        """
+        Yields results shaped like batch-table rows, for the shared
+        export and PDF report downloads.
+        """
+        for r in self.iter_results(batch):
+            yield {
+                "url": r["url"],
+                "risk_class": map_risk_style(r["risk_class"], r["blacklist_flag"])[0],
+                "risk_score_%": round(r["risk_score"], 2),
+                "latency_ms": r["latency_ms"],
+            }
+
+
+class _Transaction:
+    """
+    ``with`` wrapper running a block in BEGIN IMMEDIATE ... COMMIT, so
+    claims are serialized across threads and processes.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+# ---------------------------------------------------------
+# 2) WORKER POOL
+# ---------------------------------------------------------
+class WorkerPool:
+    """
+    Worker threads that claim jobs, scan them (batch.scan_record) and
+    record the outcome. Idle workers poll every ``poll_s`` seconds.
+    """
+
+    def __init__(self, queue: JobQueue, workers: int = 4, api_url: str = None, timeout: float = 10, poll_s: float = 1.0):
+        self.queue = queue
+        self.workers = workers
+        self.api_url = api_url
+        self.timeout = timeout
+        self.poll_s = poll_s
+        self.processed = 0
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._session = make_session(workers)
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def start(self):
+        if self._stop.is_set():
+            # After stop(wait=False) the old workers may still be finishing
+            # a scan; let them exit before clearing the flag they watch.
+            for t in self._threads:
+                t.join()
+        elif self.running:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"fraudshield-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def stop(self, wait: bool = True):
+        """
+        Stops after the scans in progress; unfinished leases expire and
+        are picked up by the next run.
+        """
+        self._stop.set()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def run_until_empty(self):
+        """
+        Runs the workers until nothing is queued or running (jobs waiting
+        out a backoff count as queued), then stops them.
+        """
+        self.start()
+        try:
+            while not self._stop.is_set():
+                stats = self.queue.stats()
+                if stats["depth"] == 0:
+                    break
+                self._stop.wait(self.poll_s)
+        finally:
+            self.stop()
+
+    def _work(self):
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self._stop.wait(self.poll_s)
+                continue
+            job_id, url, attempts, token = job
+            record = scan_record(url, self.api_url, self.timeout, self._session)
+            if record["error"]:
+                self.queue.fail(job_id, token, attempts, record["error"])
+            else:
+                self.queue.complete(job_id, token, record)
+            with self._lock:
+                self.processed += 1
+
+
+_SHARED_POOL = None
+_SHARED_POOL_LOCK = threading.Lock()
+
+
+def shared_worker_pool(workers: int = 4) -> WorkerPool:
+    """
+    Returns the process-wide pool the dashboard starts and stops, so
+    workers keep running across Streamlit reruns.
+    """
+    global _SHARED_POOL
+    with _SHARED_POOL_LOCK:
+        if _SHARED_POOL is None:
+            _SHARED_POOL = WorkerPool(JobQueue(), workers=workers)
+        return _SHARED_POOL
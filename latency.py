@@ -0,0 +1,99 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+MIN_MS = 0.1
+MAX_MS = 120_000.0
+GROWTH = 1.04  # bucket width ratio (~2% relative error at the midpoint)
+
+
+# ---------------------------------------------------------
+# LOG-BUCKETED (HDR-STYLE) LATENCY HISTOGRAM
+# ---------------------------------------------------------
+class LatencyHistogram:
+    """
+    Fixed-size latency histogram with logarithmic buckets.
+
+    Bucket ``i`` covers ``[MIN_MS * GROWTH**i, MIN_MS * GROWTH**(i+1))``,
+    so every recorded value keeps a bounded relative error while the
+    bucket array (a few hundred int64 counters) never grows. Values
+    outside the range are clamped into the first/last bucket; the exact
+    maximum is tracked separately. Failed calls are counted as errors
+    and their latency is recorded too.
+    """
+
+    def __init__(self, min_ms: float = MIN_MS, max_ms: float = MAX_MS, growth: float = GROWTH):
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        self.bucket_count = int(math.ceil(math.log(max_ms / min_ms) / self._log_growth)) + 1
+        self.counts = np.zeros(self.bucket_count, dtype=np.int64)
+        self.total = 0
+        self.errors = 0
+        self.max_value = 0.0
+        self.sum_ms = 0.0
+
+    def _index(self, value_ms: float) -> int:
+        if value_ms <= self.min_ms:
+            return 0
+        i = int(math.log(value_ms / self.min_ms) / self._log_growth)
+        return min(i, self.bucket_count - 1)
+
+    def record(self, value_ms: float, error: bool = False):
+        """
+        Records one latency sample in O(1).
+        """
+        self.counts[self._index(value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+        if error:
+            self.errors += 1
+        if value_ms > self.max_value:
+            self.max_value = value_ms
+
+    def merge(self, other: "LatencyHistogram"):
+        """
+        Adds another histogram with the same bucket layout into this one.
+        """
+        self.counts += other.counts
+        self.total += other.total
+        self.errors += other.errors
+        self.sum_ms += other.sum_ms
+        self.max_value = max(self.max_value, other.max_value)
+
+    def bucket_bounds(self):
+        lower = self.min_ms * np.power(self.growth, np.arange(self.bucket_count))
+        return lower, lower * self.growth
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns the latency (ms) at percentile ``q`` (0-100), reported as
+        the geometric midpoint of the bucket that holds it.
+        """
+        if self.total == 0:
+            return float("nan")
+        rank = max(1, int(math.ceil(q / 100.0 * self.total)))
+        i = int(np.searchsorted(np.cumsum(self.counts), rank))
+        value = self.min_ms * self.growth ** (i + 0.5)
+        return min(value, self.max_value)
+
+    def percentiles(self, qs=(50, 90, 99)):
+        return {q: self.percentile(q) for q in qs}
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.total if self.total else 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.sum_ms / self.total if self.total else float("nan")
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the non-empty buckets (lower/upper bound in ms, count).
+        """
+        lower, upper = self.bucket_bounds()
+        nz = np.nonzero(self.counts)[0]
+        return pd.DataFrame({"lower_ms": lower[nz], "upper_ms": upper[nz], "count": self.counts[nz]})
@@ -0,0 +1,247 @@
+"""
+Load generator for the FraudShield scan client.
+
+Drives utils.post_scan against an endpoint either closed-loop (a fixed
+number of concurrent workers, each sending back-to-back) or open-loop
+(requests started at a target rate, independent of response time), and
+prints a JSON report: throughput, latency percentiles, error breakdown
+and client-side CPU.
+
+Examples:
+    python loadgen.py --concurrency 20 --duration 30
+    python loadgen.py --rps 50 --duration 60 --endpoint http://localhost:8000/scan_url
+    python loadgen.py --rps 100 --urls urls.txt --output runs/2026-10-19.json
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import resource
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import make_session
+from latency import LatencyHistogram
+from utils import API_URL, classify_error, post_scan
+
+DEFAULT_URLS = (
+    "https://example.com",
+    "https://amazon.com",
+    "https://ebay.com",
+    "https://cheapshop247.net",
+    "https://brand-outlet-deals.biz",
+    "https://newtechstore.xyz",
+)
+
+
+# ---------------------------------------------------------
+# 1) ONE REQUEST → (latency, error kind)
+# ---------------------------------------------------------
+def timed_scan(url: str, endpoint: str, timeout: float, session):
+    """
+    Performs one scan. Returns (latency_ms, error_kind or None, status).
+    """
+    t0 = time.perf_counter()
+    status = None
+    try:
+        response = post_scan(url, api_url=endpoint, timeout=timeout, session=session)
+        status = response.status_code
+        if status >= 400:
+            error = f"http_{status}"
+        else:
+            response.json()
+            error = None
+    except Exception as exc:
+        error = classify_error(exc)
+    return (time.perf_counter() - t0) * 1000.0, error, status
+
+
+# ---------------------------------------------------------
+# 2) RESULT COLLECTION
+# ---------------------------------------------------------
+class LoadStats:
+    """
+    Thread-safe accumulator for one run (constant memory).
+    """
+
+    def __init__(self):
+        self.hist = LatencyHistogram()
+        self.errors = Counter()
+        self.status_codes = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, latency_ms: float, error: str, status: int):
+        with self.lock:
+            self.hist.record(latency_ms, error=error is not None)
+            if error:
+                self.errors[error] += 1
+            if status is not None:
+                self.status_codes[str(status)] += 1
+
+
+# ---------------------------------------------------------
+# 3) CLOSED-LOOP (CONCURRENCY) AND OPEN-LOOP (RPS) DRIVERS
+# ---------------------------------------------------------
+def run_closed_loop(urls, endpoint, concurrency, duration, timeout, stats):
+    session = make_session(concurrency)
+    deadline = time.perf_counter() + duration
+    url_cycle = itertools.cycle(urls)
+    cycle_lock = threading.Lock()
+
+    def worker():
+        while time.perf_counter() < deadline:
+            with cycle_lock:
+                url = next(url_cycle)
+            stats.record(*timed_scan(url, endpoint, timeout, session))
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {"dropped": 0}
+
+
+def run_open_loop(urls, endpoint, rps, duration, timeout, max_in_flight, stats):
+    session = make_session(max_in_flight)
+    in_flight = threading.BoundedSemaphore(max_in_flight)
+    dropped = 0
+
+    def task(url):
+        try:
+            stats.record(*timed_scan(url, endpoint, timeout, session))
+        finally:
+            in_flight.release()
+
+    interval = 1.0 / rps
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for n, url in enumerate(itertools.cycle(urls)):
+            send_at = start + n * interval
+            if send_at - start >= duration:
+                break
+            delay = send_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            # Open loop: never queue behind slow responses. If every slot
+            # is busy the request is counted as dropped instead.
+            if not in_flight.acquire(blocking=False):
+                dropped += 1
+                continue
+            pool.submit(task, url)
+    return {"dropped": dropped}
+
+
+# ---------------------------------------------------------
+# 4) REPORT
+# ---------------------------------------------------------
+def _ms(value: float):
+    # Latency fields are null (not NaN, which isn't valid JSON) when no
+    # request completed.
+    return None if math.isnan(value) else round(value, 2)
+
+
+def build_report(config, stats, wall_s, cpu_before, cpu_after, extra):
+    hist = stats.hist
+    user_s = cpu_after.ru_utime - cpu_before.ru_utime
+    system_s = cpu_after.ru_stime - cpu_before.ru_stime
+    pct = hist.percentiles((50, 90, 99, 99.9))
+    return {
+        "tool": "fraudshield-loadgen",
+        "started_at": config.pop("started_at"),
+        "config": config,
+        "host": {"python": platform.python_version(), "cpus": os.cpu_count()},
+        "wall_s": round(wall_s, 3),
+        "requests": hist.total,
+        "ok": hist.total - hist.errors,
+        "errors": hist.errors,
+        "error_rate": round(hist.error_rate, 5),
+        "error_breakdown": dict(stats.errors),
+        "status_codes": dict(stats.status_codes),
+        "dropped": extra["dropped"],
+        "throughput_rps": round(hist.total / wall_s, 2) if wall_s else 0.0,
+        "latency_ms": {
+            "p50": _ms(pct[50]),
+            "p90": _ms(pct[90]),
+            "p99": _ms(pct[99]),
+            "p99_9": _ms(pct[99.9]),
+            "max": _ms(hist.max_value) if hist.total else None,
+            "mean": _ms(hist.mean),
+        },
+        "client_cpu": {
+            "user_s": round(user_s, 3),
+            "system_s": round(system_s, 3),
+            "cpu_pct_of_wall": round(100.0 * (user_s + system_s) / wall_s, 1) if wall_s else 0.0,
+            "cpu_ms_per_request": round(1000.0 * (user_s + system_s) / hist.total, 3) if hist.total else None,
+        },
+    }
+
+
+def load_urls(path: str):
+    if not path:
+        return list(DEFAULT_URLS)
+    with open(path, "r", encoding="utf-8") as f:
+        urls = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not urls:
+        raise SystemExit(f"No URLs found in {path}")
+    return urls
+
+
+def run(args) -> dict:
+    urls = load_urls(args.urls)
+    config = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "endpoint": args.endpoint,
+        "mode": "open-loop" if args.rps else "closed-loop",
+        "rps": args.rps,
+        "concurrency": None if args.rps else args.concurrency,
+        "max_in_flight": args.max_in_flight if args.rps else None,
+        "duration_s": args.duration,
+        "timeout_s": args.timeout,
+        "url_count": len(urls),
+    }
+    stats = LoadStats()
+
+    cpu_before = resource.getrusage(resource.RUSAGE_SELF)
+    t0 = time.perf_counter()
+    if args.rps:
+        extra = run_open_loop(urls, args.endpoint, args.rps, args.duration, args.timeout, args.max_in_flight, stats)
+    else:
+        extra = run_closed_loop(urls, args.endpoint, args.concurrency, args.duration, args.timeout, stats)
+    wall_s = time.perf_counter() - t0
+    cpu_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    return build_report(config, stats, wall_s, cpu_before, cpu_after, extra)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Load generator for the FraudShield scan client.")
+    parser.add_argument("--endpoint", default=API_URL, help="scan endpoint (default: %(default)s)")
+    parser.add_argument("--urls", help="file with one URL per line (default: built-in sample)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--rps", type=float, help="open-loop target requests per second")
+    mode.add_argument("--concurrency", type=int, default=10, help="closed-loop concurrent workers (default: 10)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="open-loop cap on outstanding requests")
+    parser.add_argument("--duration", type=float, default=30.0, help="run length in seconds")
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-request timeout in seconds")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    report = run(args)
+    text = json.dumps(report, indent=2, allow_nan=False)
+    print(text)
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and fixed-bucket histograms, optionally labelled.
+Recording is a dict lookup plus a locked add (about a microsecond), so
+it stays on every scan path. The registry is served at
+``http://127.0.0.1:$FRAUDSHIELD_METRICS_PORT/metrics`` (default 9464;
+set the variable to 0 to disable) by start_metrics_server().
+"""
+import bisect
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.environ.get("FRAUDSHIELD_METRICS_PORT", "9464") or 0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS_S = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _label_text(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ---------------------------------------------------------
+# 1) METRIC TYPES
+# ---------------------------------------------------------
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._children[()] = self._new_child()
+
+    def labels(self, *values):
+        """
+        Returns the child for one label combination (created on first
+        use). Label values should be strings.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in list(self._children.items()):
+            lines.extend(self._expose_child(values, child))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self.lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def _expose_child(self, values, child):
+        yield f"{self.name}{_label_text(self.labelnames, values)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0):
+        self._default.dec(amount)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS_S):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def _expose_child(self, values, child):
+        with child.lock:
+            counts = list(child.counts)
+            total = child.sum
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            le = 'le="' + _format_value(float(bound)) + '"'
+            yield f"{self.name}_bucket{_label_text(self.labelnames, values, le)} {cumulative}"
+        yield f"{self.name}_sum{_label_text(self.labelnames, values)} {_format_value(total)}"
+        yield f"{self.name}_count{_label_text(self.labelnames, values)} {cumulative}"
+
+
+# ---------------------------------------------------------
+# 2) REGISTRY + EXPOSITION
+# ---------------------------------------------------------
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Adds a metric; registering the same name twice returns the
+        existing one (modules may be re-imported on Streamlit reruns).
+        """
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def expose(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames=()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS_S) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+# ---------------------------------------------------------
+# 3) SCAN PIPELINE METRICS
+# ---------------------------------------------------------
+SCANS_ISSUED = counter("fraudshield_scans_total", "Scan requests sent to the backend.", ("outcome",))
+SCAN_ERRORS = counter("fraudshield_scan_errors_total", "Failed backend scans by error type.", ("type",))
+SCAN_LATENCY = histogram("fraudshield_scan_latency_seconds", "Backend scan latency, errors included.")
+SCANS_IN_FLIGHT = gauge("fraudshield_scans_in_flight", "Backend scans currently outstanding.")
+CACHE_REQUESTS = counter("fraudshield_cache_requests_total", "Verdict lookups by cache and result.", ("cache", "result"))
+COALESCED_CALLS = counter(
+    "fraudshield_coalesced_calls_total", "Backend calls avoided by sharing another request's result.", ("reason",)
+)
+RERUN_DURATION = histogram(
+    "fraudshield_rerun_duration_seconds",
+    "Dashboard script rerun duration.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+
+# ---------------------------------------------------------
+# 4) HTTP ENDPOINT
+# ---------------------------------------------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = REGISTRY.expose().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_SERVER = None
+_SERVER_LOCK = threading.Lock()
+
+
+def start_metrics_server(port: int = None, host: str = "127.0.0.1"):
+    """
+    Serves the registry on a daemon thread, once per process. Returns
+    the bound port, or None if disabled (port 0) or the port is taken.
+    """
+    global _SERVER
+    port = METRICS_PORT if port is None else port
+    with _SERVER_LOCK:
+        if _SERVER is not None:
+            return _SERVER.server_address[1]
+        if not port:
+            return None
+        try:
+            _SERVER = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError:
+            return None
+        _SERVER.daemon_threads = True
+        threading.Thread(target=_SERVER.serve_forever, name="fraudshield-metrics", daemon=True).start()
+        return _SERVER.server_address[1]
@@ -0,0 +1,317 @@
+"""
+Local stand-in for the FraudShield /scan_url API.
+
+Implements the documented response contract (url, risk_class,
+risk_score, blacklist_flag, signals) with deterministic, URL-derived
+verdicts, plus configurable latency distributions, error rates and
+cold-start delays. Built on asyncio streams (stdlib only, HTTP/1.1
+keep-alive), so thousands of concurrent connections are cheap.
+
+Examples:
+    python mock_api.py --port 8000
+    python mock_api.py --latency lognormal:120:0.6 --error-rate 0.02
+    python mock_api.py --latency pareto:80:1.5 --cold-start-ms 4000 --idle-s 600
+    python mock_api.py --latency fixed:50 --capacity 16
+
+Then point the dashboard or benchmarks at it:
+    FRAUDSHIELD_API_URL=http://localhost:8000/scan_url streamlit run streamlit_app.py
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+HIGH_RISK_HINTS = ("cheap", "deal", "outlet", "free", "login", "verify", "bonus")
+RISKY_TLDS = (".xyz", ".biz", ".top", ".click", ".shop")
+
+
+# ---------------------------------------------------------
+# 1) DETERMINISTIC VERDICTS (RESPONSE CONTRACT)
+# ---------------------------------------------------------
+def _classify(score: float) -> str:
+    if score < 10:
+        return "Safe"
+    if score < 40:
+        return "Low Risk"
+    if score < 70:
+        return "Suspicious"
+    return "High Risk"
+
+
+def mock_verdict(url: str) -> dict:
+    """
+    Returns a contract-shaped response derived from a hash of the URL's
+    host, so the same domain always gets the same verdict.
+    """
+    parts = urlsplit(url if "://" in url else f"http://{url}")
+    host = (parts.hostname or url).lower()
+    h = hashlib.sha256(host.encode("utf-8")).digest()
+
+    domain_age_days = int.from_bytes(h[0:2], "big") % 7000
+    https_flag = 1 if parts.scheme == "https" or h[2] % 5 else 0
+    hsts_flag = 1 if https_flag and h[3] % 3 else 0
+    csp_flag = 1 if h[4] % 2 else 0
+    mixed_content_ratio = round((h[5] % 20) / 100.0, 2) if https_flag else 0.0
+
+    score = (h[6] / 255.0) * 45.0
+    if any(hint in host for hint in HIGH_RISK_HINTS):
+        score += 30.0
+    if host.endswith(RISKY_TLDS):
+        score += 20.0
+    if domain_age_days < 30:
+        score = max(score, 85.0)
+    elif domain_age_days < 180:
+        score = max(score, 60.0)
+    elif domain_age_days > 3650:
+        score *= 0.8
+    if not https_flag:
+        score += 12.0
+    if hsts_flag + csp_flag == 0:
+        score += 6.0
+
+    blacklist_flag = 1 if h[7] < 3 else 0
+    if blacklist_flag:
+        score = 99.0
+    score = round(min(score, 100.0), 2)
+
+    return {
+        "url": url,
+        "risk_class": _classify(score),
+        "risk_score": score,
+        "blacklist_flag": blacklist_flag,
+        "signals": {
+            "domain_age_days": domain_age_days,
+            "https_flag": https_flag,
+            "hsts_flag": hsts_flag,
+            "csp_flag": csp_flag,
+            "mixed_content_ratio": mixed_content_ratio,
+        },
+    }
+
+
+# ---------------------------------------------------------
+# 2) LATENCY DISTRIBUTIONS
+# ---------------------------------------------------------
+def parse_latency(spec: str, rng: random.Random):
+    """
+    Parses a latency spec into a sampler returning milliseconds.
+
+        fixed:MS                 constant
+        uniform:LO:HI            uniform between LO and HI
+        exp:MEAN                 exponential
+        lognormal:MEDIAN:SIGMA   log-normal (realistic service latency)
+        pareto:SCALE:ALPHA       heavy tail (SCALE = minimum)
+    """
+    name, *raw = spec.split(":")
+    args = [float(a) for a in raw]
+    if name == "fixed":
+        return lambda: args[0]
+    if name == "uniform":
+        return lambda: rng.uniform(args[0], args[1])
+    if name == "exp":
+        return lambda: rng.expovariate(1.0 / args[0])
+    if name == "lognormal":
+        mu = math.log(args[0])
+        return lambda: rng.lognormvariate(mu, args[1])
+    if name == "pareto":
+        return lambda: args[0] * rng.paretovariate(args[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+# ---------------------------------------------------------
+# 3) SERVER
+# ---------------------------------------------------------
+class MockFraudShieldAPI:
+    """
+    asyncio HTTP/1.1 server answering POST /scan_url and GET /health.
+
+    ``error_rate`` returns 500/503 responses, ``timeout_rate`` holds the
+    request open for ``hang_s`` (to exercise client timeouts), and the
+    first request after ``idle_s`` seconds without traffic waits
+    ``cold_start_ms`` (requests arriving during that warm-up wait too),
+    like a sleeping free-tier instance.
+
+    ``capacity`` (0 = unlimited) caps requests being processed at once:
+    the excess queues, and once ``capacity`` requests are already
+    queued, new ones are shed with a 503, like an overloaded backend.
+    """
+
+    def __init__(
+        self,
+        latency: str = "lognormal:120:0.5",
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        hang_s: float = 60.0,
+        cold_start_ms: float = 0.0,
+        idle_s: float = 900.0,
+        capacity: int = 0,
+        seed: int = None,
+    ):
+        self.rng = random.Random(seed)
+        self.sample_latency_ms = parse_latency(latency, self.rng)
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.hang_s = hang_s
+        self.cold_start_ms = cold_start_ms
+        self.idle_s = idle_s
+        self.capacity = capacity
+
+        self.requests = 0
+        self.shed = 0
+        self._slots = asyncio.Semaphore(capacity) if capacity else None
+        self._queued = 0
+        self._last_request = None
+        self._warm_until = 0.0
+
+    async def _cold_start_delay(self):
+        now = time.monotonic()
+        if self.cold_start_ms > 0 and (self._last_request is None or now - self._last_request > self.idle_s):
+            self._warm_until = max(self._warm_until, now + self.cold_start_ms / 1000.0)
+        self._last_request = now
+        if self._warm_until > now:
+            await asyncio.sleep(self._warm_until - now)
+
+    async def handle_scan(self, body: bytes):
+        self.requests += 1
+        if self._slots is None:
+            return await self._scan(body)
+        if self._slots.locked() and self._queued >= self.capacity:
+            self.shed += 1
+            return 503, {"detail": "mock backend overloaded"}
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        try:
+            return await self._scan(body)
+        finally:
+            self._slots.release()
+
+    async def _scan(self, body: bytes):
+        await self._cold_start_delay()
+        await asyncio.sleep(max(self.sample_latency_ms(), 0.0) / 1000.0)
+
+        roll = self.rng.random()
+        if roll < self.timeout_rate:
+            await asyncio.sleep(self.hang_s)
+        elif roll < self.timeout_rate + self.error_rate:
+            status = self.rng.choice((500, 503))
+            return status, {"detail": "mock backend error"}
+
+        try:
+            url = json.loads(body or b"{}")["url"]
+        except (ValueError, KeyError, TypeError):
+            return 422, {"detail": "body must be JSON with a 'url' field"}
+        return 200, mock_verdict(str(url))
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0) or 0)
+                body = await reader.readexactly(length) if length else b""
+
+                if method == "POST" and path.split("?")[0] == "/scan_url":
+                    status, payload = await self.handle_scan(body)
+                elif method == "GET" and path == "/health":
+                    status, payload = 200, {"status": "ok", "requests": self.requests, "shed": self.shed}
+                else:
+                    status, payload = 404, {"detail": "not found"}
+
+                data = json.dumps(payload).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                        "Content-Type: application/json\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    ).encode("latin-1")
+                    + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000, ready=None):
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog=4096)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+
+def start_mock_server(port: int = 0, **config):
+    """
+    Runs a MockFraudShieldAPI on a daemon thread (for benchmarks and
+    local runs). Returns (api, endpoint_url).
+    """
+    api = MockFraudShieldAPI(**config)
+    bound = {}
+    started = threading.Event()
+
+    def ready(p):
+        bound["port"] = p
+        started.set()
+
+    thread = threading.Thread(target=lambda: asyncio.run(api.serve(port=port, ready=ready)), daemon=True)
+    thread.start()
+    started.wait(10)
+    return api, f"http://127.0.0.1:{bound['port']}/scan_url"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local mock of the FraudShield /scan_url API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", default="lognormal:120:0.5", help="latency distribution spec (default: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of 500/503 responses")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="fraction of requests that hang")
+    parser.add_argument("--hang-s", type=float, default=60.0, help="how long hanging requests stay open")
+    parser.add_argument("--cold-start-ms", type=float, default=0.0, help="delay for the first request after idling")
+    parser.add_argument("--idle-s", type=float, default=900.0, help="idle time before the next request is cold")
+    parser.add_argument("--capacity", type=int, default=0, help="requests processed at once; excess queues, then gets 503 (0 = unlimited)")
+    parser.add_argument("--seed", type=int, help="RNG seed for reproducible latency/error sequences")
+    args = parser.parse_args(argv)
+
+    api = MockFraudShieldAPI(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang_s=args.hang_s,
+        cold_start_ms=args.cold_start_ms,
+        idle_s=args.idle_s,
+        capacity=args.capacity,
+        seed=args.seed,
+    )
+    print(f"Mock FraudShield API on http://{args.host}:{args.port}/scan_url ({args.latency})")
+    try:
+        asyncio.run(api.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
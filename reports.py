@@ -0,0 +1,312 @@
+import multiprocessing
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from fpdf import FPDF
+
+from results import BLACKLISTED_STYLE, LABELS, ScanResultBatch
+
+SPOOL_MAX_BYTES = 32 * 1024 * 1024
+PAGES_PER_PART = 200
+MIN_PARALLEL_TASKS = 16
+
+# Row labels carry emoji (e.g. "🟢 Safe"); core PDF fonts are latin-1.
+_LABEL_PREFIX = re.compile(r"^[^\w]+\s*")
+
+
+# ---------------------------------------------------------
+# 1) ROW → REPORT FIELDS
+# ---------------------------------------------------------
+def _pdf_text(value: str) -> str:
+    return str(value).encode("latin-1", "replace").decode("latin-1")
+
+
+def report_fields(row: dict):
+    """
+    Returns (url, risk_class, risk_score, signals) for a batch row, or
+    None if the row has no score (e.g. API_ERROR rows). Batch rows only
+    carry the blacklist flag (in their label), so that is the one signal.
+    """
+    score = row.get("risk_score_%")
+    if score is None:
+        return None
+    label = row.get("risk_class") or "Unknown"
+    signals = {"blacklist_flag": int(label == BLACKLISTED_STYLE[0])}
+    return _pdf_text(row["url"]), _pdf_text(_LABEL_PREFIX.sub("", label)), float(score), signals
+
+
+def batch_report_fields(batch: ScanResultBatch):
+    """
+    report_fields for every scored row of a ScanResultBatch, read from
+    its columns (signals: the blacklist flag).
+    """
+    scored = np.flatnonzero(batch.error_codes == 0)
+    labels = [_pdf_text(_LABEL_PREFIX.sub("", label)) for label in LABELS]
+    codes = batch.label_codes[scored].tolist()
+    scores = np.round(batch.risk_scores[scored], 2).tolist()
+    flags = batch.blacklist_flags[scored].tolist()
+    return [
+        (_pdf_text(batch.urls[i]), labels[c], s, {"blacklist_flag": f})
+        for i, c, s, f in zip(scored.tolist(), codes, scores, flags)
+    ]
+
+
+def report_file_name(index: int, url: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9.-]+", "_", url.split("://", 1)[-1]).strip("_")[:60]
+    return f"{index + 1:05d}_{slug or 'report'}.pdf"
+
+
+# ---------------------------------------------------------
+# 2) WORKERS (top-level so they pickle into the process pool)
+# ---------------------------------------------------------
+def _render_single(task):
+    index, (url, risk_class, risk_score, signals) = task
+    return report_file_name(index, url), render_cached_report(url, risk_class, risk_score, signals)
+
+
+def _render_part(task):
+    part, fields = task
+    return f"fraudshield_report_part_{part + 1:03d}.pdf", get_report_template().render_pages(fields)
+
+
+# ---------------------------------------------------------
+# 3) BULK REPORTS → STREAMED ZIP
+# ---------------------------------------------------------
+def _tasks(rows, consolidated: bool):
+    if isinstance(rows, ScanResultBatch):
+        fields = batch_report_fields(rows)
+    else:
+        fields = [f for f in (report_fields(r) for r in rows) if f is not None]
+    if not consolidated:
+        return _render_single, list(enumerate(fields))
+    parts = [fields[i:i + PAGES_PER_PART] for i in range(0, len(fields), PAGES_PER_PART)]
+    return _render_part, list(enumerate(parts))
+
+
+def _write_zip(archive, results):
+    for name, data in results:
+        archive.writestr(name, data)
+
+
+def generate_bulk_reports_zip(rows, consolidated: bool = False, workers: int = None):
+    """
+    Renders PDF reports for every scored batch row (row dicts or a
+    ScanResultBatch) across a process pool and streams them into a ZIP
+    held in a spooled temp file.
+
+    ``consolidated=False`` writes one PDF per row. ``consolidated=True``
+    writes multi-page reports, split into parts of ``PAGES_PER_PART``
+    pages so the parts can render in parallel. Documents are written to
+    the archive in row order as soon as each one is ready. Small jobs
+    (or ``workers=1``) render in the calling thread, since pool start-up
+    would cost more than it saves.
+
+    Returns the spool rewound to the start.
+    """
+    render, tasks = _tasks(rows, consolidated)
+    workers = workers or min(len(tasks), os.cpu_count() or 1)
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES, mode="w+b")
+
+    with zipfile.ZipFile(spool, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        if workers <= 1 or len(tasks) < MIN_PARALLEL_TASKS:
+            _write_zip(archive, map(render, tasks))
+        else:
+            # "spawn" avoids forking the multi-threaded Streamlit server.
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                chunksize = max(1, len(tasks) // (workers * 4))
+                _write_zip(archive, pool.map(render, tasks, chunksize=chunksize))
+
+    spool.seek(0)
+    return spool
+
+
+# ---------------------------------------------------------
+# 4) TEMPLATE-CACHED RENDERING
+# ---------------------------------------------------------
+LOGO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "fraudshield_logo.png")
+
+SUMMARY_TEXT = (
+    "This risk score reflects the likelihood that the evaluated website "
+    "exhibits characteristics commonly associated with fraudulent or "
+    "misleading online environments. Factors considered include domain "
+    "trustworthiness, security configuration, traffic signals, metadata "
+    "patterns, and threat intelligence sources.\n\n"
+    "FraudShield is designed to help prevent exposure to suspicious "
+    "websites before harm occurs, offering protective value for users "
+    "navigating online shopping environments."
+)
+
+# Score bands from the Risk Scoring Logic tab: (upper bound, RGB).
+GAUGE_BANDS = (
+    (10, (76, 175, 80)),
+    (40, (255, 193, 7)),
+    (70, (255, 152, 0)),
+    (95, (244, 67, 54)),
+    (100, (183, 28, 28)),
+)
+
+SIGNAL_FIELDS = (
+    ("domain_age_days", "Domain age (days)"),
+    ("https_flag", "HTTPS"),
+    ("hsts_flag", "HSTS"),
+    ("csp_flag", "Content-Security-Policy"),
+    ("mixed_content_ratio", "Mixed content ratio"),
+    ("blacklist_flag", "Blacklisted"),
+)
+
+_GAUGE_X, _GAUGE_W, _GAUGE_H = 10.0, 190.0, 6.0
+_TABLE_LABEL_W, _TABLE_VALUE_W, _ROW_H = 80.0, 50.0, 7.0
+
+
+class ReportTemplate:
+    """
+    Report layout with every static element rendered once.
+
+    The title, logo, field labels, gauge track, signals table grid and
+    the wrapped "Analysis Summary" paragraph are laid out a single time;
+    the resulting page content stream, font table and parsed logo are
+    cached. ``render`` starts each document from that stream and only
+    draws the per-URL values, so the logo is never re-parsed or
+    re-encoded and the paragraph is never re-wrapped.
+    """
+
+    def __init__(self, logo_path: str = LOGO_PATH):
+        pdf = FPDF()
+        pdf.add_page()
+
+        if logo_path and os.path.exists(logo_path):
+            pdf.image(logo_path, x=176, y=8, w=24)
+
+        pdf.set_font("Arial", "B", 18)
+        pdf.cell(0, 12, "FraudShield Risk Assessment Report", ln=True)
+
+        # Per-URL lines (Website / Risk Class / Risk Score) go here.
+        pdf.ln(5)
+        self._fields_y = pdf.get_y()
+        pdf.set_y(self._fields_y + 30)
+
+        # Score gauge: tier bands under a light track; the score marker
+        # is drawn per report.
+        pdf.ln(4)
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 8, "Risk Gauge", ln=True)
+        self._gauge_y = pdf.get_y()
+        start = 0
+        for upper, rgb in GAUGE_BANDS:
+            pdf.set_fill_color(*rgb)
+            pdf.rect(_GAUGE_X + _GAUGE_W * start / 100, self._gauge_y, _GAUGE_W * (upper - start) / 100, 2, "F")
+            start = upper
+        pdf.set_fill_color(235, 235, 235)
+        pdf.rect(_GAUGE_X, self._gauge_y + 2, _GAUGE_W, _GAUGE_H, "F")
+        pdf.set_font("Arial", size=8)
+        for tick in (0, 25, 50, 75, 100):
+            pdf.set_xy(_GAUGE_X + _GAUGE_W * tick / 100 - 5, self._gauge_y + 2 + _GAUGE_H)
+            pdf.cell(10, 4, str(tick), align="C")
+        pdf.set_y(self._gauge_y + 2 + _GAUGE_H + 6)
+
+        # Signals table: header and row labels are static.
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 8, "Key Signals", ln=True)
+        pdf.set_font("Arial", "B", 10)
+        pdf.set_fill_color(235, 235, 235)
+        pdf.cell(_TABLE_LABEL_W, _ROW_H, "Signal", border=1, fill=True)
+        pdf.cell(_TABLE_VALUE_W, _ROW_H, "Value", border=1, fill=True, ln=True)
+        pdf.set_font("Arial", size=10)
+        self._table_y = pdf.get_y()
+        for _, label in SIGNAL_FIELDS:
+            pdf.cell(_TABLE_LABEL_W, _ROW_H, label, border=1)
+            pdf.cell(_TABLE_VALUE_W, _ROW_H, "", border=1, ln=True)
+
+        pdf.ln(6)
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 10, "Analysis Summary:", ln=True)
+        pdf.set_font("Arial", size=11)
+        pdf.multi_cell(0, 8, txt=SUMMARY_TEXT)
+
+        # Leave the graphics state at its defaults for the per-URL part.
+        pdf.set_fill_color(0)
+        pdf.set_draw_color(0)
+        pdf.set_text_color(0)
+
+        self._stream = pdf.pages[1]
+        self._fonts = pdf.fonts
+        self._images = pdf.images
+
+    def _new_document(self):
+        pdf = FPDF()
+        # Output writes object numbers into these dicts (and drops image
+        # data after writing), so each document gets shallow copies; the
+        # encoded image bytes and font metrics themselves are shared.
+        pdf.fonts = {key: dict(font) for key, font in self._fonts.items()}
+        pdf.images = {key: dict(image) for key, image in self._images.items()}
+        return pdf
+
+    def _draw_page(self, pdf, url: str, risk_class: str, risk_score: float, signals: dict = None):
+        pdf.add_page()
+        pdf.pages[pdf.page] = self._stream
+        # The cached stream leaves its own font selected; forget ours so
+        # the next set_font is always written out.
+        pdf.font_family = ""
+
+        pdf.set_font("Arial", size=12)
+        pdf.set_xy(10, self._fields_y)
+        pdf.cell(0, 10, f"Website: {_pdf_text(url)}", ln=True)
+        pdf.cell(0, 10, f"Risk Class: {_pdf_text(risk_class)}", ln=True)
+        pdf.cell(0, 10, f"Risk Score: {risk_score:.2f}%", ln=True)
+
+        score = min(max(risk_score, 0.0), 100.0)
+        rgb = next(c for upper, c in GAUGE_BANDS if score <= upper)
+        pdf.set_fill_color(*rgb)
+        pdf.rect(_GAUGE_X, self._gauge_y + 2, _GAUGE_W * score / 100, _GAUGE_H, "F")
+
+        signals = signals or {}
+        pdf.set_font("Arial", size=10)
+        for row, (key, _) in enumerate(SIGNAL_FIELDS):
+            value = signals.get(key)
+            pdf.set_xy(10 + _TABLE_LABEL_W, self._table_y + row * _ROW_H)
+            pdf.cell(_TABLE_VALUE_W, _ROW_H, "n/a" if value is None else _pdf_text(value))
+
+    def render(self, url: str, risk_class: str, risk_score: float, signals: dict = None) -> bytes:
+        """
+        Returns the PDF bytes for one report, drawing only per-URL fields.
+        """
+        pdf = self._new_document()
+        self._draw_page(pdf, url, risk_class, risk_score, signals)
+        return pdf.output(dest="S").encode("latin-1")
+
+    def render_pages(self, fields) -> bytes:
+        """
+        Returns one multi-page PDF with a page per
+        (url, risk_class, risk_score, signals) tuple.
+        """
+        pdf = self._new_document()
+        for url, risk_class, risk_score, signals in fields:
+            self._draw_page(pdf, url, risk_class, risk_score, signals)
+        return pdf.output(dest="S").encode("latin-1")
+
+
+_TEMPLATE = None
+
+
+def get_report_template() -> ReportTemplate:
+    """
+    Returns the process-wide ReportTemplate, building it on first use
+    (once per process, including each pool worker).
+    """
+    global _TEMPLATE
+    if _TEMPLATE is None:
+        _TEMPLATE = ReportTemplate()
+    return _TEMPLATE
+
+
+def render_cached_report(url: str, risk_class: str, risk_score: float, signals: dict = None) -> bytes:
+    """
+    Template-cached counterpart of utils.generate_pdf_report, with the
+    logo, score gauge and signals table included.
+    """
+    return get_report_template().render(url, risk_class, risk_score, signals)
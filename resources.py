@@ -0,0 +1,158 @@
+"""
+Process-wide scan infrastructure shared by every Streamlit session.
+
+Streamlit runs one script thread per browser session, so anything kept
+in ``st.session_state`` is duplicated per viewer. The HTTP connection
+pool, verdict cache, rate limiter, metrics registry, audit writer,
+rollups, adaptive concurrency window and job-queue workers live in one
+SharedResources object instead, created once per server process by
+get_shared_resources() (``st.cache_resource``). Sessions keep only
+their own scan history and latency histogram.
+
+It also starts the local pre-click gateway (gateway.py) on
+FRAUDSHIELD_GATEWAY_PORT, answering /scan_url from the same cache.
+
+The resources are closed when the cache entry is released
+(``st.cache_resource.clear()``) and at interpreter exit.
+
+    FRAUDSHIELD_HTTP_POOL=32       pooled connections to the scan API
+    FRAUDSHIELD_RATE_LIMIT=0       dashboard scans per second (0 = unlimited)
+    FRAUDSHIELD_RATE_BURST=10      scans allowed back-to-back
+"""
+import atexit
+import os
+import threading
+import time
+
+import streamlit as st
+
+import audit
+import concurrency
+import rollups
+from batch import make_session
+from gateway import start_gateway
+from jobqueue import shared_worker_pool
+from metrics import REGISTRY, gauge, start_metrics_server
+from utils import VERDICT_CACHE, use_shared_client
+
+HTTP_POOL_SIZE = int(os.environ.get("FRAUDSHIELD_HTTP_POOL", "32"))
+RATE_LIMIT_PER_S = float(os.environ.get("FRAUDSHIELD_RATE_LIMIT", "0"))
+RATE_BURST = int(os.environ.get("FRAUDSHIELD_RATE_BURST", "10"))
+RATE_WAIT_S = 10.0
+
+RATE_LIMITED = gauge("fraudshield_rate_limit_waiting", "Dashboard scans waiting for a rate-limit token.")
+
+
+# ---------------------------------------------------------
+# 1) RATE LIMITER (TOKEN BUCKET)
+# ---------------------------------------------------------
+class RateLimiter:
+    """
+    Thread-safe token bucket: ``rate_per_s`` tokens per second, at most
+    ``burst`` saved up. acquire() waits for a token.
+    """
+
+    def __init__(self, rate_per_s: float, burst: int = RATE_BURST):
+        self.rate_per_s = rate_per_s
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self) -> float:
+        # Returns 0 if a token was taken, else the wait until the next one.
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_s)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate_per_s
+
+    def acquire(self, timeout: float = RATE_WAIT_S) -> bool:
+        """
+        Takes one token, waiting up to ``timeout`` seconds. Returns False
+        if none became available in time.
+        """
+        deadline = time.monotonic() + timeout
+        wait = self._take()
+        if not wait:
+            return True
+        RATE_LIMITED.inc()
+        try:
+            while wait:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                time.sleep(min(wait, remaining))
+                wait = self._take()
+            return True
+        finally:
+            RATE_LIMITED.dec()
+
+
+# ---------------------------------------------------------
+# 2) SHARED RESOURCES + LIFECYCLE
+# ---------------------------------------------------------
+class SharedResources:
+    """
+    Scan infrastructure for the whole server process. Creating it routes
+    run_fraudshield_scan through the pooled session and rate limiter;
+    close() detaches and releases them. The metrics endpoint and gateway
+    are started once per process and outlive a released instance.
+    """
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, rate_limit: float = RATE_LIMIT_PER_S, burst: int = RATE_BURST):
+        self.http = make_session(pool_size)
+        self.rate_limiter = RateLimiter(rate_limit, burst) if rate_limit > 0 else None
+        self.verdict_cache = VERDICT_CACHE
+        self.metrics = REGISTRY
+        self.metrics_port = start_metrics_server()
+        self.audit = audit.install()
+        self.rollups = rollups.install()
+        self.concurrency = concurrency.install()
+        self.gateway, self.gateway_port = start_gateway()
+        self.closed = False
+        self._lock = threading.Lock()
+        use_shared_client(self.http, self.rate_limiter)
+
+    @property
+    def worker_pool(self):
+        return shared_worker_pool()
+
+    def close(self):
+        """
+        Stops routing scans through this object, closes the HTTP pool and
+        saves the rollups. Safe to call more than once. The audit writer
+        and job workers are process-wide; they are flushed and stopped by
+        shutdown().
+        """
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        use_shared_client(None, None)
+        self.http.close()
+        self.rollups.save()
+
+    def shutdown(self):
+        """
+        close() plus stopping job-queue workers and flushing the audit
+        log; runs at interpreter exit.
+        """
+        self.close()
+        self.worker_pool.stop(wait=True)
+        if self.audit is not None:
+            self.audit.close()
+
+
+@st.cache_resource(show_spinner=False, validate=lambda r: not r.closed, on_release=SharedResources.close)
+def get_shared_resources() -> SharedResources:
+    """
+    Returns the SharedResources for this server process (created on the
+    first script run of any session).
+    """
+    resources = SharedResources()
+    atexit.register(resources.shutdown)
+    return resources
@@ -0,0 +1,319 @@
+"""
+Typed scan results.
+
+ScanResult is one backend verdict parsed once (``__slots__``, so no
+per-instance dict). ScanResultBatch stores many results column-wise:
+NumPy arrays for scores, flags and latencies, and int8 codes for risk
+classes and error types, so a 100k-row batch is a handful of arrays
+instead of 100k dicts. Tables, exports and PDF reports read the columns
+directly.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+RISK_CLASSES = ("Safe", "Low Risk", "Suspicious", "High Risk", "Unknown")
+
+# risk class -> (display label, color)
+RISK_STYLES = {
+    "Safe": ("🟢 Safe", "#4CAF50"),
+    "Low Risk": ("🟡 Low Risk", "#FFC107"),
+    "Suspicious": ("🟠 Suspicious", "#FF9800"),
+    "High Risk": ("🔴 High Risk", "#F44336"),
+    "Unknown": ("❓ Unknown", "#95a5a6"),
+}
+BLACKLISTED_STYLE = ("☠️ Blacklisted Threat", "#B71C1C")
+API_ERROR = "API_ERROR"
+TIMEOUT = "TIMEOUT"
+DEADLINE_EXCEEDED = "deadline_exceeded"  # error type of rows cut off by a batch deadline
+
+# Display label per code: the risk classes, then blacklisted, failed and
+# timed out (no verdict before the batch deadline).
+LABELS = tuple(RISK_STYLES[c][0] for c in RISK_CLASSES) + (BLACKLISTED_STYLE[0], API_ERROR, TIMEOUT)
+_CLASS_CODES = {c: i for i, c in enumerate(RISK_CLASSES)}
+_UNKNOWN = _CLASS_CODES["Unknown"]
+_BLACKLISTED = len(RISK_CLASSES)
+_FAILED = len(RISK_CLASSES) + 1
+_TIMED_OUT = len(RISK_CLASSES) + 2
+
+
+def _round(value: float, ndigits: int):
+    # None for NaN (rows without a latency): NaN isn't valid JSON and
+    # csv writes it as "nan".
+    return None if value != value else round(value, ndigits)
+
+
+def risk_style(risk_class: str, blacklist_flag: int = 0):
+    """
+    Returns (display label, color) for a risk class.
+    """
+    if blacklist_flag:
+        return BLACKLISTED_STYLE
+    return RISK_STYLES.get(risk_class, RISK_STYLES["Unknown"])
+
+
+# ---------------------------------------------------------
+# 1) ONE RESULT
+# ---------------------------------------------------------
+class ScanResult:
+    """
+    One scanned URL. ``risk_score`` is NaN and ``error`` is set (timeout,
+    http_503, deadline_exceeded, ...) when the scan failed. ``cached`` is
+    True when the verdict came from the verdict cache (no backend call).
+    """
+
+    __slots__ = ("url", "risk_class", "risk_score", "blacklist_flag", "latency_ms", "error", "signals", "cached")
+
+    def __init__(
+        self,
+        url: str,
+        risk_class: str = None,
+        risk_score: float = math.nan,
+        blacklist_flag: int = 0,
+        latency_ms: float = math.nan,
+        error: str = None,
+        signals: dict = None,
+        cached: bool = False,
+    ):
+        self.url = url
+        self.risk_class = risk_class
+        self.risk_score = risk_score
+        self.blacklist_flag = blacklist_flag
+        self.latency_ms = latency_ms
+        self.error = error
+        self.signals = signals
+        self.cached = cached
+
+    @classmethod
+    def from_response(cls, url: str, response: dict, latency_ms: float = math.nan, cached: bool = False) -> "ScanResult":
+        """
+        Parses a backend JSON response once.
+        """
+        return cls(
+            url,
+            response.get("risk_class", "Unknown"),
+            float(response.get("risk_score", 0) or 0),
+            int(response.get("blacklist_flag", 0) or 0),
+            latency_ms,
+            None,
+            response.get("signals"),
+            cached,
+        )
+
+    @classmethod
+    def failed(cls, url: str, error: str = "api_error", latency_ms: float = math.nan) -> "ScanResult":
+        return cls(url, latency_ms=latency_ms, error=error)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def label(self) -> str:
+        if self.ok:
+            return risk_style(self.risk_class, self.blacklist_flag)[0]
+        return TIMEOUT if self.error == DEADLINE_EXCEEDED else API_ERROR
+
+    def to_record(self) -> dict:
+        """
+        Flat, JSON-serializable record (CLI output, job queue results).
+        """
+        ok = self.ok
+        return {
+            "url": self.url,
+            "risk_class": self.risk_class if ok else None,
+            "risk_score": self.risk_score if ok else None,
+            "blacklist_flag": self.blacklist_flag if ok else None,
+            "signals": self.signals if ok else None,
+            "latency_ms": _round(self.latency_ms, 1),
+            "error": self.error,
+        }
+
+    def to_row(self) -> dict:
+        """
+        Batch-table row (display label, score in %, latency in ms).
+        """
+        return {
+            "url": self.url,
+            "risk_class": self.label,
+            "risk_score_%": round(self.risk_score, 2) if self.ok else None,
+            "latency_ms": _round(self.latency_ms, 0),
+        }
+
+
+# ---------------------------------------------------------
+# 2) COLUMNAR BATCH
+# ---------------------------------------------------------
+class ScanResultBatch:
+    """
+    Column store for batch results. Arrays grow by doubling as results
+    are appended; ``scanned_as`` is set on fanned-out batches (see
+    batch.BatchPlan.fan_out) and names the URL whose verdict a row uses.
+    ``cached`` counts appended results answered by the verdict cache.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, capacity)
+        self.urls = []
+        self.scanned_as = None
+        self.cached = 0
+        self.error_types = [None]
+        self._error_codes = {None: 0}
+        self._n = 0
+        self._class = np.zeros(capacity, dtype=np.int8)
+        self._score = np.full(capacity, np.nan, dtype=np.float64)
+        self._blacklist = np.zeros(capacity, dtype=np.int8)
+        self._latency = np.full(capacity, np.nan, dtype=np.float64)
+        self._error = np.zeros(capacity, dtype=np.int8)
+
+    @classmethod
+    def from_results(cls, results) -> "ScanResultBatch":
+        batch = cls(len(results) if hasattr(results, "__len__") else 1024)
+        batch.extend(results)
+        return batch
+
+    def __len__(self):
+        return self._n
+
+    def _grow(self):
+        size = max(1, len(self._class) * 2)  # take([]) leaves zero-length arrays
+        for name, fill in (("_class", 0), ("_score", np.nan), ("_blacklist", 0), ("_latency", np.nan), ("_error", 0)):
+            old = getattr(self, name)
+            new = np.full(size, fill, dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def append(self, result: ScanResult):
+        if self._n == len(self._class):
+            self._grow()
+        i = self._n
+        self.urls.append(result.url)
+        self._latency[i] = result.latency_ms
+        self.cached += result.cached
+        if result.error is None:
+            self._class[i] = _CLASS_CODES.get(result.risk_class, _UNKNOWN)
+            self._score[i] = result.risk_score
+            self._blacklist[i] = result.blacklist_flag
+        else:
+            code = self._error_codes.get(result.error)
+            if code is None:
+                code = self._error_codes[result.error] = len(self.error_types)
+                self.error_types.append(result.error)
+            self._error[i] = code
+        self._n += 1
+
+    def extend(self, results):
+        for result in results:
+            self.append(result)
+
+    # -----------------------------------------------------
+    # Columns
+    # -----------------------------------------------------
+    @property
+    def risk_scores(self) -> np.ndarray:
+        return self._score[: self._n]
+
+    @property
+    def blacklist_flags(self) -> np.ndarray:
+        return self._blacklist[: self._n]
+
+    @property
+    def latencies_ms(self) -> np.ndarray:
+        return self._latency[: self._n]
+
+    @property
+    def error_codes(self) -> np.ndarray:
+        return self._error[: self._n]
+
+    @property
+    def label_codes(self) -> np.ndarray:
+        """
+        Index into LABELS per row: risk class, blacklisted, API_ERROR or
+        TIMEOUT.
+        """
+        codes = np.where(self.blacklist_flags != 0, _BLACKLISTED, self._class[: self._n])
+        codes = np.where(self.error_codes != 0, _FAILED, codes)
+        deadline_code = self._error_codes.get(DEADLINE_EXCEEDED)
+        if deadline_code is not None:
+            codes = np.where(self.error_codes == deadline_code, _TIMED_OUT, codes)
+        return codes.astype(np.int8)
+
+    @property
+    def errors(self) -> int:
+        return int(np.count_nonzero(self.error_codes))
+
+    @property
+    def timed_out(self) -> int:
+        """
+        Rows cut off by a batch deadline (also counted in ``errors``).
+        """
+        code = self._error_codes.get(DEADLINE_EXCEEDED)
+        return 0 if code is None else int(np.count_nonzero(self.error_codes == code))
+
+    def take(self, indices, urls=None) -> "ScanResultBatch":
+        """
+        Returns a new batch with rows picked by ``indices``. With ``urls``
+        the rows are relabelled and ``scanned_as`` keeps the source URL.
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        out = ScanResultBatch(len(indices))
+        out._n = len(indices)
+        out.error_types = list(self.error_types)
+        out._error_codes = dict(self._error_codes)
+        out._class = self._class[: self._n][indices]
+        out._score = self.risk_scores[indices]
+        out._blacklist = self.blacklist_flags[indices]
+        out._latency = self.latencies_ms[indices]
+        out._error = self.error_codes[indices]
+        picked = [self.urls[i] for i in indices.tolist()]
+        if urls is None:
+            out.urls = picked
+        else:
+            out.urls = list(urls)
+            out.scanned_as = picked
+        return out
+
+    # -----------------------------------------------------
+    # Views (table, rows, export columns)
+    # -----------------------------------------------------
+    def export_columns(self, start: int = 0, stop: int = None) -> dict:
+        """
+        Export/table columns for rows ``start:stop``: url, risk_class
+        (label codes into LABELS), risk_score_% (NaN when failed) and
+        latency_ms.
+        """
+        stop = self._n if stop is None else min(stop, self._n)
+        return {
+            "url": self.urls[start:stop],
+            "risk_class": self.label_codes[start:stop],
+            "risk_score_%": np.round(self.risk_scores[start:stop], 2),
+            "latency_ms": np.round(self.latencies_ms[start:stop], 0),
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        columns = self.export_columns()
+        columns["risk_class"] = pd.Categorical.from_codes(columns["risk_class"], categories=LABELS)
+        df = pd.DataFrame(columns)
+        if self.scanned_as is not None:
+            df["scanned_as"] = self.scanned_as
+        return df
+
+    def iter_rows(self):
+        """
+        Yields batch-table row dicts (failed rows have ``risk_score_%``
+        None), for consumers that store rows one by one.
+        """
+        labels = self.label_codes.tolist()
+        scores = self.risk_scores.tolist()
+        latencies = self.latencies_ms.tolist()
+        for i, url in enumerate(self.urls):
+            row = {
+                "url": url,
+                "risk_class": LABELS[labels[i]],
+                "risk_score_%": None if labels[i] >= _FAILED else round(scores[i], 2),
+                "latency_ms": _round(latencies[i], 0),
+            }
+            if self.scanned_as is not None:
+                row["scanned_as"] = self.scanned_as[i]
+            yield row
@@ -0,0 +1,330 @@
+"""
+Incrementally maintained risk-trend rollups (hourly and daily).
+
+Every backend call updates one hourly and one daily bucket in O(1):
+request and error counts plus a log-bucketed latency histogram (from
+the scan path), verdict counts per tier and the score sum (from the
+decision listener). Only the most recent HOURLY_RETENTION hours and
+DAILY_RETENTION days are kept, so memory and chart rendering cost stay
+constant however many scans have happened.
+
+Entry points call install(). Several processes (dashboard, CLI,
+gateway) share DATA_DIR/rollups.json: every SAVE_INTERVAL_S and at exit
+each one adds the changes it recorded since its last save to the file,
+under an exclusive lock, and picks up what the others added.
+"""
+import atexit
+import contextlib
+import fcntl
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from latency import LatencyHistogram
+from utils import DATA_DIR, add_decision_listener, add_scan_listener
+
+ROLLUP_PATH = os.path.join(DATA_DIR, "rollups.json")
+HOURLY_RETENTION = 7 * 24
+DAILY_RETENTION = 90
+SAVE_INTERVAL_S = 60.0
+
+TIERS = ("Safe", "Low Risk", "Suspicious", "High Risk", "Unknown")
+RESOLUTIONS = {"hour": 3600, "day": 86400}
+
+
+# ---------------------------------------------------------
+# 1) ONE TIME BUCKET
+# ---------------------------------------------------------
+class RollupBucket:
+    """
+    Aggregates for one hour or day. Everything is additive, so buckets
+    merge and update without revisiting raw scans.
+    """
+
+    __slots__ = ("tiers", "score_sum", "requests", "errors", "latency")
+
+    def __init__(self):
+        self.tiers = dict.fromkeys(TIERS, 0)
+        self.score_sum = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    @property
+    def verdicts(self) -> int:
+        return sum(self.tiers.values())
+
+    def to_dict(self) -> dict:
+        nz = np.nonzero(self.latency.counts)[0]
+        return {
+            "tiers": self.tiers,
+            "score_sum": self.score_sum,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency": {
+                "buckets": {str(i): int(self.latency.counts[i]) for i in nz},
+                "sum_ms": self.latency.sum_ms,
+                "max_ms": self.latency.max_value,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RollupBucket":
+        bucket = cls()
+        bucket.tiers.update(data.get("tiers", {}))
+        bucket.score_sum = data.get("score_sum", 0.0)
+        bucket.requests = data.get("requests", 0)
+        bucket.errors = data.get("errors", 0)
+        latency = data.get("latency", {})
+        for i, count in latency.get("buckets", {}).items():
+            bucket.latency.counts[int(i)] = count
+        bucket.latency.total = int(bucket.latency.counts.sum())
+        bucket.latency.errors = bucket.errors
+        bucket.latency.sum_ms = latency.get("sum_ms", 0.0)
+        bucket.latency.max_value = latency.get("max_ms", 0.0)
+        return bucket
+
+    def merge(self, other: "RollupBucket"):
+        for tier, count in other.tiers.items():
+            self.tiers[tier] = self.tiers.get(tier, 0) + count
+        self.score_sum += other.score_sum
+        self.requests += other.requests
+        self.errors += other.errors
+        self.latency.merge(other.latency)
+
+
+def _trim(buckets: dict, retention: int):
+    oldest = max(buckets) - retention
+    for stale in [k for k in buckets if k <= oldest]:
+        del buckets[stale]
+
+
+def _read_buckets(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    return {r: {int(k): RollupBucket.from_dict(v) for k, v in data.get(r, {}).items()} for r in RESOLUTIONS}
+
+
+@contextlib.contextmanager
+def _file_lock(path: str):
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# ---------------------------------------------------------
+# 2) ROLLUP STORE (HOURLY + DAILY RING OF BUCKETS)
+# ---------------------------------------------------------
+class RiskRollups:
+    """
+    Hourly and daily buckets keyed by UTC period number. Recording is
+    thread-safe; buckets older than the retention window are dropped
+    when a new period starts. Every update goes into the buckets shown
+    by to_frame and into ``_pending``, the changes not yet added to the
+    shared file by save().
+    """
+
+    def __init__(self, hourly_retention: int = HOURLY_RETENTION, daily_retention: int = DAILY_RETENTION):
+        self.retention = {"hour": hourly_retention, "day": daily_retention}
+        self._buckets = {"hour": {}, "day": {}}
+        self._pending = {"hour": {}, "day": {}}
+        self._lock = threading.Lock()
+        self._loaded_mtime = None
+        self.dirty = False
+
+    def _buckets_at(self, resolution: str, ts: float):
+        key = int(ts // RESOLUTIONS[resolution])
+        for store in (self._buckets, self._pending):
+            buckets = store[resolution]
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = RollupBucket()
+                _trim(buckets, self.retention[resolution])
+            yield bucket
+
+    def record_request(self, latency_ms: float, error: bool = False, ts: float = None):
+        """
+        Counts one backend call and its latency.
+        """
+        ts = ts or time.time()
+        with self._lock:
+            for resolution in RESOLUTIONS:
+                for bucket in self._buckets_at(resolution, ts):
+                    bucket.requests += 1
+                    bucket.errors += bool(error)
+                    bucket.latency.record(latency_ms, error=error)
+            self.dirty = True
+
+    def record_verdict(self, risk_class: str, risk_score: float, ts: float = None):
+        """
+        Counts one verdict under its tier and adds its score.
+        """
+        ts = ts or time.time()
+        tier = risk_class if risk_class in TIERS else "Unknown"
+        with self._lock:
+            for resolution in RESOLUTIONS:
+                for bucket in self._buckets_at(resolution, ts):
+                    bucket.tiers[tier] += 1
+                    bucket.score_sum += risk_score
+            self.dirty = True
+
+    def on_decision(self, url: str, response: dict):
+        # No risk_class: an error body, not a verdict (its 0 score would
+        # drag the mean down).
+        if not isinstance(response, dict) or response.get("risk_class") is None:
+            return
+        try:
+            score = float(response.get("risk_score", 0) or 0)
+        except (TypeError, ValueError):
+            return
+        self.record_verdict(response.get("risk_class"), score)
+
+    def on_scan(self, latency_s: float, error: str):
+        self.record_request(latency_s * 1000.0, error=bool(error))
+
+    # -----------------------------------------------------
+    # Reading
+    # -----------------------------------------------------
+    def to_frame(self, resolution: str = "hour", periods: int = 48, now: float = None) -> pd.DataFrame:
+        """
+        One row per period for the last ``periods`` periods (empty ones
+        included): tier counts, verdicts, mean score, requests, error
+        rate and latency p50/p90/p99. Cost depends only on ``periods``.
+        """
+        step = RESOLUTIONS[resolution]
+        last = int((now or time.time()) // step)
+        keys = range(last - min(periods, self.retention[resolution]) + 1, last + 1)
+        rows = []
+        with self._lock:
+            buckets = self._buckets[resolution]
+            for key in keys:
+                bucket = buckets.get(key)
+                row = {"period": pd.Timestamp(key * step, unit="s", tz="UTC")}
+                if bucket is None:
+                    row.update(dict.fromkeys(TIERS, 0), verdicts=0, mean_score=np.nan, requests=0, errors=0)
+                    row.update(p50_ms=np.nan, p90_ms=np.nan, p99_ms=np.nan)
+                else:
+                    verdicts = bucket.verdicts
+                    p = bucket.latency.percentiles((50, 90, 99))
+                    row.update(bucket.tiers, verdicts=verdicts, requests=bucket.requests, errors=bucket.errors)
+                    row.update(mean_score=bucket.score_sum / verdicts if verdicts else np.nan)
+                    row.update(p50_ms=p[50], p90_ms=p[90], p99_ms=p[99])
+                rows.append(row)
+        df = pd.DataFrame(rows)
+        df["error_rate"] = (df["errors"] / df["requests"].where(df["requests"] > 0)).fillna(0.0)
+        return df
+
+    # -----------------------------------------------------
+    # Persistence
+    # -----------------------------------------------------
+    def save(self, path: str = ROLLUP_PATH):
+        """
+        Adds the pending changes to the file under an exclusive lock, so
+        concurrent saves from other processes are merged, not
+        overwritten. The shown buckets become the merged file contents.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock, _file_lock(path + ".lock"):
+            merged = _read_buckets(path)
+            for resolution, pending in self._pending.items():
+                buckets = merged[resolution]
+                for key, delta in pending.items():
+                    buckets.setdefault(key, RollupBucket()).merge(delta)
+                if buckets:
+                    _trim(buckets, self.retention[resolution])
+            data = {r: {str(k): b.to_dict() for k, b in buckets.items()} for r, buckets in merged.items()}
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, path)
+            self._buckets = merged
+            self._pending = {r: {} for r in RESOLUTIONS}
+            self._loaded_mtime = os.stat(path).st_mtime_ns
+            self.dirty = False
+
+    def refresh(self, path: str = ROLLUP_PATH):
+        """
+        Reloads the shown buckets if another process saved since, keeping
+        this process's pending changes on top.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        merged = _read_buckets(path)
+        with self._lock:
+            for resolution, pending in self._pending.items():
+                for key, delta in pending.items():
+                    merged[resolution].setdefault(key, RollupBucket()).merge(delta)
+            for resolution, buckets in merged.items():
+                if buckets:
+                    _trim(buckets, self.retention[resolution])
+            self._buckets = merged
+            self._loaded_mtime = mtime
+
+    def sync(self, path: str = ROLLUP_PATH):
+        """
+        Saves pending changes, or picks up other processes' saves.
+        """
+        if self.dirty:
+            self.save(path)
+        else:
+            self.refresh(path)
+
+    @classmethod
+    def load(cls, path: str = ROLLUP_PATH, **kwargs) -> "RiskRollups":
+        rollups = cls(**kwargs)
+        rollups.refresh(path)
+        return rollups
+
+
+_ROLLUPS = None
+_ROLLUPS_LOCK = threading.Lock()
+
+
+def _save_periodically(rollups: RiskRollups):
+    while True:
+        time.sleep(SAVE_INTERVAL_S)
+        try:
+            rollups.sync()
+        except OSError:
+            pass
+
+
+def get_rollups() -> RiskRollups:
+    """
+    Returns the process-wide rollups (loaded from disk on first use,
+    synced with the shared file periodically and saved at exit).
+    """
+    global _ROLLUPS
+    if _ROLLUPS is None:
+        with _ROLLUPS_LOCK:
+            if _ROLLUPS is None:
+                rollups = RiskRollups.load()
+                threading.Thread(target=_save_periodically, args=(rollups,), name="fraudshield-rollups", daemon=True).start()
+                atexit.register(rollups.save)
+                _ROLLUPS = rollups
+    return _ROLLUPS
+
+
+def install() -> RiskRollups:
+    """
+    Feeds every backend call (utils scan listener) and verdict (decision
+    listener) into the process-wide rollups.
+    """
+    rollups = get_rollups()
+    add_scan_listener(rollups.on_scan)
+    add_decision_listener(rollups.on_decision)
+    return rollups
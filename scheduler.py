@@ -0,0 +1,127 @@
+"""
+Staleness-driven incremental re-scan scheduler.
+
+Instead of re-scanning the whole inventory every night, each cycle picks
+the URLs whose last result is most overdue relative to a refresh
+interval for its risk tier: High Risk and blacklisted verdicts go stale
+in a day, Safe ones in a month, and young domains (whose verdicts move
+fastest) refresh several times sooner than their tier alone says. Each
+cycle enqueues at most ``max_batch`` URLs into the job queue.
+
+    python -m fraudshield queue schedule --max-batch 2000
+"""
+import heapq
+import json
+import time
+
+DAY_S = 86_400.0
+
+# Tier (as stored in queue results) -> target refresh interval.
+REFRESH_INTERVAL_S = {
+    "Blacklisted": 1 * DAY_S,
+    "High Risk": 1 * DAY_S,
+    "Suspicious": 2 * DAY_S,
+    "Unknown": 3 * DAY_S,
+    "Low Risk": 7 * DAY_S,
+    "Safe": 30 * DAY_S,
+}
+DEFAULT_INTERVAL_S = 3 * DAY_S
+
+# When more URLs are due than fit in one cycle, riskier tiers go first.
+PRIORITY_WEIGHT = {
+    "Blacklisted": 4.0,
+    "High Risk": 4.0,
+    "Suspicious": 2.0,
+}
+
+# Domains younger than this refresh YOUNG_DOMAIN_FACTOR times as often.
+YOUNG_DOMAIN_DAYS = 180
+YOUNG_DOMAIN_FACTOR = 4.0
+MIN_INTERVAL_S = 6 * 3600.0
+
+MAX_BATCH = 1000
+
+
+# ---------------------------------------------------------
+# 1) POLICY — HOW OFTEN A VERDICT NEEDS REFRESHING
+# ---------------------------------------------------------
+def refresh_interval(risk_class: str, blacklist_flag: int = 0, domain_age_days: float = None) -> float:
+    """
+    Returns the target seconds between scans for one verdict.
+    """
+    tier = "Blacklisted" if blacklist_flag else risk_class
+    interval = REFRESH_INTERVAL_S.get(tier, DEFAULT_INTERVAL_S)
+    if domain_age_days is not None and domain_age_days < YOUNG_DOMAIN_DAYS:
+        interval /= YOUNG_DOMAIN_FACTOR
+    return max(interval, MIN_INTERVAL_S)
+
+
+def staleness(scanned_at: float, interval_s: float, now: float) -> float:
+    """
+    Age of the last result in units of its refresh interval; >= 1 means
+    the URL is due.
+    """
+    return (now - scanned_at) / interval_s
+
+
+def _domain_age(signals_json: str, scanned_at: float, now: float):
+    if not signals_json:
+        return None
+    try:
+        age = json.loads(signals_json).get("domain_age_days")
+    except (ValueError, AttributeError):
+        return None
+    if age is None:
+        return None
+    return age + (now - scanned_at) / DAY_S
+
+
+# ---------------------------------------------------------
+# 2) PLANNING — TOP-K MOST OVERDUE URLS
+# ---------------------------------------------------------
+def plan_rescan(queue, max_batch: int = MAX_BATCH, now: float = None):
+    """
+    Returns (plan, summary). ``plan`` is at most ``max_batch`` dicts
+    (url, tier, age_h, staleness), most urgent first (staleness times
+    tier weight), excluding URLs that already have a queued or running
+    job. Only the top-K heap is
+    held in memory while the inventory streams past.
+    """
+    now = time.time() if now is None else now
+    pending = queue.pending_urls()
+
+    inventory = due = 0
+    heap = []
+    for url, risk_class, blacklist_flag, signals, scanned_at in queue.latest_results():
+        inventory += 1
+        interval = refresh_interval(risk_class, blacklist_flag, _domain_age(signals, scanned_at, now))
+        score = staleness(scanned_at, interval, now)
+        if score < 1.0 or url in pending:
+            continue
+        due += 1
+        tier = "Blacklisted" if blacklist_flag else risk_class
+        item = (score * PRIORITY_WEIGHT.get(tier, 1.0), url, tier, scanned_at, score)
+        if len(heap) < max_batch:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    plan = [
+        {"url": url, "tier": tier, "age_h": round((now - scanned_at) / 3600.0, 1), "staleness": round(score, 2)}
+        for _, url, tier, scanned_at, score in sorted(heap, reverse=True)
+    ]
+    summary = {"inventory": inventory, "due": due, "scheduled": len(plan), "skipped_pending": len(pending)}
+    return plan, summary
+
+
+def schedule_cycle(queue, max_batch: int = MAX_BATCH, now: float = None) -> dict:
+    """
+    Plans one cycle and enqueues it as batch ``rescan-YYYY-MM-DDTHH``.
+    Returns the plan summary plus the batch name and jobs added.
+    """
+    now = time.time() if now is None else now
+    plan, summary = plan_rescan(queue, max_batch, now)
+    batch = time.strftime("rescan-%Y-%m-%dT%H", time.gmtime(now))
+    summary["batch"] = batch
+    summary["enqueued"] = queue.enqueue((p["url"] for p in plan), batch=batch)
+    return summary
@@ -1,13 +1,33 @@
+import time
+
 import streamlit as st
 import plotly.graph_objects as go
 import pandas as pd
+from metrics import RERUN_DURATION
+from resources import get_shared_resources
 from utils import (
-    run_fraudshield_scan,
     update_log,
     generate_pdf_report,
-    get_example_website_table
+    get_example_website_table,
+    API_URL,
+)
+from api_explorer import (
+    render_single_url_tester,
+    render_batch_scanner,
+    render_file_batch_scanner,
+    render_audit_search,
+    render_job_queue,
+    render_latency_panel,
+    render_risk_trends,
+    render_scan_history,
 )
 
+_RERUN_STARTED = time.perf_counter()
+
+# HTTP pool, caches, rate limiter, metrics endpoint, audit log and
+# rollups: created once per server process and shared by every session.
+get_shared_resources()
+
 # ---------------------------------------------------------
 # PAGE CONFIGURATION
 # ---------------------------------------------------------
@@ -117,37 +137,15 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# ---------------------------------------------------------
-# RISK CLASS → LABEL + COLOR
-# ---------------------------------------------------------
-def map_risk_style(risk_class: str, blacklist_flag: int = 0):
-
-    if blacklist_flag:
-        return "☠️ Blacklisted Threat", "#B71C1C"
-
-    if risk_class == "Safe":
-        return "🟢 Safe", "#4CAF50"
-
-    if risk_class == "Low Risk":
-        return "🟡 Low Risk", "#FFC107"
-
-    if risk_class == "Suspicious":
-        return "🟠 Suspicious", "#FF9800"
-
-    if risk_class == "High Risk":
-        return "🔴 High Risk", "#F44336"
-
-    return "❓ Unknown", "#95a5a6"
-
-
 # ---------------------------------------------------------
 # TABS (CENTERED)
 # ---------------------------------------------------------
-tab_scanner, tab_model, tab_api, tab_threats, tab_arch, tab_logic = st.tabs(
+tab_scanner, tab_model, tab_api, tab_analytics, tab_threats, tab_arch, tab_logic = st.tabs(
     [
         "Scanner",
         "Model Intelligence",
         "API Explorer",
+        "Analytics",
         "Threat Categories",
         "Architecture",
         "Risk Scoring Logic",
@@ -743,7 +741,8 @@ latency visibility, and batch-evaluation workflows that mirror real platform nee
     # -----------------------------------------------------
     # API CONFIG (CENTRALIZED)
     # -----------------------------------------------------
-    API_ENDPOINT = "https://website-risk-scorer-api.onrender.com/scan_url"
+    # Follows FRAUDSHIELD_API_URL, e.g. a local mock_api.py for offline runs.
+    API_ENDPOINT = API_URL
 
     st.markdown("### ✅ API Endpoint")
     st.code(API_ENDPOINT)
@@ -765,62 +764,7 @@ to get a risk score & classification. This enables warnings, moderation flags, o
     # -----------------------------------------------------
     st.markdown("### 🧪 Live API Test (Single URL)")
 
-    colA, colB = st.columns([3, 1])
-    with colA:
-        api_url = st.text_input(
-            "Website URL to test",
-            placeholder="https://example.com",
-            key="api_url_input"
-        )
-    with colB:
-        st.write("")
-        st.write("")
-        run_live = st.button("Call API", key="api_call_button", use_container_width=True)
-
-    if run_live:
-        if not api_url.strip():
-            st.error("Please enter a valid URL.")
-        else:
-            import time
-            start = time.time()
-            with st.spinner("Calling FraudShield API…"):
-                api_result = run_fraudshield_scan(api_url)
-            elapsed_ms = (time.time() - start) * 1000.0
-
-            if not api_result:
-                st.error("API call failed. Please verify the backend is reachable.")
-            else:
-                # Basic extract for display
-                risk_class = api_result.get("risk_class", "Unknown")
-                risk_score = float(api_result.get("risk_score", 0))
-                blacklist_flag = api_result.get("blacklist_flag", 0)
-
-                label, color = map_risk_style(risk_class, blacklist_flag)
-
-                # Summary card
-                st.markdown(
-                    f"""
-<div style="
-    border:1px solid #e2e6ea;
-    border-left:6px solid {color};
-    border-radius:10px;
-    padding:14px 16px;
-    background:#ffffff;
-    margin-top:10px;">
-    <div style="font-size:16px; font-weight:700; margin-bottom:6px;">API Result Summary</div>
-    <div style="font-size:14px;">
-        <strong>URL:</strong> {api_url}<br>
-        <strong>Classification:</strong> <span style="color:{color}; font-weight:700;">{label}</span><br>
-        <strong>Risk Score:</strong> <span style="font-weight:700;">{risk_score:.2f}%</span><br>
-        <strong>Latency:</strong> {elapsed_ms:.0f} ms
-    </div>
-</div>
-                    """,
-                    unsafe_allow_html=True
-                )
-
-                st.markdown("#### Raw API Response (JSON)")
-                st.json(api_result)
+    render_single_url_tester()
 
     st.markdown("---")
 
@@ -903,59 +847,76 @@ This mirrors real platform needs such as scanning user-submitted links in bulk.
         """
     )
 
-    batch_text = st.text_area(
-        "Paste URLs (one per line)",
-        placeholder="https://example.com\nhttps://another-site.com\nhttps://shop.example.org",
-        height=140,
-        key="batch_urls"
-    )
-
-    col1, col2 = st.columns([1, 2])
-    with col1:
-        run_batch = st.button("Run Batch Scan", use_container_width=True, key="run_batch_scan")
-    with col2:
-        st.caption("Tip: This is useful to validate behavior across multiple real-world websites quickly.")
-
-    if run_batch:
-        urls = [u.strip() for u in batch_text.splitlines() if u.strip()]
-        if len(urls) == 0:
-            st.error("Please paste at least one URL.")
-        else:
-            rows = []
-            with st.spinner(f"Scanning {len(urls)} URLs…"):
-                import time
-                for u in urls[:50]:  # safety cap for demos
-                    t0 = time.time()
-                    r = run_fraudshield_scan(u)
-                    latency = (time.time() - t0) * 1000.0
-
-                    if not r:
-                        rows.append({"url": u, "risk_class": "API_ERROR", "risk_score": None, "latency_ms": round(latency, 0)})
-                        continue
-
-                    rc = r.get("risk_class", "Unknown")
-                    rs = float(r.get("risk_score", 0))
-                    bl = r.get("blacklist_flag", 0)
-                    label, _ = map_risk_style(rc, bl)
-
-                    rows.append(
-                        {
-                            "url": u,
-                            "risk_class": label,
-                            "risk_score_%": round(rs, 2),
-                            "latency_ms": round(latency, 0),
-                        }
-                    )
-
-            df = pd.DataFrame(rows)
-            st.dataframe(df, use_container_width=True)
-
-            st.download_button(
-                "⬇️ Download Batch Results (CSV)",
-                df.to_csv(index=False).encode("utf-8"),
-                file_name="fraudshield_batch_results.csv",
-                mime="text/csv",
-            )
+    render_batch_scanner()
+
+    st.markdown("---")
+
+    # -----------------------------------------------------
+    # LARGE FILE BATCH SCAN
+    # -----------------------------------------------------
+    st.markdown("### 📁 Large File Batch Scan")
+
+    st.write(
+        """
+Upload a full link inventory (hundreds of thousands of profile links) as CSV or plain text,
+optionally gzip-compressed. Duplicates are dropped as the file streams in, and progress is
+checkpointed so a closed tab or a restart resumes instead of starting over.
+        """
+    )
+
+    render_file_batch_scanner()
+
+    st.markdown("---")
+
+    # -----------------------------------------------------
+    # BACKGROUND BATCH VERIFICATION (JOB QUEUE)
+    # -----------------------------------------------------
+    st.markdown("### 🌙 Background Batch Verification")
+
+    st.write(
+        """
+Queue newly added or updated links for the nightly verification run. Jobs are stored on disk,
+so they survive dashboard restarts; failed scans are retried with backoff, and each job keeps
+exactly one stored result. Workers can also run headless: `python -m fraudshield queue work`.
+        """
+    )
+
+    render_job_queue()
+
+    st.markdown("---")
+
+    # -----------------------------------------------------
+    # SESSION SCAN HISTORY
+    # -----------------------------------------------------
+    st.markdown("### 🕘 Session Scan History")
+
+    render_scan_history()
+
+    st.markdown("---")
+
+    # -----------------------------------------------------
+    # LATENCY DISTRIBUTION
+    # -----------------------------------------------------
+    st.markdown("### ⏱️ Latency Distribution")
+
+    render_latency_panel()
+
+    st.markdown("---")
+
+    # -----------------------------------------------------
+    # AUDIT LOG SEARCH
+    # -----------------------------------------------------
+    st.markdown("### 🔎 Audit Log Search")
+
+    st.write(
+        """
+Every verdict is written to an append-only audit log. Sealed log segments are compacted into
+date- and tier-partitioned Parquet files, so incident reviews ("all Suspicious *.xyz verdicts last
+week") read only the matching slices. Compact from the CLI with `python -m fraudshield audit compact`.
+        """
+    )
+
+    render_audit_search()
 
     st.markdown("---")
 
@@ -1056,6 +1017,30 @@ normally use the platform.
 
 
 
+# =========================================================
+# 📈 ANALYTICS TAB — AGGREGATE RISK TRENDS
+# =========================================================
+with tab_analytics:
+    st.markdown("<div class='fs-card'>", unsafe_allow_html=True)
+    st.markdown("<div class='section-header section-blue'>📈 Risk Trends</div>", unsafe_allow_html=True)
+
+    st.write(
+        """
+Aggregate risk trends across every scan made by this deployment: the dashboard, the CLI and the
+background job queue. Counts per tier, mean score, error rate and latency percentiles are
+pre-aggregated into hourly and daily rollups as scans complete, so these charts cost the same
+to draw after ten scans or ten million.
+        """
+    )
+
+    render_risk_trends()
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
+
+
+
+
 # =========================================================
 # 4️⃣ THREAT CATEGORIES TAB (UPGRADED: PLATFORM SAFETY TAXONOMY)
 # =========================================================
@@ -1855,6 +1840,8 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
+RERUN_DURATION.observe(time.perf_counter() - _RERUN_STARTED)
+
 
 
 
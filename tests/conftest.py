@@ -0,0 +1,16 @@
+"""
+Test setup: the modules read DATA_DIR, ports and feature switches from
+the environment at import time, so point them at a scratch directory
+and turn off every listener/port before anything is imported.
+"""
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+os.environ["FRAUDSHIELD_DATA_DIR"] = tempfile.mkdtemp(prefix="fraudshield-tests-")
+os.environ["FRAUDSHIELD_METRICS_PORT"] = "0"
+os.environ["FRAUDSHIELD_GATEWAY_PORT"] = "0"
+os.environ["FRAUDSHIELD_AUDIT"] = "0"
@@ -0,0 +1,52 @@
+import csv
+import io
+import json
+import math
+
+import pyarrow.parquet as pq
+import pytest
+
+from export import BatchResultExporter
+from results import DEADLINE_EXCEEDED, TIMEOUT, ScanResult, ScanResultBatch
+
+
+@pytest.fixture
+def batch():
+    return ScanResultBatch.from_results(
+        [
+            ScanResult("https://ok.example.com/", "Safe", 4.0, 0, 120.0),
+            ScanResult.failed("https://late.example.com/", DEADLINE_EXCEEDED),
+        ]
+    )
+
+
+def _export(batch, fmt, columnar):
+    exporter = BatchResultExporter(fmt)
+    if columnar:
+        exporter.add_batch(batch)
+    else:
+        exporter.extend(batch.iter_rows())
+    return exporter.finish().read()
+
+
+@pytest.mark.parametrize("columnar", [True, False], ids=["add_batch", "rows"])
+def test_csv_deadline_row_has_empty_latency(batch, columnar):
+    rows = list(csv.DictReader(io.StringIO(_export(batch, "csv", columnar).decode("utf-8"))))
+    assert rows[0]["latency_ms"] == "120.0"
+    assert rows[1]["risk_class"] == TIMEOUT
+    assert rows[1]["latency_ms"] == ""
+    assert rows[1]["risk_score_%"] == ""
+
+
+@pytest.mark.parametrize("columnar", [True, False], ids=["add_batch", "rows"])
+def test_parquet_deadline_row_has_null_latency(batch, columnar):
+    table = pq.read_table(io.BytesIO(_export(batch, "parquet", columnar)))
+    assert table.column("latency_ms").to_pylist() == [120.0, None]
+
+
+def test_records_without_latency_are_valid_json():
+    result = ScanResult.failed("https://late.example.com/", DEADLINE_EXCEEDED)
+    assert result.to_record()["latency_ms"] is None
+    assert result.to_row()["latency_ms"] is None
+    json.loads(json.dumps(result.to_record(), allow_nan=False))
+    assert not any(isinstance(v, float) and math.isnan(v) for v in result.to_row().values())
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import pytest
+
+import utils
+from gateway import GatewayServer, VerdictGateway
+from mock_api import start_mock_server
+from verdict_cache import VerdictCache
+
+
+class StaleStore:
+    """
+    Job-queue stand-in holding one verdict scanned a year ago.
+    """
+
+    def latest_result(self, url):
+        return {
+            "url": url,
+            "risk_class": "Suspicious",
+            "risk_score": 61.0,
+            "blacklist_flag": 0,
+            "signals": None,
+            "scanned_at": time.time() - 365 * 86400,
+        }
+
+
+@pytest.fixture
+def failing_backend(monkeypatch):
+    api, endpoint = start_mock_server(latency="fixed:1", error_rate=1.0)
+    monkeypatch.setattr(utils, "API_URL", endpoint)
+    return api
+
+
+def test_backend_errors_are_not_verdicts(failing_backend):
+    cache = VerdictCache(name="test")
+    server = GatewayServer(VerdictGateway(cache=cache))
+    try:
+        status, payload, source = asyncio.run(server.handle("GET", "/scan_url?url=https://down.example.com/", b""))
+    finally:
+        server.gateway.close()
+    assert (status, source) == (502, "error")
+    assert failing_backend.requests == 1
+    assert len(cache) == 0
+
+
+def test_backend_errors_fall_back_to_stale_store(failing_backend):
+    cache = VerdictCache(name="test")
+    server = GatewayServer(VerdictGateway(cache=cache, queue=StaleStore()))
+    try:
+        status, payload, source = asyncio.run(server.handle("GET", "/scan_url?url=https://down.example.com/", b""))
+    finally:
+        server.gateway.close()
+    assert (status, source) == (200, "stale")
+    assert payload["risk_class"] == "Suspicious"
+    assert len(cache) == 0
@@ -0,0 +1,41 @@
+import os
+import time
+
+import pytest
+
+from jobqueue import JobQueue, WorkerPool
+from mock_api import start_mock_server
+
+
+@pytest.fixture
+def backend():
+    api, endpoint = start_mock_server(latency="fixed:50")
+    return endpoint
+
+
+def _wait_for_drain(queue, timeout_s=10.0):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        stats = queue.stats()
+        if stats["depth"] == 0:
+            return stats
+        time.sleep(0.05)
+    return queue.stats()
+
+
+def test_restart_right_after_non_blocking_stop(tmp_path, backend):
+    queue = JobQueue(os.path.join(tmp_path, "jobs.sqlite"))
+    queue.enqueue([f"https://shop{i}.example.com/" for i in range(12)])
+    pool = WorkerPool(queue, workers=2, api_url=backend, poll_s=0.05)
+
+    pool.start()
+    time.sleep(0.02)  # workers are mid-scan
+    pool.stop(wait=False)
+    pool.start()
+    try:
+        stats = _wait_for_drain(queue)
+    finally:
+        pool.stop()
+
+    assert stats["depth"] == 0
+    assert stats["done"] == 12
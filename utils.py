@@ -1,43 +1,215 @@
+import os
+import time
 import requests
 from fpdf import FPDF
-import time
 import pandas as pd
 
-API_URL = "https://website-risk-scorer-api.onrender.com/scan_url"
+from deadline import REQUEST_TIMEOUT_S
+from history import ScanHistory
+from latency import LatencyHistogram
+from metrics import SCAN_ERRORS, SCAN_LATENCY, SCANS_IN_FLIGHT, SCANS_ISSUED
+from results import DEADLINE_EXCEEDED, ScanResult, risk_style
+from verdict_cache import VerdictCache
+
+API_URL = os.environ.get("FRAUDSHIELD_API_URL", "https://website-risk-scorer-api.onrender.com/scan_url")
+HISTORY_CAPACITY = 5000
+
+# Local state (checkpoints, logs, queues) lives under this directory.
+DATA_DIR = os.environ.get("FRAUDSHIELD_DATA_DIR", ".fraudshield")
+
+# Seconds a verdict is reused by run_fraudshield_scan (0 disables).
+VERDICT_CACHE_TTL_S = float(os.environ.get("FRAUDSHIELD_VERDICT_CACHE_TTL", "300"))
 
 
 # ---------------------------------------------------------
 # 1) API CALL — Send URL to backend API and return response
 # ---------------------------------------------------------
-def run_fraudshield_scan(url: str):
+def post_scan(url: str, api_url: str = None, timeout: float = 10, session=None, deadline_bound: bool = False):
+    """
+    Sends a POST request to the FraudShield API with a URL and returns
+    the raw response. Raises on network errors; callers that need to
+    tell failure types apart (e.g. the load generator) use this directly.
+    Every call is counted in the scan metrics. ``deadline_bound`` means
+    ``timeout`` was cut short by a batch deadline: a timeout is then
+    counted as deadline_exceeded, which is not a congestion signal.
+    """
+    SCANS_IN_FLIGHT.inc()
+    t0 = time.perf_counter()
+    try:
+        if _SCAN_TRANSPORT is not None:
+            response = _SCAN_TRANSPORT(url, api_url or API_URL, timeout, session, _send_scan)
+        else:
+            response = _send_scan(url, api_url or API_URL, timeout, session)
+    except Exception as exc:
+        error = classify_error(exc)
+        _record_scan(t0, DEADLINE_EXCEEDED if deadline_bound and error == "timeout" else error)
+        raise
+    finally:
+        SCANS_IN_FLIGHT.dec()
+    _record_scan(t0, f"http_{response.status_code}" if response.status_code >= 400 else None)
+    return response
+
+
+def _send_scan(url: str, api_url: str, timeout: float, session):
+    client = session or requests
+    return client.post(api_url, json={"url": url}, timeout=timeout)
+
+
+def _record_scan(t0: float, error: str):
+    elapsed = time.perf_counter() - t0
+    SCAN_LATENCY.observe(elapsed)
+    for listener in _SCAN_LISTENERS:
+        listener(elapsed, error)
+    if error:
+        SCANS_ISSUED.labels("error").inc()
+        SCAN_ERRORS.labels(error).inc()
+    else:
+        SCANS_ISSUED.labels("ok").inc()
+
+
+def classify_error(exc: Exception) -> str:
+    if isinstance(exc, requests.Timeout):
+        return "timeout"
+    if isinstance(exc, requests.ConnectionError):
+        return "connection"
+    if isinstance(exc, ValueError):
+        return "invalid_json"
+    return type(exc).__name__
+
+
+_SCAN_TRANSPORT = None
+
+
+def set_scan_transport(transport):
+    """
+    Routes every scan through ``transport(url, api_url, timeout, session,
+    send)``, where ``send`` performs the real HTTP call. Used by the
+    record/replay cassette layer; pass None to restore direct calls.
+    """
+    global _SCAN_TRANSPORT
+    _SCAN_TRANSPORT = transport
+
+
+_SHARED_SESSION = None
+_RATE_LIMITER = None
+
+
+def use_shared_client(session=None, rate_limiter=None):
+    """
+    Routes run_fraudshield_scan through a pooled requests.Session and an
+    optional rate limiter (see resources.py); None restores one-off
+    requests without limiting.
+    """
+    global _SHARED_SESSION, _RATE_LIMITER
+    _SHARED_SESSION = session
+    _RATE_LIMITER = rate_limiter
+
+
+_DECISION_LISTENERS = ()
+_SCAN_LISTENERS = ()
+
+
+def add_decision_listener(listener):
+    """
+    Calls ``listener(url, response_json)`` for every verdict the backend
+    returns (audit log, rollups). It must not block; adding the same
+    listener twice is a no-op.
+    """
+    global _DECISION_LISTENERS
+    if listener not in _DECISION_LISTENERS:
+        _DECISION_LISTENERS = _DECISION_LISTENERS + (listener,)
+
+
+def add_scan_listener(listener):
+    """
+    Calls ``listener(latency_s, error)`` after every backend call, where
+    ``error`` is the metrics error type or None. It must not block.
+    """
+    global _SCAN_LISTENERS
+    if listener not in _SCAN_LISTENERS:
+        _SCAN_LISTENERS = _SCAN_LISTENERS + (listener,)
+
+
+def notify_decision(url: str, response_json: dict):
+    """
+    Passes a verdict to the decision listeners. Bodies without a
+    ``risk_class`` (error responses) are not decisions and are skipped.
+    """
+    if not isinstance(response_json, dict) or response_json.get("risk_class") is None:
+        return
+    for listener in _DECISION_LISTENERS:
+        listener(url, response_json)
+
+
+def run_fraudshield_scan(url: str, timeout: float = REQUEST_TIMEOUT_S):
     """
     Sends a POST request to the FraudShield API with a URL.
-    Returns the API JSON response or None if failed.
+    Returns the API JSON response or None if failed. Verdicts are
+    reused for VERDICT_CACHE_TTL_S, and concurrent scans of the same
+    URL share one backend call. ``timeout`` also bounds the wait for a
+    rate-limit token.
     """
+    return scan_verdict(url, timeout)[0]
+
+
+def scan_verdict(url: str, timeout: float = REQUEST_TIMEOUT_S, deadline_bound: bool = False):
+    """
+    run_fraudshield_scan returning ``(response, cached)``; ``cached`` is
+    True when the verdict came from VERDICT_CACHE without a backend call,
+    so callers don't time it as one. With ``deadline_bound`` (``timeout``
+    is a deadline's remaining budget) a caller waiting on another
+    thread's call for the same URL also gives up after ``timeout``.
+    """
+    if VERDICT_CACHE is None:
+        return _scan_json(url, timeout, deadline_bound), False
+    return VERDICT_CACHE.lookup(
+        url,
+        lambda key: _scan_json(key, timeout, deadline_bound),
+        wait_timeout=timeout if deadline_bound else None,
+    )
+
+
+def _scan_json(url: str, timeout: float = REQUEST_TIMEOUT_S, deadline_bound: bool = False):
+    if _RATE_LIMITER is not None and not _RATE_LIMITER.acquire(timeout):
+        return None
     try:
-        response = requests.post(API_URL, json={"url": url}, timeout=10)
-        return response.json()
+        response = post_scan(url, timeout=timeout, session=_SHARED_SESSION, deadline_bound=deadline_bound)
+        if response.status_code >= 400:
+            # An error body is not a verdict: don't cache or show it.
+            return None
+        r = response.json()
     except Exception:
         return None
+    notify_decision(url, r)
+    return r
+
+
+VERDICT_CACHE = VerdictCache(ttl_s=VERDICT_CACHE_TTL_S) if VERDICT_CACHE_TTL_S > 0 else None
 
 
 # ---------------------------------------------------------
 # 2) LOGGING — Store scan results into streamlit session log
 # ---------------------------------------------------------
-def update_log(st_session, url: str, result: str):
+def update_log(st_session, url: str, result: str, score: float = None, latency_ms: float = None, cached: bool = False):
     """
     Saves a history entry inside Streamlit session_state.
+    History is a fixed-capacity ring buffer, so memory stays flat
+    for long-lived sessions. Latency, when given, goes into the
+    session's latency histogram (also fixed-size). Cached verdicts
+    made no backend call: they are counted in ``cache_hits`` instead
+    of the histogram.
     """
     if "history" not in st_session:
-        st_session["history"] = []
-
-    st_session["history"].append(
-        {
-            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "url": url,
-            "result": result
-        }
-    )
+        st_session["history"] = ScanHistory(capacity=HISTORY_CAPACITY)
+
+    st_session["history"].append(url, result, score)
+
+    if cached:
+        st_session["cache_hits"] = st_session.get("cache_hits", 0) + 1
+    elif latency_ms is not None:
+        if "latency" not in st_session:
+            st_session["latency"] = LatencyHistogram()
+        st_session["latency"].record(latency_ms, error=result == "API_ERROR")
 
 
 # ---------------------------------------------------------
@@ -49,6 +221,17 @@ def generate_pdf_report(url: str, risk_class: str, risk_score: float):
     """
 
     pdf = FPDF()
+    add_report_page(pdf, url, risk_class, risk_score)
+
+    # Return PDF as bytes
+    return pdf.output(dest="S").encode("latin-1")
+
+
+def add_report_page(pdf, url: str, risk_class: str, risk_score: float):
+    """
+    Lays out one report page on an FPDF document. Shared by single
+    reports and multi-page (consolidated) reports.
+    """
     pdf.add_page()
 
     # Title
@@ -81,12 +264,69 @@ def generate_pdf_report(url: str, risk_class: str, risk_score: float):
         ),
     )
 
-    # Return PDF as bytes
-    return pdf.output(dest="S").encode("latin-1")
+
+# ---------------------------------------------------------
+# 4) RISK CLASS → LABEL + COLOR
+# ---------------------------------------------------------
+# Same function, not a wrapper: it runs once per table row.
+map_risk_style = risk_style
 
 
 # ---------------------------------------------------------
-# 4) TABULAR EXAMPLE DATA (Optional helper)
+# 5) BATCH ROW — Scan one URL into a batch-table row
+# ---------------------------------------------------------
+def scan_batch_result(url: str, st_session=None, deadline=None) -> ScanResult:
+    """
+    Scans one URL into a ScanResult (failed calls have ``error`` set).
+    If a session is given, the scan is also recorded in its history.
+    With a deadline.Deadline the call's timeout is its remaining budget,
+    and a call that can't finish in time fails as DEADLINE_EXCEEDED.
+    """
+    if deadline is not None and deadline.expired:
+        return ScanResult.failed(url, DEADLINE_EXCEEDED)
+    t0 = time.time()
+    if deadline is None:
+        r, cached = scan_verdict(url)
+    else:
+        budget = deadline.budget()
+        r, cached = scan_verdict(url, budget, deadline_bound=budget < REQUEST_TIMEOUT_S)
+    latency = (time.time() - t0) * 1000.0
+    if r:
+        result = ScanResult.from_response(url, r, latency, cached)
+    elif deadline is not None and deadline.expired:
+        result = ScanResult.failed(url, DEADLINE_EXCEEDED, latency)
+    else:
+        result = ScanResult.failed(url, latency_ms=latency)
+    if st_session is not None:
+        log_batch_result(st_session, result)
+    return result
+
+
+def log_batch_result(st_session, result: ScanResult):
+    """
+    Records a batch result in the session history (rows cut off by a
+    batch deadline are skipped). Scans running on worker threads leave
+    this to the script thread, which owns ``st.session_state``.
+    """
+    if result.error == DEADLINE_EXCEEDED:
+        return
+    if not result.ok:
+        update_log(st_session, result.url, "API_ERROR", latency_ms=result.latency_ms)
+    else:
+        label = "Blacklisted" if result.blacklist_flag else result.risk_class
+        update_log(st_session, result.url, label, result.risk_score, result.latency_ms, result.cached)
+
+
+def scan_batch_row(url: str, st_session=None):
+    """
+    Scans one URL and returns the row shown in batch result tables.
+    Failed calls produce an API_ERROR row.
+    """
+    return scan_batch_result(url, st_session).to_row()
+
+
+# ---------------------------------------------------------
+# 6) TABULAR EXAMPLE DATA (Optional helper)
 # ---------------------------------------------------------
 def get_example_website_table():
     """
@@ -102,3 +342,10 @@ def get_example_website_table():
         ],
         columns=["Website", "Risk Result"]
     )
+
+
+# Record/replay mode for reproducible, network-free benchmark runs.
+if os.environ.get("FRAUDSHIELD_CASSETTE"):
+    from cassette import install_from_env
+
+    install_from_env()
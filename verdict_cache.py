@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import CACHE_REQUESTS, COALESCED_CALLS
+
+DEFAULT_TTL_S = 300.0
+DEFAULT_CAPACITY = 10_000
+
+
+class _Flight:
+    __slots__ = ("done", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+
+
+# ---------------------------------------------------------
+# TTL + LRU VERDICT CACHE WITH SINGLE-FLIGHT MISSES
+# ---------------------------------------------------------
+class VerdictCache:
+    """
+    Bounded cache of scan verdicts keyed by URL.
+
+    Entries expire ``ttl_s`` seconds after they were fetched, and the
+    least recently used entry is evicted beyond ``capacity``. Concurrent
+    misses for the same key are coalesced: one caller fetches, the others
+    wait for its result instead of issuing their own backend call.
+    Failed fetches (None) are not cached.
+    """
+
+    def __init__(self, ttl_s: float = DEFAULT_TTL_S, capacity: int = DEFAULT_CAPACITY, name: str = "verdict"):
+        self.ttl_s = ttl_s
+        self.capacity = capacity
+        self.name = name
+        self._entries = OrderedDict()
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._hits = CACHE_REQUESTS.labels(name, "hit")
+        self._misses = CACHE_REQUESTS.labels(name, "miss")
+        self._coalesced = COALESCED_CALLS.labels("single_flight")
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl_s: float = None):
+        """
+        Caches ``value`` for ``ttl_s`` seconds, capped at the cache's TTL.
+        """
+        ttl_s = self.ttl_s if ttl_s is None else min(ttl_s, self.ttl_s)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def get_or_fetch(self, key, fetch):
+        """
+        Returns the cached value for ``key`` or ``fetch(key)``, fetching
+        at most once per key at a time.
+        """
+        return self.lookup(key, fetch)[0]
+
+    def lookup(self, key, fetch, wait_timeout: float = None):
+        """
+        Like get_or_fetch, but returns ``(value, hit)``: ``hit`` is True
+        when the value came from the cache without waiting on a fetch.
+        A caller waiting on another caller's fetch gives up after
+        ``wait_timeout`` seconds and gets None.
+        """
+        value = self.get(key)
+        if value is not None:
+            self._hits.inc()
+            return value, True
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self._coalesced.inc()
+            if not flight.done.wait(wait_timeout):
+                return None, False
+            return flight.result, False
+
+        self._misses.inc()
+        try:
+            flight.result = fetch(key)
+            if flight.result is not None:
+                self.put(key, flight.result)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()